@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark - DPS decoding cost per poll
+Compares the original per-poll SENSOR_TYPES loop with the precompiled
+decode table and projects the CPU cost for a fleet of devices.
+
+Run from the repository root inside a Home Assistant dev environment:
+    python benchmarks/bench_decode.py [--devices 500] [--interval 30]
+"""
+
+import argparse
+import logging
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from custom_components.tuya_8in1.const import SENSOR_TYPES  # noqa: E402
+from custom_components.tuya_8in1.decoder import compile_decode_table, decode_dps  # noqa: E402
+
+_LOGGER = logging.getLogger("bench_decode")
+_LOGGER.setLevel(logging.WARNING)  # Same as a default HA install
+
+# Real payload captured from a tester (see tuya_8in1_analyzer/*.json)
+SAMPLE_DPS = {
+    "8": 238, "106": 790, "111": 359, "116": 718,
+    "121": 418, "126": 997, "131": 518, "136": 718,
+}
+
+
+def legacy_map(dps_data):
+    """Mapping loop as it ran on every poll before the decode table"""
+    mapped_data = {}
+    for sensor_key, sensor_config in SENSOR_TYPES.items():
+        dps_id = sensor_config.get('dps_id')
+        if dps_id and str(dps_id) in dps_data:
+            raw_value = dps_data[str(dps_id)]
+            if 'scale' in sensor_config:
+                value = raw_value / sensor_config['scale']
+            else:
+                value = raw_value
+            mapped_data[sensor_key] = value
+            _LOGGER.debug(f"✅ Mapped {sensor_key}: {raw_value} -> {value}")
+        else:
+            _LOGGER.warning(f"⚠️ Missing DPS {dps_id} for sensor {sensor_key}")
+    return mapped_data
+
+
+def measure(func, number: int) -> float:
+    """Return the best per-call time in seconds over 5 runs"""
+    return min(timeit.repeat(func, number=number, repeat=5)) / number
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--devices", type=int, default=500, help="Devices on one HA instance")
+    parser.add_argument("--interval", type=float, default=30, help="Poll interval in seconds")
+    parser.add_argument("--number", type=int, default=100_000, help="Calls per timing run")
+    args = parser.parse_args()
+
+    table = compile_decode_table(SENSOR_TYPES)
+    assert decode_dps(table, SAMPLE_DPS) == legacy_map(SAMPLE_DPS)
+
+    results = {
+        "legacy loop": measure(lambda: legacy_map(SAMPLE_DPS), args.number),
+        "decode table": measure(lambda: decode_dps(table, SAMPLE_DPS), args.number),
+    }
+    compile_time = measure(lambda: compile_decode_table(SENSOR_TYPES), args.number // 10)
+
+    polls_per_second = args.devices / args.interval
+    print(f"DPS decode - {len(table)} sensors, {args.devices} devices every {args.interval:g}s")
+    print(f"{'':14} {'per poll':>10} {'CPU share':>10}")
+    for name, per_poll in results.items():
+        # Fraction of one core spent decoding for the whole fleet
+        share = per_poll * polls_per_second
+        print(f"{name:14} {per_poll * 1e6:8.2f}us {share * 100:9.4f}%")
+    print(f"speedup        {results['legacy loop'] / results['decode table']:8.1f}x")
+    print(f"table compile  {compile_time * 1e6:8.2f}us (once per device at setup)")
+
+
+if __name__ == "__main__":
+    main()
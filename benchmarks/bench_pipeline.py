@@ -0,0 +1,189 @@
+"""
+Benchmark - poll-to-state pipeline for N devices
+Drives TuyaDataUpdateCoordinator._async_update_data -> DPS mapping ->
+Tuya8in1Sensor native_value / available / extra_state_attributes -> state
+write against a bare Home Assistant core (no integrations loaded) and
+simulated devices running in a separate process.
+
+Reported per test (see "extra_info" in --benchmark-json or the log):
+  loop_cpu_us_per_poll      CPU time of the HA process per device poll
+  polls_per_second          Throughput of one round over all devices
+  peak_kib_per_poll         Transient allocation peak (tracemalloc) per poll
+  retained_blocks_per_poll  Allocated blocks left behind per poll (leaks)
+
+CPython has no allocation counter, so allocations are reported as the
+tracemalloc peak and the retained block delta. Needs a Home Assistant dev
+environment with pytest-benchmark, and Linux for the loopback addresses:
+    pytest benchmarks/bench_pipeline.py [--benchmark-json out.json]
+Add "-p no:homeassistant" where pytest-homeassistant-custom-component is
+installed, its socket blocker would keep the coordinators from reaching
+the simulator.
+"""
+
+import asyncio
+import gc
+import json
+import logging
+import os
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import pytest
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+
+from homeassistant.core import HomeAssistant  # noqa: E402
+from homeassistant.helpers import restore_state  # noqa: E402
+
+from custom_components.tuya_8in1 import TuyaDataUpdateCoordinator  # noqa: E402
+from custom_components.tuya_8in1.const import DEFAULT_MAX_CONCURRENT_POLLS, SENSOR_TYPES  # noqa: E402
+from custom_components.tuya_8in1.scheduler import PrioritySlots  # noqa: E402
+from custom_components.tuya_8in1.sensor import Tuya8in1Sensor  # noqa: E402
+
+_LOGGER = logging.getLogger("bench_pipeline")
+
+SIMULATOR = os.path.join(ROOT, "simulator", "tuya_simulator.py")
+SIMULATOR_HOST = "127.0.60.1"
+DEVICE_COUNTS = (1, 10, 100)
+ROUNDS = 5
+
+
+@pytest.fixture(scope="module")
+def loop():
+    """Event loop shared by the core and all coordinators"""
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+
+@pytest.fixture(scope="module")
+def devices():
+    """Simulated testers in their own process, so their CPU is not counted"""
+    process = subprocess.Popen(
+        [sys.executable, SIMULATOR, "--count", str(max(DEVICE_COUNTS)), "--host", SIMULATOR_HOST],
+        stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True,
+    )
+    try:
+        yield [json.loads(process.stdout.readline()) for _ in range(max(DEVICE_COUNTS))]
+    finally:
+        process.terminate()
+        process.wait()
+
+
+@pytest.fixture(scope="module")
+def hass(loop, tmp_path_factory):
+    """Bare Home Assistant core - state machine, bus, timers and restore state only"""
+    config_dir = str(tmp_path_factory.mktemp("config"))
+
+    async def start():
+        hass = HomeAssistant(config_dir)
+        # Sensors restore their last value when added, from an empty store here
+        await restore_state.async_load(hass)
+        await hass.async_start()
+        return hass
+
+    hass = loop.run_until_complete(start())
+    yield hass
+    loop.run_until_complete(hass.async_stop(force=True))
+
+
+def _setup(hass, loop, devices, count):
+    """Create coordinators with all their sensors attached to the core"""
+
+    async def setup():
+        coordinators = []
+        for index, device in enumerate(devices[:count]):
+            coordinator = TuyaDataUpdateCoordinator(
+                hass, device["device_id"], device["local_key"], device["host"],
+                device["version"], 30,
+            )
+            for sensor_key, sensor_config in SENSOR_TYPES.items():
+                sensor = Tuya8in1Sensor(
+                    coordinator, device["device_id"], f"Bench {index}", sensor_key, sensor_config
+                )
+                sensor.hass = hass
+                sensor.entity_id = f"sensor.bench_{index}_{sensor_key}"
+                await sensor.async_added_to_hass()
+            # Connection test and first poll are not part of the measurement
+            await coordinator.async_refresh()
+            coordinators.append(coordinator)
+        return coordinators
+
+    return loop.run_until_complete(setup())
+
+
+def _teardown(loop, coordinators):
+    for coordinator in coordinators:
+        loop.run_until_complete(coordinator.async_shutdown_device())
+
+
+def _measure(benchmark, loop, count, run_round):
+    """Benchmark run_round and attach the per-poll figures"""
+    cpu_before = time.process_time()
+    wall_before = time.perf_counter()
+    benchmark.pedantic(lambda: loop.run_until_complete(run_round()), rounds=ROUNDS, iterations=1)
+    cpu = time.process_time() - cpu_before
+    wall = time.perf_counter() - wall_before
+    polls = count * ROUNDS
+
+    # Separate pass - tracemalloc would distort the timings above
+    gc.collect()
+    blocks_before = sys.getallocatedblocks()
+    tracemalloc.start()
+    loop.run_until_complete(run_round())
+    _current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    gc.collect()
+    retained = sys.getallocatedblocks() - blocks_before
+
+    benchmark.extra_info.update({
+        "devices": count,
+        "loop_cpu_us_per_poll": round(cpu / polls * 1e6, 1),
+        "polls_per_second": round(polls / wall, 1),
+        "peak_kib_per_poll": round(peak / count / 1024, 2),
+        "retained_blocks_per_poll": round(retained / count, 1),
+    })
+    _LOGGER.warning("%s", benchmark.extra_info)
+
+
+@pytest.mark.parametrize("count", DEVICE_COUNTS)
+def test_poll_pipeline(benchmark, hass, loop, devices, count):
+    """Full poll over the LAN protocol, bounded like the shared scheduler"""
+    coordinators = _setup(hass, loop, devices, count)
+    slots = PrioritySlots(DEFAULT_MAX_CONCURRENT_POLLS)
+
+    async def poll(coordinator):
+        async with slots.acquire(coordinator.priority):
+            await coordinator.async_refresh()
+
+    async def run_round():
+        await asyncio.gather(*(poll(coordinator) for coordinator in coordinators))
+
+    try:
+        _measure(benchmark, loop, count, run_round)
+        assert all(coordinator.last_update_success for coordinator in coordinators)
+    finally:
+        _teardown(loop, coordinators)
+
+
+@pytest.mark.parametrize("count", DEVICE_COUNTS)
+def test_state_write(benchmark, hass, loop, devices, count):
+    """Mapping and state writes only - every round changes every value"""
+    coordinators = _setup(hass, loop, devices, count)
+    raw = [{"8": 238, "106": 790, "111": 359, "116": 718, "121": 418, "126": 997, "131": 518, "136": 718}]
+
+    async def run_round():
+        # Shift all DPS past their deadbands so every sensor writes
+        raw[0] = {dps_key: value + 10 for dps_key, value in raw[0].items()}
+        for coordinator in coordinators:
+            coordinator.async_set_updated_data(coordinator._map_dps(raw[0]))
+
+    try:
+        _measure(benchmark, loop, count, run_round)
+        state = hass.states.get("sensor.bench_0_ph")
+        assert state is not None and float(state.state) == raw[0]["106"] / 100
+    finally:
+        _teardown(loop, coordinators)
@@ -5,7 +5,9 @@ Integration provides access to all device sensors.
 
 import logging
 import asyncio
+import time
 from datetime import timedelta
+from typing import Optional
 
 import voluptuous as vol
 from homeassistant.config_entries import ConfigEntry
@@ -13,21 +15,85 @@ from homeassistant.const import (
     CONF_DEVICE_ID,
     CONF_HOST,
     CONF_NAME,
+    EVENT_HOMEASSISTANT_STOP,
     Platform,
 )
-from homeassistant.core import HomeAssistant
+from homeassistant.core import Event, HomeAssistant, callback
 from homeassistant.helpers import config_validation as cv
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+from homeassistant.util import dt as dt_util, slugify
 
 from .const import (
     DOMAIN,
     CONF_LOCAL_KEY,
     CONF_PROTOCOL_VERSION,
     CONF_SCAN_INTERVAL,
+    CONF_PUSH_MODE,
+    CONF_PRIORITY,
+    CONF_ADAPTIVE_POLLING,
+    CONF_MIN_SCAN_INTERVAL,
+    CONF_MAX_SCAN_INTERVAL,
+    CONF_ROLLING_STATISTICS,
+    CONF_CALCIUM_HARDNESS,
+    CONF_TOTAL_ALKALINITY,
+    CONF_OUTLIER_FILTER,
+    CONF_STATISTICS_IMPORT,
+    CONF_ARCHIVE,
     DEFAULT_SCAN_INTERVAL,
     DEFAULT_PROTOCOL_VERSION,
-    SENSOR_TYPES,
+    DEFAULT_PUSH_MODE,
+    DEFAULT_PRIORITY,
+    DEFAULT_ADAPTIVE_POLLING,
+    DEFAULT_MIN_SCAN_INTERVAL,
+    DEFAULT_MAX_SCAN_INTERVAL,
+    DEFAULT_ROLLING_STATISTICS,
+    DEFAULT_CALCIUM_HARDNESS,
+    DEFAULT_TOTAL_ALKALINITY,
+    DEFAULT_OUTLIER_FILTER,
+    DEFAULT_STATISTICS_IMPORT,
+    DEFAULT_ARCHIVE,
+    ARCHIVE_DIRECTORY,
+    ARCHIVE_FLUSH_INTERVAL,
+    ARCHIVE_FLUSH_RECORDS,
+    FILTER_WINDOW,
+    FILTER_EWMA_ALPHA,
+    FILTER_HAMPEL_THRESHOLD,
+    HISTORY_WINDOWS,
+    PUSH_CONSISTENCY_INTERVAL,
+    PUSH_HEARTBEAT_INTERVAL,
+    PUSH_RECEIVE_TIMEOUT,
+    PUSH_RECONNECT_DELAY,
+    BREAKER_FAILURE_THRESHOLD,
+    BREAKER_BASE_DELAY,
+    BREAKER_MAX_DELAY,
+    PROBE_TIMEOUT,
+    STATS_WINDOW,
+    DEVICE_TIMEOUT,
+    DEVICE_RETRIES,
+    SESSION_TTL,
 )
+from .adaptive import AdaptiveInterval
+from .archive import ReadingArchive
+from .breaker import CircuitBreaker
+from .client import TuyaError, TuyaLocalClient, async_probe
+from .decoder import compile_decode_table, decode_dps
+from .derived import compile_derive_table, derive
+from .discovery import DiscoveredDevice, async_get_discovery
+from .filters import FILTER_NONE, FILTER_TYPES, SensorFilters
+from .history import SensorHistory
+from .longterm import LongTermStatistics, async_remove_partial_hour
+from .registry import async_get_registry
+from .scheduler import async_get_scheduler
+from .schema import (
+    DpsSchema,
+    async_load_schema,
+    async_remove_schema,
+    async_save_schema,
+    discover_schema,
+    schema_derived_types,
+    schema_sensor_types,
+)
+from .stats import PollStats
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -43,6 +109,19 @@ CONFIG_SCHEMA = vol.Schema(
                 vol.Optional(CONF_NAME, default="Tuya 8-in-1 Tester"): cv.string,
                 vol.Optional(CONF_PROTOCOL_VERSION, default=DEFAULT_PROTOCOL_VERSION): vol.Coerce(float),
                 vol.Optional(CONF_SCAN_INTERVAL, default=DEFAULT_SCAN_INTERVAL): cv.positive_int,
+                vol.Optional(CONF_PUSH_MODE, default=DEFAULT_PUSH_MODE): cv.boolean,
+                vol.Optional(CONF_PRIORITY, default=DEFAULT_PRIORITY): vol.All(
+                    vol.Coerce(int), vol.Range(min=0, max=10)
+                ),
+                vol.Optional(CONF_ADAPTIVE_POLLING, default=DEFAULT_ADAPTIVE_POLLING): cv.boolean,
+                vol.Optional(CONF_MIN_SCAN_INTERVAL, default=DEFAULT_MIN_SCAN_INTERVAL): cv.positive_int,
+                vol.Optional(CONF_MAX_SCAN_INTERVAL, default=DEFAULT_MAX_SCAN_INTERVAL): cv.positive_int,
+                vol.Optional(CONF_ROLLING_STATISTICS, default=DEFAULT_ROLLING_STATISTICS): cv.boolean,
+                vol.Optional(CONF_CALCIUM_HARDNESS, default=DEFAULT_CALCIUM_HARDNESS): cv.positive_int,
+                vol.Optional(CONF_TOTAL_ALKALINITY, default=DEFAULT_TOTAL_ALKALINITY): cv.positive_int,
+                vol.Optional(CONF_OUTLIER_FILTER, default=DEFAULT_OUTLIER_FILTER): vol.In(FILTER_TYPES),
+                vol.Optional(CONF_STATISTICS_IMPORT, default=DEFAULT_STATISTICS_IMPORT): cv.boolean,
+                vol.Optional(CONF_ARCHIVE, default=DEFAULT_ARCHIVE): cv.boolean,
             }
         )
     },
@@ -67,6 +146,17 @@ async def async_setup(hass: HomeAssistant, config: dict) -> bool:
                     CONF_NAME: conf.get(CONF_NAME, "Tuya 8-in-1 Tester"),
                     CONF_PROTOCOL_VERSION: conf.get(CONF_PROTOCOL_VERSION, DEFAULT_PROTOCOL_VERSION),
                     CONF_SCAN_INTERVAL: conf.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL),
+                    CONF_PUSH_MODE: conf.get(CONF_PUSH_MODE, DEFAULT_PUSH_MODE),
+                    CONF_PRIORITY: conf.get(CONF_PRIORITY, DEFAULT_PRIORITY),
+                    CONF_ADAPTIVE_POLLING: conf.get(CONF_ADAPTIVE_POLLING, DEFAULT_ADAPTIVE_POLLING),
+                    CONF_MIN_SCAN_INTERVAL: conf.get(CONF_MIN_SCAN_INTERVAL, DEFAULT_MIN_SCAN_INTERVAL),
+                    CONF_MAX_SCAN_INTERVAL: conf.get(CONF_MAX_SCAN_INTERVAL, DEFAULT_MAX_SCAN_INTERVAL),
+                    CONF_ROLLING_STATISTICS: conf.get(CONF_ROLLING_STATISTICS, DEFAULT_ROLLING_STATISTICS),
+                    CONF_CALCIUM_HARDNESS: conf.get(CONF_CALCIUM_HARDNESS, DEFAULT_CALCIUM_HARDNESS),
+                    CONF_TOTAL_ALKALINITY: conf.get(CONF_TOTAL_ALKALINITY, DEFAULT_TOTAL_ALKALINITY),
+                    CONF_OUTLIER_FILTER: conf.get(CONF_OUTLIER_FILTER, DEFAULT_OUTLIER_FILTER),
+                    CONF_STATISTICS_IMPORT: conf.get(CONF_STATISTICS_IMPORT, DEFAULT_STATISTICS_IMPORT),
+                    CONF_ARCHIVE: conf.get(CONF_ARCHIVE, DEFAULT_ARCHIVE),
                 }
             )
         )
@@ -80,161 +170,479 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     host = entry.data[CONF_HOST]
     protocol_version = entry.data.get(CONF_PROTOCOL_VERSION, DEFAULT_PROTOCOL_VERSION)
     scan_interval = entry.data.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL)
+    push_mode = entry.data.get(CONF_PUSH_MODE, DEFAULT_PUSH_MODE)
+    priority = entry.data.get(CONF_PRIORITY, DEFAULT_PRIORITY)
+    
+    # DPS the device reported before - None until the first status arrives
+    dps_schema = await async_load_schema(hass, device_id)
     
     coordinator = TuyaDataUpdateCoordinator(
-        hass, device_id, local_key, host, protocol_version, scan_interval
+        hass, device_id, local_key, host, protocol_version, scan_interval, push_mode, priority,
+        adaptive_polling=entry.data.get(CONF_ADAPTIVE_POLLING, DEFAULT_ADAPTIVE_POLLING),
+        min_scan_interval=entry.data.get(CONF_MIN_SCAN_INTERVAL, DEFAULT_MIN_SCAN_INTERVAL),
+        max_scan_interval=entry.data.get(CONF_MAX_SCAN_INTERVAL, DEFAULT_MAX_SCAN_INTERVAL),
+        rolling_statistics=entry.data.get(CONF_ROLLING_STATISTICS, DEFAULT_ROLLING_STATISTICS),
+        calcium_hardness=entry.data.get(CONF_CALCIUM_HARDNESS, DEFAULT_CALCIUM_HARDNESS),
+        total_alkalinity=entry.data.get(CONF_TOTAL_ALKALINITY, DEFAULT_TOTAL_ALKALINITY),
+        outlier_filter=entry.data.get(CONF_OUTLIER_FILTER, DEFAULT_OUTLIER_FILTER),
+        statistics_import=entry.data.get(CONF_STATISTICS_IMPORT, DEFAULT_STATISTICS_IMPORT),
+        archive=entry.data.get(CONF_ARCHIVE, DEFAULT_ARCHIVE),
+        device_name=entry.data.get(CONF_NAME, "Tuya 8-in-1 Tester"),
+        dps_schema=dps_schema,
     )
     
-    await coordinator.async_config_entry_first_refresh()
-    
     hass.data[DOMAIN][entry.entry_id] = coordinator
     
+    # Continue the hour of statistics saved before a reload or restart
+    if coordinator.long_term is not None:
+        await coordinator.long_term.async_load()
+    
+    # Entities start from their restored states, first contact with the
+    # device happens in the background so an offline tester never blocks startup
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
     
+    # Shared scheduler caps concurrent connections, also during startup
+    entry.async_on_unload(async_get_scheduler(hass).async_subscribe(coordinator, immediate=True))
+    
+    # Push listener runs for the lifetime of the entry, cancelled on unload
+    # and by async_shutdown_device before the connection is released
+    if push_mode:
+        coordinator.push_task = entry.async_create_background_task(
+            hass, coordinator.async_push_loop(), f"{DOMAIN}_push_{device_id}"
+        )
+    
+    # Device beacons move the entry to a new address when the tester's
+    # DHCP lease changes - applied in place, without a reload
+    applied_data = dict(entry.data)
+    discovery = async_get_discovery(hass)
+    
+    @callback
+    def async_discovered(device: DiscoveredDevice):
+        if device.ip == coordinator.host:
+            return
+        _LOGGER.warning(f"🔍 {device_id} moved from {coordinator.host} to {device.ip}, reconnecting")
+        applied_data[CONF_HOST] = device.ip
+        hass.async_create_task(coordinator.async_set_host(device.ip))
+        hass.config_entries.async_update_entry(entry, data={**entry.data, CONF_HOST: device.ip})
+    
+    entry.async_on_unload(discovery.async_listen(device_id, async_discovered))
+    if device_id in discovery.devices:
+        async_discovered(discovery.devices[device_id])
+    
+    async def async_entry_updated(hass: HomeAssistant, entry: ConfigEntry) -> None:
+        """Reload unless the update only stored a discovered address"""
+        if dict(entry.data) != applied_data:
+            await async_reload_entry(hass, entry)
+    
+    # Options flow writes to entry data - reload so new settings take effect
+    entry.async_on_unload(entry.add_update_listener(async_entry_updated))
+    
+    # Entries are not unloaded when HA stops, write the buffered readings here
+    async def async_stop(event: Event) -> None:
+        await coordinator.async_shutdown_device()
+    
+    entry.async_on_unload(hass.bus.async_listen(EVENT_HOMEASSISTANT_STOP, async_stop))
+    
     return True
 
+async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Reload integration after its configuration changed"""
+    await hass.config_entries.async_reload(entry.entry_id)
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload integration"""
     unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
     
     if unload_ok:
-        hass.data[DOMAIN].pop(entry.entry_id)
+        coordinator = hass.data[DOMAIN].pop(entry.entry_id)
+        await coordinator.async_shutdown_device()
     
     return unload_ok
 
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Forget the stored DPS schema and statistics of a removed device"""
+    await async_remove_schema(hass, entry.data[CONF_DEVICE_ID])
+    await async_remove_partial_hour(hass, entry.data[CONF_DEVICE_ID])
+
 class TuyaDataUpdateCoordinator(DataUpdateCoordinator):
     """Data update coordinator for Tuya device"""
     
     def __init__(self, hass: HomeAssistant, device_id: str, local_key: str, host: str, 
                  protocol_version: float = DEFAULT_PROTOCOL_VERSION, 
-                 scan_interval: int = DEFAULT_SCAN_INTERVAL):
+                 scan_interval: int = DEFAULT_SCAN_INTERVAL,
+                 push_mode: bool = DEFAULT_PUSH_MODE,
+                 priority: int = DEFAULT_PRIORITY,
+                 adaptive_polling: bool = DEFAULT_ADAPTIVE_POLLING,
+                 min_scan_interval: int = DEFAULT_MIN_SCAN_INTERVAL,
+                 max_scan_interval: int = DEFAULT_MAX_SCAN_INTERVAL,
+                 rolling_statistics: bool = DEFAULT_ROLLING_STATISTICS,
+                 calcium_hardness: int = DEFAULT_CALCIUM_HARDNESS,
+                 total_alkalinity: int = DEFAULT_TOTAL_ALKALINITY,
+                 outlier_filter: str = DEFAULT_OUTLIER_FILTER,
+                 statistics_import: bool = DEFAULT_STATISTICS_IMPORT,
+                 archive: bool = DEFAULT_ARCHIVE,
+                 device_name: str = "Tuya 8-in-1 Tester",
+                 dps_schema: Optional[DpsSchema] = None):
         """Initialize coordinator"""
         self.device_id = device_id
         self.local_key = local_key
         self.host = host
         self.protocol_version = protocol_version
+        self.push_mode = push_mode
+        self.priority = priority
         self.device = None
         
+        # Sensors of the DPS this device has, everything below is built from them
+        self.dps_schema = dps_schema
+        self.sensor_types = schema_sensor_types(dps_schema)
+        self.derived_sensor_types = schema_derived_types(self.sensor_types)
+        sensor_types = self.sensor_types
+        all_sensor_types = {**self.sensor_types, **self.derived_sensor_types}
+        
+        self._last_heartbeat = 0.0
+        self.push_task: Optional[asyncio.Task] = None
+        # Monotonic time of the last pushed DPS update, lets the scheduler skip polls
+        self.last_push_update = 0.0
+        
+        # In push mode polling is only a slow consistency check
+        if push_mode:
+            scan_interval = max(scan_interval, PUSH_CONSISTENCY_INTERVAL)
+        self._scan_interval = scan_interval
+        self.poll_interval = timedelta(seconds=scan_interval)
+        
+        # Adaptive polling follows the readings - not useful when the device pushes them
+        self._adaptive = None
+        if adaptive_polling and not push_mode:
+            self._adaptive = AdaptiveInterval(
+                scan_interval,
+                min_scan_interval,
+                max_scan_interval,
+                {
+                    sensor_key: sensor_config["fast_rate"]
+                    for sensor_key, sensor_config in sensor_types.items()
+                    if "fast_rate" in sensor_config
+                },
+            )
+            self.poll_interval = timedelta(seconds=self._adaptive.interval)
+        
+        # Unreachable devices only get a TCP probe until they answer again
+        self.breaker = CircuitBreaker(
+            BREAKER_FAILURE_THRESHOLD, BREAKER_BASE_DELAY, BREAKER_MAX_DELAY
+        )
+        
+        # Rolling min/max/mean/std/rate per sensor, shown as attributes
+        self.history = (
+            SensorHistory(all_sensor_types, HISTORY_WINDOWS)
+            if rolling_statistics else None
+        )
+        
+        # Hourly statistics imported in bulk instead of compiled from states
+        self.long_term = (
+            LongTermStatistics(hass, device_id, device_name, all_sensor_types)
+            if statistics_import else None
+        )
+        
+        # Decoded readings appended to a binary file per day, written in batches
+        self.archive = None
+        self._archive_write = None
+        self._archive_flushed = time.monotonic()
+        if archive:
+            self.archive = ReadingArchive(
+                hass.config.path(ARCHIVE_DIRECTORY, slugify(device_id)), sensor_types
+            )
+        
+        # Latency breakdown and counters for the diagnostic sensors
+        self.stats = PollStats(STATS_WINDOW)
+        
+        # Sensor table compiled once - keeps per-poll decoding to dict lookups
+        self._decode_table = compile_decode_table(sensor_types)
+        
+        # Spike filter per sensor, entities show the filtered value and the
+        # last decoded one (raw_data) as the raw_value attribute
+        self.filters = None
+        self.raw_data: dict = {}
+        if outlier_filter != FILTER_NONE:
+            self.filters = SensorFilters(
+                sensor_types, outlier_filter, FILTER_WINDOW, FILTER_EWMA_ALPHA, FILTER_HAMPEL_THRESHOLD
+            )
+        
+        # Derived metrics, LSI needs water parameters the tester cannot measure
+        self._derive_table = compile_derive_table(self.derived_sensor_types)
+        self._derive_params = {
+            "calcium_hardness": calcium_hardness,
+            "total_alkalinity": total_alkalinity,
+        }
+        
+        # No own timer - the shared TuyaPollScheduler drives refreshes
         super().__init__(
             hass,
             _LOGGER,
             name=DOMAIN,
-            update_interval=timedelta(seconds=scan_interval),
+            update_interval=None,
         )
     
-    async def _setup_device(self):
+    def _setup_device(self):
         """Configure device connection"""
         if self.device is None:
-            try:
-                import tinytuya
-                _LOGGER.info(f"Configuring Tuya device...")
-                _LOGGER.info(f"Device ID: {self.device_id}")
-                _LOGGER.info(f"Host: {self.host}")
-                _LOGGER.info(f"Protocol: {self.protocol_version}")
-                
-                self.device = tinytuya.Device(
-                    dev_id=self.device_id,
-                    address=self.host,
-                    local_key=self.local_key,
-                    version=self.protocol_version  # Use configurable version
-                )
-                
-                # Settings for problematic connections
-                self.device.set_socketTimeout(15)  # 15s timeout
-                self.device.set_socketRetryLimit(3)  # 3 attempts
-                self.device.set_socketRetryDelay(2)  # 2s between attempts
-                
-                _LOGGER.info(f"✅ Configured Tuya device: {self.device_id} (protocol {self.protocol_version})")
-                _LOGGER.info(f"🌐 Network: HA(192.168.20.174) -> Device({self.host}:6668)")
-                
-                # Connection test with additional diagnostics
-                try:
-                    _LOGGER.info("🔍 Testing connection...")
-                    test_data = await self.hass.async_add_executor_job(self.device.status)
-                    
-                    if test_data and 'dps' in test_data:
-                        _LOGGER.info(f"🎯 Connection test OK - received {len(test_data['dps'])} DPS")
-                        _LOGGER.debug(f"📊 Test DPS data: {test_data['dps']}")
-                    elif test_data and 'Error' in test_data:
-                        error_code = test_data.get('Err', 'Unknown')
-                        error_msg = test_data.get('Error', 'Unknown error')
-                        _LOGGER.error(f"❌ Test - device error: {error_msg} (code: {error_code})")
-                        # Don't raise exception, might work in actual use
-                    else:
-                        _LOGGER.warning(f"⚠️ Connection test - incomplete data: {test_data}")
-                        
-                except Exception as test_e:
-                    _LOGGER.warning(f"⚠️ Connection test failed: {test_e}")
-                    _LOGGER.warning(f"📋 Error type: {type(test_e).__name__}")
-                    # Continue despite test error - might work in real use
-                    
-            except Exception as e:
-                _LOGGER.error(f"❌ Device connection error: {e}")
-                raise UpdateFailed(f"Connection error: {e}")
+            _LOGGER.info(f"Configuring Tuya device...")
+            _LOGGER.info(f"Device ID: {self.device_id}")
+            _LOGGER.info(f"Host: {self.host}")
+            _LOGGER.info(f"Protocol: {self.protocol_version}")
+            
+            # One socket and session key reused across polls (and DPS
+            # updates in push mode), renegotiated when the device drops it
+            # Shared with the config and options flows through the registry
+            self.device = async_get_registry(self.hass).async_acquire(
+                self.device_id,
+                self.local_key,
+                self.host,
+                version=self.protocol_version,  # Use configurable version
+                timeout=DEVICE_TIMEOUT,
+                retries=DEVICE_RETRIES,
+                persistent=True,
+                session_ttl=SESSION_TTL,
+            )
+            
+            _LOGGER.info(f"✅ Configured Tuya device: {self.device_id} (protocol {self.protocol_version})")
+            _LOGGER.info(f"🌐 Network: HA(192.168.20.174) -> Device({self.host}:6668)")
+            # No separate connection test - the first poll is the test
     
     async def _async_update_data(self):
         """Fetch data from device"""
-        await self._setup_device()
+        if self.breaker.is_open:
+            await self._async_probe()
         
-        if self.device is None:
-            raise UpdateFailed("Device was not configured")
+        self._setup_device()
+        # Local reference - a discovered address change may swap self.device mid-poll
+        device = self.device
         
         try:
-            _LOGGER.debug(f"🔄 Attempting connection to {self.host} from HA IP...")
-            
-            # Additional settings before each connection
-            self.device.set_socketTimeout(20)  # Even longer timeout
-            self.device.set_socketRetryLimit(3)  # Fewer attempts, but faster
-            
-            # Add detailed logging before connection
-            _LOGGER.info(f"🌐 Connecting: HA(192.168.20.174) -> Tuya({self.host}:6668)")
-            _LOGGER.info(f"🔑 Device ID: {self.device_id}, Protocol: {self.protocol_version}")
+            # Per-poll logging uses lazy %-args, nothing is formatted when the level is off
+            _LOGGER.info("🌐 Connecting: HA(192.168.20.174) -> Tuya(%s:6668)", self.host)
+            _LOGGER.info("🔑 Device ID: %s, Protocol: %s", self.device_id, device.version)
             
             # Get device status
-            data = await self.hass.async_add_executor_job(self.device.status)
-            
-            _LOGGER.debug(f"📦 Received response: {data}")
-            
-            if not data:
-                _LOGGER.warning("❌ No response from device")
-                raise UpdateFailed("No response from device")
+            started = time.perf_counter()
+            data = await device.async_status()
             
-            if 'Error' in data:
-                error_msg = data.get('Error', 'Unknown error')
-                error_code = data.get('Err', 'Unknown')
-                _LOGGER.error(f"❌ Device error: {error_msg} (code: {error_code})")
-                raise UpdateFailed(f"Device error: {error_msg}")
+            _LOGGER.debug("📦 Received response: %s", data)
             
             if 'dps' not in data:
                 _LOGGER.warning(f"⚠️ No DPS data from device. Received: {data}")
                 raise UpdateFailed("No DPS data from device")
             
-            # Map DPS data to sensor names
-            mapped_data = {}
-            dps_data = data['dps']
+            if self.dps_schema is None or not self.dps_schema.keys() >= data['dps'].keys():
+                self._update_schema(data['dps'])
             
-            _LOGGER.debug(f"📊 Received DPS data: {dps_data}")
+            # Map DPS data to sensor names, filter spikes and compute the derived metrics
+            mapping_started = time.perf_counter()
+            mapped_data = self._filter(self._map_dps(data['dps']))
+            mapped_data.update(self._derive(mapped_data))
+            finished = time.perf_counter()
+            self.stats.record_poll(
+                {**device.timings, "mapping": finished - mapping_started, "total": finished - started},
+                retries=device.attempts - 1,
+            )
             
-            for sensor_key, sensor_config in SENSOR_TYPES.items():
-                dps_id = sensor_config.get('dps_id')
-                if dps_id and str(dps_id) in dps_data:
-                    raw_value = dps_data[str(dps_id)]
-                    
-                    # Convert value if needed
-                    if 'scale' in sensor_config:
-                        value = raw_value / sensor_config['scale']
-                    else:
-                        value = raw_value
-                    
-                    mapped_data[sensor_key] = value
-                    _LOGGER.debug(f"✅ Mapped {sensor_key}: {raw_value} -> {value}")
-                else:
-                    _LOGGER.warning(f"⚠️ Missing DPS {dps_id} for sensor {sensor_key}")
+            _LOGGER.info("🎯 Fetched data: %s", mapped_data)
+            if self.data is None:
+                _LOGGER.info(f"🎯 First contact with {self.device_id} OK - received {len(data['dps'])} DPS")
             
-            _LOGGER.info(f"🎯 Fetched data: {mapped_data}")
+            self.breaker.record_success()
+            if self._adaptive is not None:
+                self._adaptive.on_success(mapped_data)
+            self._update_poll_interval()
+            if self.history is not None:
+                self.history.add(time.monotonic(), mapped_data)
+            if self.long_term is not None:
+                self.long_term.add(dt_util.utcnow(), mapped_data)
+            if self.archive is not None:
+                self._archive_reading()
             return mapped_data
             
-        except Exception as e:
-            _LOGGER.error(f"❌ Data fetch error: {e}")
-            _LOGGER.error(f"📍 Host: {self.host}, Device ID: {self.device_id}")
+        except TuyaError as e:
+            self._record_failure(device, e)
             raise UpdateFailed(f"Update error: {e}")
+        except (TypeError, ValueError, KeyError) as e:
+            # Malformed or non-numeric DPS in the reply
+            self._record_failure(device, e)
+            raise UpdateFailed(f"Invalid data from device: {e!r}")
+    
+    def _record_failure(self, device: TuyaLocalClient, error: Exception):
+        """Count a failed poll in the stats, adaptive interval and breaker"""
+        self.stats.record_failure(retries=device.attempts - 1)
+        if self._adaptive is not None:
+            self._adaptive.on_failure()
+        if self.breaker.record_failure():
+            _LOGGER.warning(
+                f"⛔ {self.device_id} ({self.host}) unreachable after "
+                f"{self.breaker.failures} attempts, next probe in {self.breaker.delay:g}s: {error}"
+            )
+        elif self.breaker.failures < BREAKER_FAILURE_THRESHOLD:
+            _LOGGER.error(f"❌ Data fetch error: {error}")
+            _LOGGER.error(f"📍 Host: {self.host}, Device ID: {self.device_id}")
+        self._update_poll_interval()
+    
+    async def _async_probe(self):
+        """Send the reachability probe while the breaker is open"""
+        reachable = await async_probe(self.host, timeout=PROBE_TIMEOUT)
+        self.breaker.record_probe(reachable)
+        if not reachable:
+            self._update_poll_interval()
+            _LOGGER.debug(f"🔌 Probe {self.host}:6668 failed, next in {self.breaker.delay:g}s")
+            raise UpdateFailed(f"Device {self.host} unreachable")
+        _LOGGER.info(f"🔌 {self.device_id} ({self.host}) reachable again, resuming polls")
+    
+    def _map_dps(self, dps_data: dict) -> dict:
+        """Map raw DPS values to sensor names, DPS not in the reply are skipped"""
+        return decode_dps(self._decode_table, dps_data)
+    
+    def _update_schema(self, dps_data: dict):
+        """Store DPS seen for the first time, reload when the entities change"""
+        self.dps_schema = {**(self.dps_schema or {}), **discover_schema(dps_data)}
+        _LOGGER.info(f"📋 DPS schema of {self.device_id}: {', '.join(self.dps_schema)}")
+        
+        reload = schema_sensor_types(self.dps_schema).keys() != self.sensor_types.keys() and self.config_entry
+        if reload:
+            _LOGGER.info(f"📋 Sensors of {self.device_id} changed, reloading")
+        self.hass.async_create_task(self._async_store_schema(dict(self.dps_schema), bool(reload)))
+    
+    async def _async_store_schema(self, schema: dict, reload: bool):
+        """Save the schema, then reload - the reloaded entry must read the saved file"""
+        await async_save_schema(self.hass, self.device_id, schema)
+        if reload:
+            await self.hass.config_entries.async_reload(self.config_entry.entry_id)
+    
+    def _filter(self, data: dict) -> dict:
+        """Keep the decoded readings and run them through the outlier filters"""
+        self.raw_data.update(data)
+        if self.filters is None:
+            return data
+        return self.filters.update(data)
+    
+    def _archive_reading(self):
+        """Append the decoded readings, writing the batch in the executor when due"""
+        self.archive.append(time.time(), self.raw_data)
+        now = time.monotonic()
+        if self._archive_write is not None and not self._archive_write.done():
+            return
+        if (
+            self.archive.pending_records >= ARCHIVE_FLUSH_RECORDS
+            or now - self._archive_flushed >= ARCHIVE_FLUSH_INTERVAL
+        ):
+            self._archive_flushed = now
+            self._archive_write = self.hass.async_add_executor_job(
+                self.archive.flush, self.archive.take()
+            )
+            self._archive_write.add_done_callback(self._archive_written)
+    
+    def _archive_written(self, write: asyncio.Future):
+        """Log a failed batch write, its readings are lost"""
+        if not write.cancelled() and write.exception() is not None:
+            _LOGGER.error(f"❌ Archive write for {self.device_id} failed: {write.exception()!r}")
+    
+    def _derive(self, data: dict) -> dict:
+        """Compute the derived metrics from a full set of readings"""
+        return derive(self._derive_table, data, self._derive_params)
+    
+    def _update_poll_interval(self):
+        """Set the interval the scheduler uses for the next poll"""
+        if self.breaker.is_open:
+            seconds = self.breaker.delay
+        elif self._adaptive is not None:
+            seconds = self._adaptive.interval
+        else:
+            seconds = self._scan_interval
+        interval = timedelta(seconds=seconds)
+        if interval != self.poll_interval:
+            _LOGGER.debug(f"⏱️ Poll interval for {self.device_id}: {self.poll_interval.total_seconds():g}s -> {seconds:g}s")
+            self.poll_interval = interval
+    
+    async def async_push_loop(self):
+        """Listen for DPS updates sent by the device on its own"""
+        _LOGGER.info(f"📡 Push mode started for {self.device_id} ({self.host})")
+        
+        while True:
+            # Reacquires the client after a discovered address change
+            self._setup_device()
+            device = self.device
+            
+            if self.breaker.is_open:
+                # Polls probe the device and close the breaker once it answers
+                await asyncio.sleep(PUSH_RECONNECT_DELAY)
+                continue
+            
+            try:
+                if time.monotonic() - self._last_heartbeat >= PUSH_HEARTBEAT_INTERVAL:
+                    await device.async_heartbeat()
+                    self._last_heartbeat = time.monotonic()
+                
+                data = await device.async_receive(PUSH_RECEIVE_TIMEOUT)
+            except TuyaError as e:
+                _LOGGER.debug(f"🔌 Push connection lost: {e}, reconnecting in {PUSH_RECONNECT_DELAY}s")
+                await asyncio.sleep(PUSH_RECONNECT_DELAY)
+                continue
+            
+            if not data or 'dps' not in data:
+                # Receive timeout or heartbeat reply - nothing new
+                continue
+            
+            try:
+                mapped_data = self._map_dps(data['dps'])
+            except (TypeError, ValueError, KeyError) as e:
+                # Skip the update, the next poll reports the bad data
+                _LOGGER.debug(f"📡 Invalid push update {data['dps']}: {e!r}")
+                continue
+            if not mapped_data:
+                continue
+            mapped_data = self._filter(mapped_data)
+            
+            _LOGGER.debug(f"📡 Push update: {mapped_data}")
+            # Scheduler postpones the consistency poll while pushes keep coming
+            self.last_push_update = time.monotonic()
+            # Derived metrics need the unchanged readings as well
+            data = {**(self.data or {}), **mapped_data}
+            derived = self._derive(data)
+            data.update(derived)
+            if self.history is not None:
+                self.history.add(self.last_push_update, {**mapped_data, **derived})
+            if self.long_term is not None:
+                self.long_term.add(dt_util.utcnow(), {**mapped_data, **derived})
+            if self.archive is not None:
+                self._archive_reading()
+            self.async_set_updated_data(data)
+    
+    async def async_set_host(self, host: str):
+        """Switch to a new device address, the next poll reconnects"""
+        device, self.device = self.device, None
+        self.host = host
+        if device is not None:
+            await async_get_registry(self.hass).async_release(device)
+        # Failures at the old address say nothing about the new one
+        self.breaker.record_success()
+        self._update_poll_interval()
+        async_get_scheduler(self.hass).async_poll_soon(self.device_id)
+    
+    async def async_shutdown_device(self):
+        """Close the device connection and write the buffered readings"""
+        if self.push_task is not None:
+            # The loop would reopen the connection released below
+            self.push_task.cancel()
+            await asyncio.wait((self.push_task,))
+            self.push_task = None
+        try:
+            if self.long_term is not None:
+                await self.long_term.async_flush()
+            if self.archive is not None:
+                if self._archive_write is not None:
+                    # A failed write was logged by _archive_written
+                    await asyncio.wait((self._archive_write,))
+                try:
+                    await self.hass.async_add_executor_job(self.archive.flush, self.archive.take())
+                except OSError as e:
+                    _LOGGER.error(f"❌ Archive write for {self.device_id} failed: {e!r}")
+        finally:
+            # The connection is released even when writing the readings failed
+            if self.device is not None:
+                await async_get_registry(self.hass).async_release(self.device)
+                self.device = None
@@ -0,0 +1,76 @@
+"""
+Adaptive poll interval for Tuya 8-in-1 devices
+Backs off while readings are steady, tightens when pH, ORP or temperature
+move fast, and backs off on consecutive failures.
+"""
+
+import logging
+import time
+from typing import Any, Optional
+
+_LOGGER = logging.getLogger(__name__)
+
+TIGHTEN_FACTOR = 0.5  # Interval multiplier when a sensor moves fast
+BACKOFF_FACTOR = 1.5  # Interval multiplier while everything is steady
+STEADY_RATIO = 0.25  # Below this fraction of "fast_rate" a sensor counts as steady
+
+
+class AdaptiveInterval:
+    """Poll interval driven by signal volatility and failures"""
+
+    def __init__(self, base: float, minimum: float, maximum: float,
+                 fast_rates: dict[str, float]):
+        """Initialize interval
+
+        fast_rates maps sensor keys to the change per minute that counts
+        as a fast-moving signal (see "fast_rate" in SENSOR_TYPES).
+        """
+        self.minimum = minimum
+        self.maximum = maximum
+        self.interval = min(max(base, minimum), maximum)
+        self.failures = 0
+        self._fast_rates = fast_rates
+        self._previous: Optional[dict[str, Any]] = None
+        self._previous_time = 0.0
+
+    def on_success(self, data: dict[str, Any], now: Optional[float] = None) -> float:
+        """Adjust after a successful poll, returns the new interval"""
+        now = time.monotonic() if now is None else now
+        self.failures = 0
+
+        ratio = self._volatility(data, now)
+        self._previous = data
+        self._previous_time = now
+
+        if ratio is None:
+            return self.interval
+        if ratio >= 1:
+            self.interval = max(self.minimum, self.interval * TIGHTEN_FACTOR)
+        elif ratio < STEADY_RATIO:
+            self.interval = min(self.maximum, self.interval * BACKOFF_FACTOR)
+        return self.interval
+
+    def on_failure(self) -> float:
+        """Back off exponentially on consecutive failures"""
+        self.failures += 1
+        self.interval = min(self.maximum, self.interval * 2)
+        return self.interval
+
+    def _volatility(self, data: dict[str, Any], now: float) -> Optional[float]:
+        """Return the highest rate / fast_rate ratio, None without a previous sample"""
+        if self._previous is None:
+            return None
+
+        minutes = (now - self._previous_time) / 60
+        if minutes <= 0:
+            return None
+
+        ratio = 0.0
+        for sensor_key, fast_rate in self._fast_rates.items():
+            value = data.get(sensor_key)
+            previous = self._previous.get(sensor_key)
+            if value is None or previous is None:
+                continue
+            rate = abs(value - previous) / minutes
+            ratio = max(ratio, rate / fast_rate)
+        return ratio
@@ -0,0 +1,223 @@
+"""
+Append-only reading archive for Tuya 8-in-1 devices
+Columnar binary files per device and UTC day: one directory per day with
+columns.json, timestamp.f8 (float64 Unix time) and <sensor>.f4 (float32,
+NaN when missing) for every sensor. Each column is a flat little-endian
+array, so a reader memory-maps exactly the columns it needs and scanning
+one sensor touches only that sensor's bytes.
+
+The module only needs NumPy for reading and does not import Home
+Assistant, so lab scripts can load it by file path:
+
+    spec = importlib.util.spec_from_file_location("archive", ".../archive.py")
+    archive = importlib.util.module_from_spec(spec); spec.loader.exec_module(archive)
+    data = archive.read_archive("/config/tuya_8in1_archive/<device_id>", start, end, ["ph"])
+    data["timestamp"], data["ph"]
+"""
+
+import json
+import math
+import os
+import sys
+from array import array
+from datetime import datetime, timezone
+from typing import Any, Optional
+
+COLUMNS_FILE = "columns.json"
+TIMESTAMP = "timestamp"
+TIMESTAMP_SUFFIX = ".f8"
+VALUE_SUFFIX = ".f4"
+
+
+def _day(timestamp: float) -> str:
+    return datetime.fromtimestamp(timestamp, timezone.utc).strftime("%Y-%m-%d")
+
+
+def _read_columns(path: str) -> list[str]:
+    with open(os.path.join(path, COLUMNS_FILE), encoding="utf-8") as file:
+        return json.load(file)["columns"]
+
+
+def _write(file, values: array):
+    """Append an array in little-endian byte order"""
+    if sys.byteorder == "big":
+        values = array(values.typecode, values)
+        values.byteswap()
+    values.tofile(file)
+
+
+def _truncate(path: str, columns):
+    """Realign the columns after an interrupted flush
+
+    A torn write leaves a partial record at the end of a file: the
+    timestamps are cut to whole records and the value columns to their
+    length, a value column left shorter is padded with NaN.
+    """
+    times_path = os.path.join(path, TIMESTAMP + TIMESTAMP_SUFFIX)
+    count = os.path.getsize(times_path) // 8 if os.path.exists(times_path) else 0
+    if os.path.exists(times_path) and os.path.getsize(times_path) > count * 8:
+        os.truncate(times_path, count * 8)
+    for column in columns:
+        column_path = os.path.join(path, column + VALUE_SUFFIX)
+        size = os.path.getsize(column_path) if os.path.exists(column_path) else 0
+        if size > count * 4:
+            os.truncate(column_path, count * 4)
+        elif size < count * 4:
+            if size % 4:
+                os.truncate(column_path, size // 4 * 4)
+            with open(column_path, "ab") as file:
+                _write(file, array("f", [math.nan]) * (count - size // 4))
+
+
+class _Batch:
+    """Readings of one day not written yet, one array per column"""
+
+    def __init__(self, columns):
+        self.timestamps = array("d")
+        self.values = {column: array("f") for column in columns}
+
+
+class ReadingArchive:
+    """Buffers readings and appends them to the files of their day
+
+    append() only buffers, flush() does the file I/O and belongs in an
+    executor.
+    """
+
+    def __init__(self, directory: str, columns):
+        """Initialize archive, columns are the sensor keys"""
+        self.directory = directory
+        self.columns = tuple(columns)
+        self._pending: dict[str, _Batch] = {}
+        self._paths: dict[str, str] = {}
+
+    @property
+    def pending_records(self) -> int:
+        """Number of readings waiting for flush()"""
+        return sum(len(batch.timestamps) for batch in self._pending.values())
+
+    def append(self, timestamp: float, data: dict[str, Any]):
+        """Buffer one reading, missing or non-numeric sensors are stored as NaN"""
+        day = _day(timestamp)
+        batch = self._pending.get(day)
+        if batch is None:
+            batch = self._pending[day] = _Batch(self.columns)
+        batch.timestamps.append(timestamp)
+        for column, values in batch.values.items():
+            value = data.get(column)
+            values.append(value if isinstance(value, (int, float)) else math.nan)
+
+    def take(self) -> dict[str, _Batch]:
+        """Hand over the buffered readings, call flush() with them outside the loop"""
+        pending, self._pending = self._pending, {}
+        return pending
+
+    def flush(self, pending: Optional[dict[str, _Batch]] = None):
+        """Append buffered readings, rotating to a new directory per day"""
+        if pending is None:
+            pending = self.take()
+        for day, batch in sorted(pending.items()):
+            path = self._path(day)
+            # Values first - a crash in between leaves the timestamps
+            # column shortest, and readers cut every column to its length
+            for column, values in batch.values.items():
+                with open(os.path.join(path, column + VALUE_SUFFIX), "ab") as file:
+                    _write(file, values)
+            with open(os.path.join(path, TIMESTAMP + TIMESTAMP_SUFFIX), "ab") as file:
+                _write(file, batch.timestamps)
+
+    def _path(self, day: str) -> str:
+        """Directory of a day, a new one when an existing one has other columns"""
+        path = self._paths.get(day)
+        if path is not None:
+            return path
+        path = os.path.join(self.directory, day)
+        index = 0
+        while os.path.exists(os.path.join(path, COLUMNS_FILE)):
+            if _read_columns(path) == list(self.columns):
+                _truncate(path, self.columns)
+                break
+            index += 1
+            path = os.path.join(self.directory, f"{day}_{index}")
+        else:
+            os.makedirs(path, exist_ok=True)
+            with open(os.path.join(path, COLUMNS_FILE), "w", encoding="utf-8") as file:
+                json.dump({"columns": list(self.columns)}, file)
+        # Only the current day is ever written again
+        self._paths = {day: path}
+        return path
+
+
+def iter_archive(directory: str, start: float, end: float, columns=None):
+    """Yield {"timestamp": array, sensor: array, ...} per day directory
+
+    Arrays are memory-mapped and cut to start <= timestamp < end with a
+    binary search, nothing is copied. Sensors missing from a directory are
+    left out of its dict, a column left short by a torn flush is padded
+    with NaN (copied).
+    """
+    import numpy as np
+
+    first_day, last_day = _day(start), _day(end)
+    names = sorted(
+        name for name in (os.listdir(directory) if os.path.isdir(directory) else ())
+        if first_day <= name[:10] <= last_day
+        and os.path.exists(os.path.join(directory, name, COLUMNS_FILE))
+    )
+    for name in names:
+        path = os.path.join(directory, name)
+        available = _read_columns(path)
+        wanted = [column for column in (columns or available) if column in available]
+
+        # Sizes are floored to whole records, a torn flush may have left
+        # a partial one behind, and an empty file cannot be mapped
+        times_path = os.path.join(path, TIMESTAMP + TIMESTAMP_SUFFIX)
+        count = os.path.getsize(times_path) // 8 if os.path.exists(times_path) else 0
+        if count == 0:
+            continue
+        times = np.memmap(times_path, dtype="<f8", mode="r", shape=(count,))
+        lo, hi = np.searchsorted(times, start, "left"), np.searchsorted(times, end, "left")
+        if hi <= lo:
+            continue
+
+        segment = {TIMESTAMP: times[lo:hi]}
+        for column in wanted:
+            column_path = os.path.join(path, column + VALUE_SUFFIX)
+            length = min(os.path.getsize(column_path) // 4 if os.path.exists(column_path) else 0, hi)
+            if length <= lo:
+                continue
+            values = np.memmap(column_path, dtype="<f4", mode="r", shape=(length,))
+            if length < hi:
+                segment[column] = np.concatenate((values[lo:], np.full(hi - length, np.nan, "<f4")))
+            else:
+                segment[column] = values[lo:hi]
+        yield segment
+
+
+def read_archive(directory: str, start: float, end: float, columns=None) -> dict[str, Any]:
+    """Return {"timestamp": array, sensor: array, ...} for start <= t < end
+
+    Only the requested columns (default: all) are read. A range within one
+    day returns views of the mappings, longer ranges are concatenated.
+    Sensors missing on some days are NaN there.
+    """
+    import numpy as np
+
+    segments = list(iter_archive(directory, start, end, columns))
+    if columns is None:
+        columns = []
+        for segment in segments:
+            columns.extend(name for name in segment if name != TIMESTAMP and name not in columns)
+
+    result = {}
+    for column in (TIMESTAMP, *columns):
+        parts = [
+            segment[column] if column in segment
+            else np.full(len(segment[TIMESTAMP]), np.nan, "<f4")
+            for segment in segments
+        ]
+        if not parts:
+            result[column] = np.empty(0, "<f8" if column == TIMESTAMP else "<f4")
+        else:
+            result[column] = parts[0] if len(parts) == 1 else np.concatenate(parts)
+    return result
@@ -0,0 +1,62 @@
+"""
+Per-device circuit breaker for Tuya 8-in-1 devices
+After repeated failures the breaker opens and only a cheap TCP probe is
+sent, with exponential backoff, until the device answers again.
+"""
+
+import logging
+
+_LOGGER = logging.getLogger(__name__)
+
+STATE_CLOSED = "closed"  # Normal polling
+STATE_OPEN = "open"  # Device unreachable - probes only
+STATE_HALF_OPEN = "half_open"  # Probe succeeded - next full request decides
+
+
+class CircuitBreaker:
+    """Closed / open / half-open breaker with exponential probe backoff"""
+
+    def __init__(self, failure_threshold: int, base_delay: float, max_delay: float):
+        """Initialize breaker"""
+        self.failure_threshold = failure_threshold
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.state = STATE_CLOSED
+        self.failures = 0
+        self.delay = base_delay
+
+    @property
+    def is_open(self) -> bool:
+        """Return True while full requests are blocked"""
+        return self.state == STATE_OPEN
+
+    def record_success(self):
+        """Full request succeeded - close the breaker"""
+        if self.state != STATE_CLOSED:
+            _LOGGER.debug(f"Circuit {self.state} -> closed")
+        self.state = STATE_CLOSED
+        self.failures = 0
+        self.delay = self.base_delay
+
+    def record_failure(self) -> bool:
+        """Full request failed, returns True if this opened the breaker"""
+        self.failures += 1
+        if self.state == STATE_HALF_OPEN:
+            # Port answered but the device did not - keep backing off
+            self._open(min(self.max_delay, self.delay * 2))
+            return False
+        if self.state == STATE_CLOSED and self.failures >= self.failure_threshold:
+            self._open(self.base_delay)
+            return True
+        return False
+
+    def record_probe(self, reachable: bool):
+        """Apply the result of a reachability probe"""
+        if reachable:
+            self.state = STATE_HALF_OPEN
+        else:
+            self.delay = min(self.max_delay, self.delay * 2)
+
+    def _open(self, delay: float):
+        self.state = STATE_OPEN
+        self.delay = delay
@@ -0,0 +1,704 @@
+"""
+Asyncio client for the Tuya local (LAN) protocol 3.3 / 3.4 / 3.5
+Talks to the device over asyncio streams - no executor threads, every
+request is bounded by a cancellable timeout.
+
+Module has no Home Assistant imports so tools outside HA can load it.
+"""
+
+import asyncio
+import binascii
+import hmac
+import json
+import logging
+import os
+import struct
+import time
+from collections import deque
+from dataclasses import dataclass
+from hashlib import md5, sha256
+from typing import Any, Optional
+
+from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+
+_LOGGER = logging.getLogger(__name__)
+
+DEFAULT_PORT = 6668
+DEFAULT_TIMEOUT = 10
+DEFAULT_RETRIES = 1
+DEFAULT_RETRY_DELAY = 1
+
+# Versions tried, in order, when the configured one fails the handshake
+PROTOCOL_VERSIONS = (3.5, 3.4, 3.3)
+# Seconds before versions that all failed are tried again
+FALLBACK_RETRY_INTERVAL = 3600
+
+# Frame layout
+PREFIX_55AA = 0x000055AA
+SUFFIX_55AA = 0x0000AA55
+PREFIX_6699 = 0x00006699
+SUFFIX_6699 = 0x00009966
+PREFIX_55AA_BIN = struct.pack(">I", PREFIX_55AA)
+PREFIX_6699_BIN = struct.pack(">I", PREFIX_6699)
+SUFFIX_6699_BIN = struct.pack(">I", SUFFIX_6699)
+HEADER_FMT_55AA = ">4I"  # prefix, seqno, cmd, length
+HEADER_FMT_6699 = ">IHIII"  # prefix, reserved, seqno, cmd, length
+RETCODE_FMT = ">I"
+MAX_FRAME_LENGTH = 0x10000  # Anything larger is a desynced stream
+
+# Command types
+SESS_KEY_NEG_START = 3
+SESS_KEY_NEG_RESP = 4
+SESS_KEY_NEG_FINISH = 5
+CONTROL = 7
+STATUS = 8
+HEART_BEAT = 9
+DP_QUERY = 10
+CONTROL_NEW = 13
+DP_QUERY_NEW = 16
+UPDATEDPS = 18
+
+# Commands sent without the "3.x" + 12 zero bytes version header
+NO_PROTOCOL_HEADER_CMDS = (
+    DP_QUERY, DP_QUERY_NEW, UPDATEDPS, HEART_BEAT,
+    SESS_KEY_NEG_START, SESS_KEY_NEG_RESP, SESS_KEY_NEG_FINISH,
+)
+PROTOCOL_HEADER_PADDING = 12 * b"\x00"
+
+# Unsolicited STATUS frames kept for the next receive()
+MAX_PENDING_UPDATES = 32
+
+# Discovery beacons - broadcast port -> frame version. 6666 is plain JSON,
+# 6667 AES-ECB and 7000 (protocol 3.5 devices) AES-GCM, all with one fixed key
+DISCOVERY_PORTS = {6666: 3.1, 6667: 3.3, 7000: 3.5}
+UDP_KEY = md5(b"yGAdlopoPVldABfn").digest()
+UDP_NEW = 0x13
+
+
+class TuyaError(Exception):
+    """Base error for the local client"""
+
+
+class TuyaConnectionError(TuyaError):
+    """Device unreachable, connection dropped or timed out"""
+
+
+class TuyaProtocolError(TuyaError):
+    """Malformed frame, failed decryption or rejected handshake"""
+
+
+class TuyaAuthError(TuyaProtocolError):
+    """Device does not accept the local key"""
+
+
+@dataclass
+class TuyaMessage:
+    """Single decoded frame"""
+    seqno: int
+    cmd: int
+    retcode: Optional[int]
+    payload: bytes
+
+
+def version_header(version: float) -> bytes:
+    """Return the protocol header prepended to control payloads"""
+    return f"{version:.1f}".encode() + PROTOCOL_HEADER_PADDING
+
+
+# --- Crypto helpers ---
+
+def _pad(data: bytes) -> bytes:
+    padnum = 16 - len(data) % 16
+    return data + bytes([padnum]) * padnum
+
+
+def _unpad(data: bytes) -> bytes:
+    if not data:
+        return data
+    padnum = data[-1]
+    if padnum < 1 or padnum > 16:
+        raise TuyaProtocolError("Invalid padding")
+    return data[:-padnum]
+
+
+def aes_ecb_encrypt(key: bytes, data: bytes, pad: bool = True) -> bytes:
+    """AES-128-ECB, used by 3.3 and 3.4"""
+    if pad:
+        data = _pad(data)
+    encryptor = Cipher(algorithms.AES(key), modes.ECB()).encryptor()
+    return encryptor.update(data) + encryptor.finalize()
+
+
+def aes_ecb_decrypt(key: bytes, data: bytes, unpad: bool = True) -> bytes:
+    """Reverse of aes_ecb_encrypt"""
+    if len(data) % 16:
+        raise TuyaProtocolError(f"Encrypted payload length {len(data)} is not a multiple of 16")
+    decryptor = Cipher(algorithms.AES(key), modes.ECB()).decryptor()
+    data = decryptor.update(data) + decryptor.finalize()
+    return _unpad(data) if unpad else data
+
+
+def aes_gcm_encrypt(key: bytes, iv: bytes, data: bytes, aad: bytes = b"") -> tuple[bytes, bytes]:
+    """AES-GCM used by 3.5, returns (ciphertext, tag)"""
+    encryptor = Cipher(algorithms.AES(key), modes.GCM(iv)).encryptor()
+    if aad:
+        encryptor.authenticate_additional_data(aad)
+    ciphertext = encryptor.update(data) + encryptor.finalize()
+    return ciphertext, encryptor.tag
+
+
+def aes_gcm_decrypt(key: bytes, iv: bytes, data: bytes, tag: bytes, aad: bytes = b"") -> bytes:
+    """Reverse of aes_gcm_encrypt, raises TuyaProtocolError on a bad tag"""
+    decryptor = Cipher(algorithms.AES(key), modes.GCM(iv, tag)).decryptor()
+    if aad:
+        decryptor.authenticate_additional_data(aad)
+    try:
+        return decryptor.update(data) + decryptor.finalize()
+    except Exception as e:
+        raise TuyaProtocolError("GCM authentication failed") from e
+
+
+# --- Framing ---
+
+def pack_message(version: float, key: bytes, seqno: int, cmd: int, payload: bytes,
+                 retcode: Optional[int] = None) -> bytes:
+    """Build one frame from an already encoded payload
+
+    3.5 payloads are encrypted here (GCM authenticates the header), 3.3/3.4
+    payloads must be encrypted by the caller. retcode is only set by devices.
+    """
+    if version >= 3.5:
+        raw = payload if retcode is None else struct.pack(RETCODE_FMT, retcode) + payload
+        length = 12 + len(raw) + 16
+        header = struct.pack(HEADER_FMT_6699, PREFIX_6699, 0, seqno, cmd, length)
+        iv = os.urandom(12)
+        ciphertext, tag = aes_gcm_encrypt(key, iv, raw, header[4:])
+        return header + iv + ciphertext + tag + SUFFIX_6699_BIN
+
+    if retcode is not None:
+        payload = struct.pack(RETCODE_FMT, retcode) + payload
+    end_len = 36 if version >= 3.4 else 8
+    header = struct.pack(HEADER_FMT_55AA, PREFIX_55AA, seqno, cmd, len(payload) + end_len)
+    data = header + payload
+    if version >= 3.4:
+        return data + hmac.new(key, data, sha256).digest() + struct.pack(">I", SUFFIX_55AA)
+    return data + struct.pack(">2I", binascii.crc32(data) & 0xFFFFFFFF, SUFFIX_55AA)
+
+
+def header_length(prefix: bytes) -> int:
+    """Return the fixed header size for a frame prefix"""
+    if prefix == PREFIX_55AA_BIN:
+        return struct.calcsize(HEADER_FMT_55AA)
+    if prefix == PREFIX_6699_BIN:
+        return struct.calcsize(HEADER_FMT_6699)
+    raise TuyaProtocolError(f"Unknown frame prefix {prefix.hex()}")
+
+
+def remaining_length(header: bytes) -> int:
+    """Return how many bytes follow a complete header"""
+    if header[:4] == PREFIX_6699_BIN:
+        length = struct.unpack(HEADER_FMT_6699, header)[4] + len(SUFFIX_6699_BIN)
+    else:
+        length = struct.unpack(HEADER_FMT_55AA, header)[3]
+    if length > MAX_FRAME_LENGTH:
+        raise TuyaProtocolError(f"Frame claims {length} bytes - stream is corrupt")
+    return length
+
+
+def unpack_message(version: float, key: bytes, data: bytes, has_retcode: bool = True) -> TuyaMessage:
+    """Parse and authenticate one complete frame
+
+    Returns the payload still encrypted for 3.3/3.4 (see decrypt_payload),
+    already decrypted for 3.5. Frames sent by clients have no retcode.
+    """
+    if data[:4] == PREFIX_6699_BIN:
+        header_len = struct.calcsize(HEADER_FMT_6699)
+        if len(data) < header_len:
+            raise TuyaProtocolError("Truncated 6699 header")
+        _, _, seqno, cmd, length = struct.unpack(HEADER_FMT_6699, data[:header_len])
+        if length < 28 or len(data) < header_len + length + 4:
+            raise TuyaProtocolError("Truncated 6699 frame")
+        iv = data[header_len:header_len + 12]
+        tag = data[header_len + length - 16:header_len + length]
+        ciphertext = data[header_len + 12:header_len + length - 16]
+        payload = aes_gcm_decrypt(key, iv, ciphertext, tag, data[4:header_len])
+        retcode = None
+        if has_retcode and len(payload) >= 4:
+            retcode = struct.unpack(RETCODE_FMT, payload[:4])[0]
+            payload = payload[4:]
+        return TuyaMessage(seqno, cmd, retcode, payload)
+
+    if data[:4] != PREFIX_55AA_BIN:
+        raise TuyaProtocolError(f"Unknown frame prefix {data[:4].hex()}")
+
+    header_len = struct.calcsize(HEADER_FMT_55AA)
+    if len(data) < header_len:
+        raise TuyaProtocolError("Truncated 55AA header")
+    _, seqno, cmd, length = struct.unpack(HEADER_FMT_55AA, data[:header_len])
+    end_len = 36 if version >= 3.4 else 8
+    retcode_len = 4 if has_retcode else 0
+    if length < end_len + retcode_len or len(data) < header_len + length:
+        raise TuyaProtocolError("Truncated 55AA frame")
+
+    body_end = header_len + length - end_len
+    checksum = data[body_end:body_end + end_len - 4]
+    if version >= 3.4:
+        expected = hmac.new(key, data[:body_end], sha256).digest()
+    else:
+        expected = struct.pack(">I", binascii.crc32(data[:body_end]) & 0xFFFFFFFF)
+    if not hmac.compare_digest(checksum, expected):
+        raise TuyaProtocolError("Frame checksum mismatch")
+
+    retcode = None
+    if retcode_len:
+        retcode = struct.unpack(RETCODE_FMT, data[header_len:header_len + 4])[0]
+    return TuyaMessage(seqno, cmd, retcode, data[header_len + retcode_len:body_end])
+
+
+def encode_payload(version: float, key: bytes, cmd: int, payload: bytes) -> bytes:
+    """Add the version header where needed and encrypt (3.3/3.4)"""
+    if version >= 3.4:
+        if cmd not in NO_PROTOCOL_HEADER_CMDS:
+            payload = version_header(version) + payload
+        if version >= 3.5:
+            return payload  # Encrypted with GCM by pack_message
+        return aes_ecb_encrypt(key, payload)
+
+    payload = aes_ecb_encrypt(key, payload)
+    if cmd not in NO_PROTOCOL_HEADER_CMDS:
+        payload = version_header(version) + payload
+    return payload
+
+
+def decrypt_payload(version: float, key: bytes, payload: bytes) -> bytes:
+    """Decrypt a frame payload and strip the version header"""
+    if not payload:
+        return payload
+    header = version_header(version)
+    if version >= 3.5:
+        pass  # Already decrypted by unpack_message
+    elif version >= 3.4:
+        payload = aes_ecb_decrypt(key, payload)
+    else:
+        if payload.startswith(header[:3]):
+            payload = payload[len(header):]
+        payload = aes_ecb_decrypt(key, payload)
+    if payload.startswith(header[:3]):
+        payload = payload[len(header):]
+    return payload
+
+
+def decode_json(payload: bytes) -> dict:
+    """Decode a decrypted payload, lifting 3.4+ {"data": {"dps": ...}} to "dps" """
+    if not payload:
+        return {}
+    try:
+        data = json.loads(payload.decode())
+    except (UnicodeDecodeError, ValueError) as e:
+        raise TuyaProtocolError(f"Payload is not valid JSON: {payload[:32]!r}") from e
+    if not isinstance(data, dict):
+        raise TuyaProtocolError(f"Unexpected payload: {data!r}")
+    if "dps" not in data and isinstance(data.get("data"), dict) and "dps" in data["data"]:
+        data["dps"] = data["data"]["dps"]
+    # Callers read the DPS as a mapping, in status replies and pushes alike
+    if "dps" in data and not isinstance(data["dps"], dict):
+        raise TuyaProtocolError(f"Unexpected DPS: {data['dps']!r}")
+    return data
+
+
+def dumps(data: Any) -> bytes:
+    """Compact JSON - devices reject payloads with spaces"""
+    return json.dumps(data, separators=(",", ":")).encode()
+
+
+def session_key(version: float, local_key: bytes, local_nonce: bytes, remote_nonce: bytes) -> bytes:
+    """Derive the 3.4/3.5 session key from both nonces"""
+    xored = bytes(a ^ b for a, b in zip(local_nonce, remote_nonce))
+    if version >= 3.5:
+        ciphertext, _ = aes_gcm_encrypt(local_key, local_nonce[:12], xored)
+        return ciphertext[:16]
+    return aes_ecb_encrypt(local_key, xored, pad=False)
+
+
+def pack_beacon(version: float, payload: dict) -> bytes:
+    """Build a discovery beacon as sent by devices of a protocol version"""
+    data = dumps(payload)
+    if version >= 3.5:
+        return pack_message(version, UDP_KEY, 0, UDP_NEW, data, retcode=0)
+    if version >= 3.3:
+        data = aes_ecb_encrypt(UDP_KEY, data)
+    return pack_message(3.3, UDP_KEY, 0, UDP_NEW, data, retcode=0)
+
+
+def unpack_beacon(data: bytes) -> dict:
+    """Decode a discovery beacon, e.g. {"gwId": ..., "ip": ..., "version": "3.5"}"""
+    # 55AA beacons carry a CRC, no HMAC, whatever the device version
+    payload = unpack_message(3.5 if data[:4] == PREFIX_6699_BIN else 3.3, UDP_KEY, data, False).payload
+    # Retcode is optional, it is never the start of JSON or a full cipher block
+    if payload[:3] == b"\x00\x00\x00" and (payload[4:5] == b"{" or len(payload) % 16 == 4):
+        payload = payload[4:]
+    if data[:4] == PREFIX_55AA_BIN and not payload.startswith(b"{"):
+        payload = aes_ecb_decrypt(UDP_KEY, payload)
+    return decode_json(payload)
+
+
+async def read_frame(reader: asyncio.StreamReader) -> bytes:
+    """Read exactly one raw frame from the stream"""
+    prefix = await reader.readexactly(4)
+    header = prefix + await reader.readexactly(header_length(prefix) - 4)
+    return header + await reader.readexactly(remaining_length(header))
+
+
+async def async_probe(host: str, port: int = DEFAULT_PORT, timeout: float = 3) -> bool:
+    """Cheap reachability check - TCP connect only, no handshake"""
+    try:
+        async with asyncio.timeout(timeout):
+            _reader, writer = await asyncio.open_connection(host, port)
+    except (OSError, asyncio.TimeoutError):
+        return False
+    writer.close()
+    try:
+        await writer.wait_closed()
+    except OSError:
+        pass
+    return True
+
+
+class TuyaLocalClient:
+    """Asyncio connection to one Tuya device
+
+    Non-persistent clients open a connection per call, like tinytuya does by
+    default. Persistent clients keep the socket (and the negotiated session
+    key) open across calls and buffer STATUS frames the device sends on its
+    own. The session is renegotiated when the device closes the socket or
+    after session_ttl seconds. Clients given the same lock never talk to
+    the device at the same time.
+    """
+
+    def __init__(self, device_id: str, local_key: str, host: str,
+                 version: float = 3.5, port: int = DEFAULT_PORT,
+                 timeout: float = DEFAULT_TIMEOUT, retries: int = DEFAULT_RETRIES,
+                 persistent: bool = False, session_ttl: Optional[float] = None,
+                 lock: Optional[asyncio.Lock] = None):
+        """Initialize client"""
+        self.device_id = device_id
+        self.local_key = local_key.encode("latin1")
+        self.host = host
+        self.port = port
+        self.version = float(version)
+        self.timeout = timeout
+        self.retries = retries
+        self.persistent = persistent
+        self.session_ttl = session_ttl
+
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._key = self.local_key
+        self._seqno = 1
+        self._session_started = 0.0
+        self._lock = lock or asyncio.Lock()
+        self._pending: deque[dict] = deque(maxlen=MAX_PENDING_UPDATES)
+        # Lower versions to try until one request succeeds
+        self._configured_version = self.version
+        self._version_confirmed = False
+        self._fallbacks = [v for v in PROTOCOL_VERSIONS if v < self.version]
+        # Monotonic time to try them again after every version was rejected
+        self._fallbacks_retry: Optional[float] = None
+
+        # Last request: seconds per phase (connect, handshake, wait, decrypt)
+        # and attempts including retries and version fallbacks
+        self.timings: dict[str, float] = {}
+        self.attempts = 0
+
+    @property
+    def configured_version(self) -> float:
+        """Return the version the client was created with"""
+        return self._configured_version
+
+    @property
+    def connected(self) -> bool:
+        """Return True while a socket is open and the device has not closed it"""
+        return (
+            self._writer is not None
+            and not self._writer.is_closing()
+            and not self._reader.at_eof()
+        )
+
+    async def async_status(self) -> dict:
+        """Query all DPS values"""
+        return await self._async_request(self._status_request)
+
+    async def async_heartbeat(self) -> dict:
+        """Send a heartbeat, keeps a persistent connection alive"""
+        return await self._async_request(self._heartbeat_request)
+
+    async def async_set_dps(self, dps: dict) -> dict:
+        """Set DPS values on the device"""
+        return await self._async_request(lambda: self._control_request(dps))
+
+    async def async_receive(self, timeout: float) -> Optional[dict]:
+        """Wait up to timeout for a DPS update sent by the device
+
+        Returns None when nothing arrived. Only meaningful for persistent clients.
+        """
+        if self._pending:
+            return self._pending.popleft()
+
+        async with self._lock:
+            try:
+                async with asyncio.timeout(self.timeout):
+                    await self._async_ensure_connected()
+            except (TimeoutError, OSError, asyncio.IncompleteReadError) as e:
+                await self._async_disconnect()
+                raise TuyaConnectionError(f"Cannot connect to {self.host}: {e!r}") from e
+            except TuyaProtocolError:
+                await self._async_disconnect()
+                raise
+
+            try:
+                # readexactly() consumes nothing until the whole prefix is there,
+                # so timing out here never desyncs the stream
+                async with asyncio.timeout(timeout):
+                    prefix = await self._reader.readexactly(4)
+            except TimeoutError:
+                return None
+            except (OSError, asyncio.IncompleteReadError) as e:
+                await self._async_disconnect()
+                raise TuyaConnectionError(f"Connection to {self.host} lost: {e!r}") from e
+
+            try:
+                async with asyncio.timeout(self.timeout):
+                    header = prefix + await self._reader.readexactly(header_length(prefix) - 4)
+                    frame = header + await self._reader.readexactly(remaining_length(header))
+                return self._decode_frame(frame)[1]
+            except (TimeoutError, OSError, asyncio.IncompleteReadError) as e:
+                await self._async_disconnect()
+                raise TuyaConnectionError(f"Connection to {self.host} lost: {e!r}") from e
+            except TuyaProtocolError:
+                await self._async_disconnect()
+                raise
+
+    async def async_close(self):
+        """Close the connection"""
+        async with self._lock:
+            await self._async_disconnect()
+
+    # --- Request handling ---
+
+    async def _async_request(self, build_request) -> dict:
+        """Send one command and wait for its response, with retries and version fallback
+
+        build_request returns (cmd, payload) for the current protocol version.
+        """
+        attempt = 0
+        stale_retried = False
+        self.timings = {}
+        self.attempts = 0
+        if self._fallbacks_retry is not None and time.monotonic() >= self._fallbacks_retry:
+            self._fallbacks_retry = None
+            self._fallbacks = [v for v in PROTOCOL_VERSIONS if v < self.version]
+        while True:
+            rejected = False
+            self.attempts += 1
+            async with self._lock:
+                reused = self.connected
+                try:
+                    async with asyncio.timeout(self.timeout):
+                        await self._async_ensure_connected()
+                        result = await self._async_exchange(*build_request())
+                    # Version works - stop considering fallbacks
+                    self._version_confirmed = True
+                    if not self.persistent:
+                        await self._async_disconnect()
+                    return result
+                except TimeoutError as e:
+                    error = TuyaConnectionError(f"Timeout after {self.timeout}s talking to {self.host}")
+                    error.__cause__ = e
+                except (asyncio.IncompleteReadError, ConnectionResetError) as e:
+                    # Devices drop the connection on frames they cannot parse
+                    error = TuyaConnectionError(f"Connection closed by {self.host}: {e!r}")
+                    error.__cause__ = e
+                    rejected = True
+                except OSError as e:
+                    error = TuyaConnectionError(f"Connection error with {self.host}: {e!r}")
+                    error.__cause__ = e
+                except TuyaAuthError as e:
+                    # Device answered in this version, another one will not help
+                    error = e
+                except TuyaProtocolError as e:
+                    error = e
+                    rejected = True
+
+                await self._async_disconnect()
+
+            if reused and not stale_retried and not isinstance(error.__cause__, TimeoutError):
+                # Device dropped the idle session while we were writing - this
+                # says nothing about the protocol version, reconnect right away
+                stale_retried = True
+                _LOGGER.debug("Session with %s went stale (%s), reconnecting", self.host, error)
+                continue
+
+            if rejected and not self._version_confirmed and self._fallbacks:
+                # Wrong version shows up as a failed handshake, garbage payload
+                # or the device hanging up on us
+                previous = self.version
+                self.version = self._fallbacks.pop(0)
+                _LOGGER.warning(
+                    "Protocol %s rejected by %s (%s), falling back to %s",
+                    previous, self.host, error, self.version
+                )
+                continue
+
+            if isinstance(error, TuyaConnectionError) and attempt < self.retries:
+                attempt += 1
+                _LOGGER.debug("Retrying %s after error: %s", self.host, error)
+                await asyncio.sleep(DEFAULT_RETRY_DELAY)
+                continue
+
+            if not self._version_confirmed and not self._fallbacks:
+                # Nothing worked - start from the configured version next time
+                self.version = self._configured_version
+                if rejected:
+                    # Every version was turned down, which is what a wrong
+                    # local key looks like - do not cycle through them on
+                    # every poll
+                    self._fallbacks_retry = time.monotonic() + FALLBACK_RETRY_INTERVAL
+                    raise TuyaAuthError(
+                        f"Invalid local key? {self.host} rejected every protocol version tried ({error})"
+                    ) from error
+                self._fallbacks = [v for v in PROTOCOL_VERSIONS if v < self.version]
+
+            raise error
+
+    async def _async_exchange(self, cmd: int, payload: bytes) -> dict:
+        """Write a command and read frames until its response arrives"""
+        self._writer.write(self._encode_frame(cmd, payload))
+        await self._writer.drain()
+        started = time.perf_counter()
+        decrypt = 0.0
+
+        acked = False
+        while True:
+            frame = await read_frame(self._reader)
+            received = time.perf_counter()
+            msg_cmd, data = self._decode_frame(frame)
+            decrypt += time.perf_counter() - received
+
+            if msg_cmd == cmd:
+                if "dps" in data or cmd not in (DP_QUERY, DP_QUERY_NEW):
+                    break
+                # 3.4+ devices may ack the query and send the values as STATUS
+                acked = True
+            elif msg_cmd == STATUS and "dps" in data:
+                if acked:
+                    break
+                self._pending.append(data)
+
+        self.timings["wait"] = time.perf_counter() - started - decrypt
+        self.timings["decrypt"] = decrypt
+        return data
+
+    def _decode_frame(self, frame: bytes) -> tuple[int, dict]:
+        """Unpack, decrypt and parse one frame"""
+        msg = unpack_message(self.version, self._key, frame)
+        payload = decrypt_payload(self.version, self._key, msg.payload)
+        return msg.cmd, decode_json(payload)
+
+    def _encode_frame(self, cmd: int, payload: bytes) -> bytes:
+        """Encode, encrypt and frame one command"""
+        frame = pack_message(
+            self.version, self._key, self._seqno, cmd,
+            encode_payload(self.version, self._key, cmd, payload)
+        )
+        self._seqno += 1
+        return frame
+
+    # --- Requests ---
+
+    def _status_request(self) -> tuple[int, bytes]:
+        if self.version >= 3.4:
+            return DP_QUERY_NEW, b"{}"
+        return DP_QUERY, dumps({
+            "gwId": self.device_id, "devId": self.device_id,
+            "uid": self.device_id, "t": str(int(time.time())),
+        })
+
+    def _heartbeat_request(self) -> tuple[int, bytes]:
+        return HEART_BEAT, dumps({"gwId": self.device_id, "devId": self.device_id})
+
+    def _control_request(self, dps: dict) -> tuple[int, bytes]:
+        dps = {str(k): v for k, v in dps.items()}
+        if self.version >= 3.4:
+            return CONTROL_NEW, dumps({"protocol": 5, "t": int(time.time()), "data": {"dps": dps}})
+        return CONTROL, dumps({
+            "devId": self.device_id, "uid": self.device_id,
+            "t": str(int(time.time())), "dps": dps,
+        })
+
+    # --- Connection ---
+
+    async def _async_ensure_connected(self):
+        """Open the socket and negotiate a session key if needed"""
+        if self.connected:
+            if self.session_ttl is None or time.monotonic() - self._session_started < self.session_ttl:
+                return
+            _LOGGER.debug("Session with %s expired, renegotiating", self.host)
+            await self._async_disconnect()
+
+        started = time.perf_counter()
+        self._reader, self._writer = await asyncio.open_connection(self.host, self.port)
+        connected = time.perf_counter()
+        self.timings["connect"] = connected - started
+        self._key = self.local_key
+        self._seqno = 1
+        if self.version >= 3.4:
+            await self._async_negotiate_session()
+            self.timings["handshake"] = time.perf_counter() - connected
+        self._session_started = time.monotonic()
+
+    async def _async_negotiate_session(self):
+        """3.4/3.5 three-message session key negotiation"""
+        local_nonce = os.urandom(16)
+        self._writer.write(self._encode_frame(SESS_KEY_NEG_START, local_nonce))
+        await self._writer.drain()
+
+        # Once a request went through, the key is right and a failure is corruption
+        key_error = TuyaProtocolError if self._version_confirmed else TuyaAuthError
+        frame = await read_frame(self._reader)
+        try:
+            msg = unpack_message(self.version, self.local_key, frame)
+        except TuyaProtocolError as e:
+            if frame[:4] == PREFIX_6699_BIN and self.version >= 3.5:
+                # A 3.5 reply the local key cannot authenticate
+                raise key_error(f"Handshake reply does not authenticate - wrong local key? ({e})") from e
+            raise
+        if msg.cmd != SESS_KEY_NEG_RESP:
+            raise TuyaProtocolError(f"Unexpected handshake reply (command {msg.cmd})")
+        payload = msg.payload
+        if self.version < 3.5:
+            payload = aes_ecb_decrypt(self.local_key, payload)
+        if len(payload) < 48:
+            raise TuyaProtocolError("Handshake reply too short")
+
+        remote_nonce = payload[:16]
+        expected = hmac.new(self.local_key, local_nonce, sha256).digest()
+        if not hmac.compare_digest(payload[16:48], expected):
+            raise key_error("Handshake HMAC mismatch - wrong local key?")
+
+        finish = hmac.new(self.local_key, remote_nonce, sha256).digest()
+        self._writer.write(self._encode_frame(SESS_KEY_NEG_FINISH, finish))
+        await self._writer.drain()
+
+        self._key = session_key(self.version, self.local_key, local_nonce, remote_nonce)
+
+    async def _async_disconnect(self):
+        """Close the socket, dropping the session key"""
+        writer, self._reader, self._writer = self._writer, None, None
+        self._key = self.local_key
+        if writer is None:
+            return
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except OSError:
+            pass
@@ -19,9 +19,37 @@ from .const import (
     CONF_LOCAL_KEY,
     CONF_PROTOCOL_VERSION,
     CONF_SCAN_INTERVAL,
+    CONF_PUSH_MODE,
+    CONF_PRIORITY,
+    CONF_ADAPTIVE_POLLING,
+    CONF_MIN_SCAN_INTERVAL,
+    CONF_MAX_SCAN_INTERVAL,
+    CONF_ROLLING_STATISTICS,
+    CONF_CALCIUM_HARDNESS,
+    CONF_TOTAL_ALKALINITY,
+    CONF_OUTLIER_FILTER,
+    CONF_STATISTICS_IMPORT,
+    CONF_ARCHIVE,
     DEFAULT_PROTOCOL_VERSION,
     DEFAULT_SCAN_INTERVAL,
+    DEFAULT_PUSH_MODE,
+    DEFAULT_PRIORITY,
+    DEFAULT_ADAPTIVE_POLLING,
+    DEFAULT_MIN_SCAN_INTERVAL,
+    DEFAULT_MAX_SCAN_INTERVAL,
+    DEFAULT_ROLLING_STATISTICS,
+    DEFAULT_CALCIUM_HARDNESS,
+    DEFAULT_TOTAL_ALKALINITY,
+    DEFAULT_OUTLIER_FILTER,
+    DEFAULT_STATISTICS_IMPORT,
+    DEFAULT_ARCHIVE,
+    DEVICE_TIMEOUT,
+    DEVICE_RETRIES,
 )
+from .client import TuyaAuthError, TuyaError
+from .discovery import async_get_discovery
+from .filters import FILTER_TYPES
+from .registry import async_get_registry
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -33,55 +61,64 @@ STEP_USER_DATA_SCHEMA = vol.Schema(
         vol.Optional(CONF_NAME, default="Tuya 8-in-1 Tester"): cv.string,
         vol.Optional(CONF_PROTOCOL_VERSION, default=DEFAULT_PROTOCOL_VERSION): vol.Coerce(float),
         vol.Optional(CONF_SCAN_INTERVAL, default=DEFAULT_SCAN_INTERVAL): cv.positive_int,
+        vol.Optional(CONF_PUSH_MODE, default=DEFAULT_PUSH_MODE): cv.boolean,
+        vol.Optional(CONF_PRIORITY, default=DEFAULT_PRIORITY): vol.All(
+            vol.Coerce(int), vol.Range(min=0, max=10)
+        ),
+        vol.Optional(CONF_ADAPTIVE_POLLING, default=DEFAULT_ADAPTIVE_POLLING): cv.boolean,
+        vol.Optional(CONF_MIN_SCAN_INTERVAL, default=DEFAULT_MIN_SCAN_INTERVAL): cv.positive_int,
+        vol.Optional(CONF_MAX_SCAN_INTERVAL, default=DEFAULT_MAX_SCAN_INTERVAL): cv.positive_int,
+        vol.Optional(CONF_ROLLING_STATISTICS, default=DEFAULT_ROLLING_STATISTICS): cv.boolean,
+        vol.Optional(CONF_CALCIUM_HARDNESS, default=DEFAULT_CALCIUM_HARDNESS): cv.positive_int,
+        vol.Optional(CONF_TOTAL_ALKALINITY, default=DEFAULT_TOTAL_ALKALINITY): cv.positive_int,
+        vol.Optional(CONF_OUTLIER_FILTER, default=DEFAULT_OUTLIER_FILTER): vol.In(FILTER_TYPES),
+        vol.Optional(CONF_STATISTICS_IMPORT, default=DEFAULT_STATISTICS_IMPORT): cv.boolean,
+        vol.Optional(CONF_ARCHIVE, default=DEFAULT_ARCHIVE): cv.boolean,
     }
 )
 
 
 async def validate_input(hass: HomeAssistant, data: Dict[str, Any]) -> Dict[str, str]:
     """Validate the user input allows us to connect."""
+    if data.get(CONF_MIN_SCAN_INTERVAL, DEFAULT_MIN_SCAN_INTERVAL) > data.get(
+        CONF_MAX_SCAN_INTERVAL, DEFAULT_MAX_SCAN_INTERVAL
+    ):
+        raise InvalidInterval("Minimum scan interval is larger than the maximum")
+    
     try:
-        import tinytuya
-        
-        device = tinytuya.Device(
-            dev_id=data[CONF_DEVICE_ID],
-            address=data[CONF_HOST],
-            local_key=data[CONF_LOCAL_KEY],
-            version=data.get(CONF_PROTOCOL_VERSION, DEFAULT_PROTOCOL_VERSION)
-        )
-        
-        device.set_socketTimeout(10)
-        device.set_socketRetryLimit(2)
-        
-        # Test connection
+        # Test connection - reuses the coordinator's session when there is one
         _LOGGER.info(f"Testing connection to {data[CONF_HOST]}...")
-        result = await hass.async_add_executor_job(device.status)
-        
-        if not result:
-            raise CannotConnect("No response from device")
-        
-        if 'Error' in result:
-            error_msg = result.get('Error', 'Unknown error')
-            error_code = result.get('Err', 'Unknown')
-            raise CannotConnect(f"Device error: {error_msg} (code: {error_code})")
-        
-        if 'dps' not in result:
-            raise InvalidData("No DPS data from device")
-            
-        _LOGGER.info(f"✅ Connection OK - received {len(result['dps'])} DPS points")
-        return {"title": data.get(CONF_NAME, "Tuya 8-in-1 Tester")}
-        
-    except ImportError:
-        raise CannotConnect("tinytuya library is not installed")
-    except Exception as e:
+        result, version = await async_get_registry(hass).async_status(
+            data[CONF_DEVICE_ID],
+            data[CONF_LOCAL_KEY],
+            data[CONF_HOST],
+            version=data.get(CONF_PROTOCOL_VERSION, DEFAULT_PROTOCOL_VERSION),
+            timeout=DEVICE_TIMEOUT,
+            retries=DEVICE_RETRIES,
+        )
+    except TuyaAuthError as e:
+        _LOGGER.error(f"Validation error: {e}")
+        raise InvalidAuth(f"Local key rejected: {str(e)}")
+    except TuyaError as e:
         _LOGGER.error(f"Validation error: {e}")
         raise CannotConnect(f"Connection error: {str(e)}")
+    
+    if 'dps' not in result:
+        raise InvalidData("No DPS data from device")
+    
+    requested_version = float(data.get(CONF_PROTOCOL_VERSION, DEFAULT_PROTOCOL_VERSION))
+    if version != requested_version:
+        _LOGGER.warning(f"Device answered on protocol {version} instead of {requested_version}")
+        
+    _LOGGER.info(f"✅ Connection OK - received {len(result['dps'])} DPS points")
+    return {"title": data.get(CONF_NAME, "Tuya 8-in-1 Tester")}
 
 
 class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     """Handle a config flow for Tuya 8-in-1 Water Quality Tester."""
 
     VERSION = 1
-    CONNECTION_CLASS = config_entries.CONN_CLASS_LOCAL_POLL
+    CONNECTION_CLASS = config_entries.CONN_CLASS_LOCAL_PUSH
 
     async def async_step_user(
         self, user_input: Optional[Dict[str, Any]] = None
@@ -99,6 +136,11 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 
                 return self.async_create_entry(title=info["title"], data=user_input)
                 
+            except InvalidInterval:
+                errors["base"] = "invalid_interval"
+            except InvalidAuth as e:
+                errors["base"] = "invalid_auth"
+                _LOGGER.error(f"Invalid local key: {e}")
             except CannotConnect as e:
                 errors["base"] = "cannot_connect"
                 _LOGGER.error(f"Cannot connect: {e}")
@@ -109,9 +151,28 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 _LOGGER.exception("Unexpected exception")
                 errors["base"] = "unknown"
 
+        # Pre-fill from the first device broadcasting on the LAN that is not set up yet
+        data_schema = STEP_USER_DATA_SCHEMA
+        if user_input is None:
+            configured = {entry.unique_id for entry in self._async_current_entries()}
+            discovered = next(
+                (device for device in async_get_discovery(self.hass).devices.values()
+                 if device.device_id not in configured),
+                None,
+            )
+            if discovered is not None:
+                data_schema = self.add_suggested_values_to_schema(
+                    STEP_USER_DATA_SCHEMA,
+                    {
+                        CONF_DEVICE_ID: discovered.device_id,
+                        CONF_HOST: discovered.ip,
+                        CONF_PROTOCOL_VERSION: discovered.version,
+                    },
+                )
+
         return self.async_show_form(
             step_id="user", 
-            data_schema=STEP_USER_DATA_SCHEMA, 
+            data_schema=data_schema, 
             errors=errors,
             description_placeholders={
                 "device_example": "bf70d7388a31ac0421bfyi",
@@ -170,6 +231,10 @@ class OptionsFlow(config_entries.OptionsFlow):
                 )
                 return self.async_create_entry(title="", data={})
                 
+            except InvalidInterval:
+                errors["base"] = "invalid_interval"
+            except InvalidAuth:
+                errors["base"] = "invalid_auth"
             except CannotConnect:
                 errors["base"] = "cannot_connect"
             except InvalidData:
@@ -178,11 +243,13 @@ class OptionsFlow(config_entries.OptionsFlow):
                 _LOGGER.exception("Unexpected exception")
                 errors["base"] = "unknown"
 
-        # Show form with current values
+        # Show form with current values, the address last seen in a beacon if it moved
         current_data = self.config_entry.data
+        discovered = async_get_discovery(self.hass).devices.get(current_data.get(CONF_DEVICE_ID))
+        current_host = discovered.ip if discovered else current_data.get(CONF_HOST)
         options_schema = vol.Schema(
             {
-                vol.Required(CONF_HOST, default=current_data.get(CONF_HOST)): cv.string,
+                vol.Required(CONF_HOST, default=current_host): cv.string,
                 vol.Required(CONF_DEVICE_ID, default=current_data.get(CONF_DEVICE_ID)): cv.string,
                 vol.Required(CONF_LOCAL_KEY, default=current_data.get(CONF_LOCAL_KEY)): cv.string,
                 vol.Optional(
@@ -193,6 +260,50 @@ class OptionsFlow(config_entries.OptionsFlow):
                     CONF_SCAN_INTERVAL, 
                     default=current_data.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL)
                 ): cv.positive_int,
+                vol.Optional(
+                    CONF_PUSH_MODE, 
+                    default=current_data.get(CONF_PUSH_MODE, DEFAULT_PUSH_MODE)
+                ): cv.boolean,
+                vol.Optional(
+                    CONF_PRIORITY, 
+                    default=current_data.get(CONF_PRIORITY, DEFAULT_PRIORITY)
+                ): vol.All(vol.Coerce(int), vol.Range(min=0, max=10)),
+                vol.Optional(
+                    CONF_ADAPTIVE_POLLING, 
+                    default=current_data.get(CONF_ADAPTIVE_POLLING, DEFAULT_ADAPTIVE_POLLING)
+                ): cv.boolean,
+                vol.Optional(
+                    CONF_MIN_SCAN_INTERVAL, 
+                    default=current_data.get(CONF_MIN_SCAN_INTERVAL, DEFAULT_MIN_SCAN_INTERVAL)
+                ): cv.positive_int,
+                vol.Optional(
+                    CONF_MAX_SCAN_INTERVAL, 
+                    default=current_data.get(CONF_MAX_SCAN_INTERVAL, DEFAULT_MAX_SCAN_INTERVAL)
+                ): cv.positive_int,
+                vol.Optional(
+                    CONF_ROLLING_STATISTICS, 
+                    default=current_data.get(CONF_ROLLING_STATISTICS, DEFAULT_ROLLING_STATISTICS)
+                ): cv.boolean,
+                vol.Optional(
+                    CONF_CALCIUM_HARDNESS, 
+                    default=current_data.get(CONF_CALCIUM_HARDNESS, DEFAULT_CALCIUM_HARDNESS)
+                ): cv.positive_int,
+                vol.Optional(
+                    CONF_TOTAL_ALKALINITY, 
+                    default=current_data.get(CONF_TOTAL_ALKALINITY, DEFAULT_TOTAL_ALKALINITY)
+                ): cv.positive_int,
+                vol.Optional(
+                    CONF_OUTLIER_FILTER, 
+                    default=current_data.get(CONF_OUTLIER_FILTER, DEFAULT_OUTLIER_FILTER)
+                ): vol.In(FILTER_TYPES),
+                vol.Optional(
+                    CONF_STATISTICS_IMPORT, 
+                    default=current_data.get(CONF_STATISTICS_IMPORT, DEFAULT_STATISTICS_IMPORT)
+                ): cv.boolean,
+                vol.Optional(
+                    CONF_ARCHIVE, 
+                    default=current_data.get(CONF_ARCHIVE, DEFAULT_ARCHIVE)
+                ): cv.boolean,
             }
         )
 
@@ -211,5 +322,13 @@ class CannotConnect(HomeAssistantError):
     """Error to indicate we cannot connect."""
 
 
+class InvalidAuth(HomeAssistantError):
+    """Error to indicate the device rejected the local key."""
+
+
 class InvalidData(HomeAssistantError):
     """Error to indicate there is invalid data."""
+
+
+class InvalidInterval(HomeAssistantError):
+    """Error to indicate the scan interval bounds are inconsistent."""
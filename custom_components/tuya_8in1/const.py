@@ -21,11 +21,68 @@ DOMAIN = "tuya_8in1"
 CONF_LOCAL_KEY = "local_key"
 CONF_PROTOCOL_VERSION = "protocol_version"
 CONF_SCAN_INTERVAL = "scan_interval"
+CONF_PUSH_MODE = "push_mode"
+CONF_PRIORITY = "priority"
+CONF_ADAPTIVE_POLLING = "adaptive_polling"
+CONF_MIN_SCAN_INTERVAL = "min_scan_interval"
+CONF_MAX_SCAN_INTERVAL = "max_scan_interval"
+CONF_ROLLING_STATISTICS = "rolling_statistics"
+CONF_CALCIUM_HARDNESS = "calcium_hardness"
+CONF_TOTAL_ALKALINITY = "total_alkalinity"
+CONF_OUTLIER_FILTER = "outlier_filter"
+CONF_STATISTICS_IMPORT = "statistics_import"
+CONF_ARCHIVE = "archive"
 DEFAULT_SCAN_INTERVAL = 30
 DEFAULT_PROTOCOL_VERSION = 3.5
+DEFAULT_PUSH_MODE = False
+DEFAULT_PRIORITY = 5  # 0-10, higher priority devices get connection slots first
+DEFAULT_ADAPTIVE_POLLING = False
+DEFAULT_MIN_SCAN_INTERVAL = 10
+DEFAULT_MAX_SCAN_INTERVAL = 300
+DEFAULT_ROLLING_STATISTICS = False
+DEFAULT_CALCIUM_HARDNESS = 250  # ppm CaCO3, typical pool water
+DEFAULT_TOTAL_ALKALINITY = 100  # ppm CaCO3
+DEFAULT_OUTLIER_FILTER = "none"  # none, median, ewma or hampel - see filters.py
+DEFAULT_STATISTICS_IMPORT = False
+DEFAULT_ARCHIVE = False
+
+# Local connection - one request covers connect, handshake and response
+DEVICE_TIMEOUT = 10
+DEVICE_RETRIES = 1  # Extra attempts after a connection error
+SESSION_TTL = 3600  # Renegotiate the reused session key after this many seconds
+
+# Shared poll scheduler (one per HA instance)
+DATA_SCHEDULER = f"{DOMAIN}_scheduler"
+DATA_CONNECTIONS = f"{DOMAIN}_connections"
+DATA_DISCOVERY = f"{DOMAIN}_discovery"
+
+# DPS schema per device in .storage, see schema.py
+SCHEMA_STORAGE_KEY = f"{DOMAIN}.dps_schema"
+SCHEMA_STORAGE_VERSION = 1
+# Partial hour of imported statistics per device in .storage, see longterm.py
+LONG_TERM_STORAGE_KEY = f"{DOMAIN}.long_term"
+LONG_TERM_STORAGE_VERSION = 1
+DEFAULT_MAX_CONCURRENT_POLLS = 4  # Device connections open at the same time
+POLL_JITTER = 0.1  # +/- fraction of the interval added to every poll
+
+# Push mode - persistent socket, device sends DPS updates on its own
+PUSH_CONSISTENCY_INTERVAL = 300  # Slow consistency poll while push is active
+PUSH_HEARTBEAT_INTERVAL = 10  # Keeps the device from dropping the socket
+PUSH_RECEIVE_TIMEOUT = 5  # Max time a single receive holds the connection
+PUSH_RECONNECT_DELAY = 10  # Pause after a broken push connection
+
+# Circuit breaker for unreachable devices
+BREAKER_FAILURE_THRESHOLD = 3  # Consecutive failed polls before the breaker opens
+BREAKER_BASE_DELAY = 30  # First probe delay in seconds, doubled per failed probe
+BREAKER_MAX_DELAY = 1800
+PROBE_TIMEOUT = 3  # TCP connect timeout of the reachability probe
 
 # Sensor types - UPDATED based on real DPS codes
 # Confirmed mappings from device:
+# Optional "deadband": state is only written once the value moved by at
+# least this much from the last written value (default: any change)
+# Optional "fast_rate": change per minute that makes adaptive polling
+# tighten the interval towards the minimum
 SENSOR_TYPES = {
     "temperature": {
         "name": "Temperature",
@@ -35,6 +92,7 @@ SENSOR_TYPES = {
         "state_class": "measurement",
         "scale": 10,  # Divide by 10
         "icon": "mdi:thermometer",
+        "fast_rate": 0.5,  # °C per minute
     },
     "ph": {
         "name": "pH",
@@ -44,6 +102,7 @@ SENSOR_TYPES = {
         "state_class": "measurement",
         "scale": 100,  # Divide by 100
         "icon": "mdi:test-tube",
+        "fast_rate": 0.1,  # pH per minute, e.g. acid or chlorine dose
     },
     "tds": {
         "name": "TDS",
@@ -53,6 +112,7 @@ SENSOR_TYPES = {
         "state_class": "measurement",
         "scale": 1,  # Direct value
         "icon": "mdi:water-opacity",
+        "deadband": 2,  # Ignore probe jitter below 2 ppm
     },
     "ec": {
         "name": "Conductivity",
@@ -62,6 +122,7 @@ SENSOR_TYPES = {
         "state_class": "measurement",
         "scale": 1,  # Direct value
         "icon": "mdi:flash",
+        "deadband": 3,  # Ignore probe jitter below 3 μS/cm
     },
     "salinity": {
         "name": "Salinity",
@@ -71,6 +132,7 @@ SENSOR_TYPES = {
         "state_class": "measurement",
         "scale": 1,  # Direct value
         "icon": "mdi:shaker-outline",
+        "deadband": 2,  # Ignore probe jitter below 2 ppm
     },
     "orp": {
         "name": "ORP",
@@ -80,6 +142,7 @@ SENSOR_TYPES = {
         "state_class": "measurement",
         "scale": 1,  # Direct value
         "icon": "mdi:lightning-bolt",
+        "fast_rate": 20,  # mV per minute
     },
     "conductivity_factor": {
         "name": "Conductivity Factor",
@@ -89,6 +152,7 @@ SENSOR_TYPES = {
         "state_class": "measurement",
         "scale": 1,
         "icon": "mdi:chart-line",
+        "deadband": 3,  # Ignore probe jitter below 3
     },
     "pro_sensor": {
         "name": "Proportion",
@@ -101,6 +165,118 @@ SENSOR_TYPES = {
     }
 }
 
+# Derived metrics - computed by the coordinator from the readings listed
+# in "inputs", see derived.py. "precision" is the number of decimals kept.
+DERIVED_SENSOR_TYPES = {
+    "ec_25": {
+        "name": "Conductivity at 25°C",
+        "inputs": ("ec", "temperature"),
+        "unit": "μS/cm",
+        "device_class": None,
+        "state_class": "measurement",
+        "precision": 1,
+        "icon": "mdi:flash-outline",
+        "deadband": 3,
+    },
+    "tds_ec_ratio": {
+        "name": "TDS/EC Ratio",
+        "inputs": ("tds", "ec"),
+        "unit": None,
+        "device_class": None,
+        "state_class": "measurement",
+        "precision": 3,
+        "icon": "mdi:division",
+    },
+    "langelier_index": {
+        "name": "Langelier Saturation Index",
+        "inputs": ("ph", "temperature", "tds"),
+        "unit": None,
+        "device_class": None,
+        "state_class": "measurement",
+        "precision": 2,
+        "icon": "mdi:scale-balance",
+        "deadband": 0.02,
+    },
+    "consistency_deviation": {
+        "name": "Reading Consistency Deviation",
+        "inputs": ("ec", "tds", "salinity", "conductivity_factor"),
+        "unit": PERCENTAGE,
+        "device_class": None,
+        "state_class": "measurement",
+        "precision": 1,
+        "icon": "mdi:check-decagram-outline",
+    },
+}
+
+# Outlier filter applied to every reading before it reaches the entities
+FILTER_WINDOW = 5  # Readings in the median and Hampel windows
+FILTER_EWMA_ALPHA = 0.3  # Weight of the newest reading
+FILTER_HAMPEL_THRESHOLD = 3  # Scaled MADs off the median that count as an outlier
+
+# Long-term statistics import - entity states are written at most this
+# often (seconds), hourly statistics are imported from memory instead
+STATISTICS_STATE_INTERVAL = 300
+
+# Reading archive - decoded readings appended to one binary file per device
+# and day under <config>/ARCHIVE_DIRECTORY/<device_id>, see archive.py
+ARCHIVE_DIRECTORY = f"{DOMAIN}_archive"
+ARCHIVE_FLUSH_INTERVAL = 60  # Seconds between writes of the buffered readings
+ARCHIVE_FLUSH_RECORDS = 1000  # Or earlier once this many readings are buffered
+
+# Rolling statistics kept in memory per sensor, label -> window in seconds
+HISTORY_WINDOWS = {"1h": 3600, "24h": 86400}
+# The attributes are not recorded and a steady value writes no state, so
+# they are refreshed with an extra state write at least this often (seconds)
+HISTORY_STATE_INTERVAL = 300
+
+# Poll diagnostics - disabled by default, enable per device to find slow
+# devices or bad access points. "phase" sensors report the p95 of the
+# last STATS_WINDOW polls in ms, "counter" sensors a running total.
+STATS_WINDOW = 100
+
+DIAGNOSTIC_SENSOR_TYPES = {
+    "poll_latency": {
+        "name": "Poll Latency",
+        "phase": "total",
+        "icon": "mdi:timer-outline",
+    },
+    "connect_latency": {
+        "name": "Connect Latency",
+        "phase": "connect",
+        "icon": "mdi:lan-connect",
+    },
+    "handshake_latency": {
+        "name": "Handshake Latency",
+        "phase": "handshake",
+        "icon": "mdi:handshake-outline",
+    },
+    "response_latency": {
+        "name": "Response Latency",
+        "phase": "wait",
+        "icon": "mdi:timer-sand",
+    },
+    "decrypt_latency": {
+        "name": "Decrypt Latency",
+        "phase": "decrypt",
+        "icon": "mdi:lock-open-outline",
+    },
+    "mapping_latency": {
+        "name": "Mapping Latency",
+        "phase": "mapping",
+        "icon": "mdi:swap-horizontal",
+    },
+    "poll_retries": {
+        "name": "Poll Retries",
+        "counter": "retries",
+        "icon": "mdi:restart",
+    },
+    "poll_failures": {
+        "name": "Poll Failures",
+        "counter": "failures",
+        "icon": "mdi:alert-circle-outline",
+    },
+}
+
 # Device information
 DEVICE_INFO = {
     "identifiers": {(DOMAIN, "tuya_8in1_tester")},
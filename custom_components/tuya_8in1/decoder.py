@@ -0,0 +1,32 @@
+"""
+DPS decoding for the coordinator hot path
+SENSOR_TYPES is compiled once into a flat table, so a poll only does
+dict lookups and one division per sensor.
+"""
+
+from typing import Any
+
+# (DPS key as sent by the device, sensor key, scale)
+DecodeTable = tuple[tuple[str, str, float], ...]
+
+
+def compile_decode_table(sensor_types: dict[str, dict[str, Any]]) -> DecodeTable:
+    """Compile SENSOR_TYPES into a decode table"""
+    return tuple(
+        (str(config["dps_id"]), sensor_key, float(config.get("scale", 1)))
+        for sensor_key, config in sensor_types.items()
+        if config.get("dps_id")
+    )
+
+
+def decode_dps(table: DecodeTable, dps: dict[str, Any]) -> dict[str, Any]:
+    """Map a raw DPS dict to scaled sensor values
+
+    Divides instead of multiplying by a reciprocal - 3 * 0.1 gives
+    0.30000000000000004 while 3 / 10 gives 0.3, at the same cost.
+    """
+    return {
+        sensor_key: dps[dps_key] / scale
+        for dps_key, sensor_key, scale in table
+        if dps_key in dps
+    }
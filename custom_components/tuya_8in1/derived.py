@@ -0,0 +1,94 @@
+"""
+Derived water-quality metrics for Tuya 8-in-1 devices
+Computed once per poll from the decoded readings and merged into the
+coordinator data, so they show up as ordinary sensors.
+"""
+
+import math
+from typing import Any, Callable, Optional
+
+# Conductivity rises about 2% per °C - standard linear compensation to 25 °C
+EC_TEMPERATURE_COEFFICIENT = 0.02
+EC_REFERENCE_TEMPERATURE = 25.0
+
+# Fixed factors the firmware uses to derive these readings from EC
+EC_FACTORS = {"tds": 0.5, "salinity": 0.582, "conductivity_factor": 1.0}
+
+
+def ec_25(data: dict[str, Any], params: dict[str, float]) -> Optional[float]:
+    """Conductivity compensated to 25 °C in μS/cm"""
+    factor = 1 + EC_TEMPERATURE_COEFFICIENT * (data["temperature"] - EC_REFERENCE_TEMPERATURE)
+    if factor <= 0:
+        return None
+    return data["ec"] / factor
+
+
+def tds_ec_ratio(data: dict[str, Any], params: dict[str, float]) -> Optional[float]:
+    """TDS in ppm per μS/cm of conductivity"""
+    if data["ec"] <= 0:
+        return None
+    return data["tds"] / data["ec"]
+
+
+def langelier_index(data: dict[str, Any], params: dict[str, float]) -> Optional[float]:
+    """Langelier saturation index, positive means scaling, negative corrosive
+
+    Calcium hardness and total alkalinity (ppm CaCO3) are not measured by
+    the tester and come from the entry configuration.
+    """
+    tds = data["tds"]
+    hardness = params.get("calcium_hardness", 0)
+    alkalinity = params.get("total_alkalinity", 0)
+    if tds <= 0 or hardness <= 0 or alkalinity <= 0:
+        return None
+    a = (math.log10(tds) - 1) / 10
+    b = -13.12 * math.log10(data["temperature"] + 273.15) + 34.55
+    c = math.log10(hardness) - 0.4
+    d = math.log10(alkalinity)
+    return data["ph"] - ((9.3 + a + b) - (c + d))
+
+
+def consistency_deviation(data: dict[str, Any], params: dict[str, float]) -> Optional[float]:
+    """Largest deviation in % of tds, salinity and conductivity factor from EC
+
+    The firmware derives all three from EC, so a deviation points at a
+    probe or firmware fault rather than at the water.
+    """
+    ec = data["ec"]
+    if ec <= 0:
+        return None
+    return max(
+        abs(data[sensor_key] / (ec * factor) - 1) * 100
+        for sensor_key, factor in EC_FACTORS.items()
+    )
+
+
+DERIVATIONS: dict[str, Callable[[dict[str, Any], dict[str, float]], Optional[float]]] = {
+    "ec_25": ec_25,
+    "tds_ec_ratio": tds_ec_ratio,
+    "langelier_index": langelier_index,
+    "consistency_deviation": consistency_deviation,
+}
+
+# (sensor key, function, input sensor keys, decimal places)
+DeriveTable = tuple[tuple[str, Callable, tuple[str, ...], int], ...]
+
+
+def compile_derive_table(derived_types: dict[str, dict[str, Any]]) -> DeriveTable:
+    """Compile DERIVED_SENSOR_TYPES into a table of derivations"""
+    return tuple(
+        (sensor_key, DERIVATIONS[sensor_key], tuple(config["inputs"]), config.get("precision", 2))
+        for sensor_key, config in derived_types.items()
+    )
+
+
+def derive(table: DeriveTable, data: dict[str, Any], params: dict[str, float]) -> dict[str, Any]:
+    """Return the derived values whose inputs are all present in data"""
+    derived = {}
+    for sensor_key, function, inputs, precision in table:
+        if not all(key in data for key in inputs):
+            continue
+        value = function(data, params)
+        if value is not None:
+            derived[sensor_key] = round(value, precision)
+    return derived
@@ -0,0 +1,48 @@
+"""
+Diagnostics for Tuya 8-in-1 Water Quality Tester integration
+"""
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from . import TuyaDataUpdateCoordinator
+from .const import DOMAIN, CONF_LOCAL_KEY
+
+TO_REDACT = {CONF_LOCAL_KEY}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry"""
+    coordinator: TuyaDataUpdateCoordinator = hass.data[DOMAIN][entry.entry_id]
+    device = coordinator.device
+    
+    return {
+        "entry": async_redact_data(dict(entry.data), TO_REDACT),
+        "connection": {
+            "host": coordinator.host,
+            "configured_version": coordinator.protocol_version,
+            # Differs from the configured one after a version fallback
+            "active_version": device.version if device else None,
+            "connected": device.connected if device else False,
+            "push_mode": coordinator.push_mode,
+        },
+        "polling": {
+            "interval": coordinator.poll_interval.total_seconds(),
+            "priority": coordinator.priority,
+            "last_update_success": coordinator.last_update_success,
+            "breaker_state": coordinator.breaker.state,
+            "breaker_failures": coordinator.breaker.failures,
+            "breaker_delay": coordinator.breaker.delay,
+        },
+        "stats": coordinator.stats.as_dict(),
+        # DPS ids and value types stored for the device, None before first contact
+        "dps_schema": coordinator.dps_schema,
+        "data": coordinator.data,
+        # Decoded readings before the outlier filter
+        "raw_data": coordinator.raw_data,
+    }
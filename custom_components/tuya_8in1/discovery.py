@@ -0,0 +1,132 @@
+"""
+LAN discovery for Tuya 8-in-1 devices
+Listens for the UDP beacons Tuya devices broadcast every few seconds and
+keeps device_id -> (ip, version), so a tester that got a new DHCP address
+is found again without editing the entry. One listener per HA instance.
+"""
+
+import asyncio
+import logging
+import socket
+import struct
+import time
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+
+from .client import DISCOVERY_PORTS, TuyaError, unpack_beacon
+from .const import DATA_DISCOVERY
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def async_get_discovery(hass: HomeAssistant) -> "TuyaDiscovery":
+    """Return the discovery listener, started on first use"""
+    if DATA_DISCOVERY not in hass.data:
+        discovery = hass.data[DATA_DISCOVERY] = TuyaDiscovery()
+        hass.async_create_background_task(discovery.async_start(), "tuya_8in1_discovery")
+
+        @callback
+        def stop(_event):
+            discovery.async_stop()
+
+        hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, stop)
+    return hass.data[DATA_DISCOVERY]
+
+
+@dataclass
+class DiscoveredDevice:
+    device_id: str
+    ip: str
+    version: float
+    product_key: Optional[str] = None
+    last_seen: float = 0.0
+
+
+class _BeaconProtocol(asyncio.DatagramProtocol):
+    def __init__(self, discovery: "TuyaDiscovery"):
+        self._discovery = discovery
+
+    def datagram_received(self, data: bytes, addr):
+        self._discovery.handle_beacon(data, addr[0])
+
+
+class TuyaDiscovery:
+    """Beacon listener and cache of the devices seen"""
+
+    def __init__(self, ports=tuple(DISCOVERY_PORTS)):
+        """Initialize listener"""
+        self._ports = ports
+        self._transports: list[asyncio.DatagramTransport] = []
+        self.devices: dict[str, DiscoveredDevice] = {}
+        self._listeners: dict[str, list[Callable[[DiscoveredDevice], None]]] = {}
+
+    async def async_start(self):
+        """Bind every discovery port that is free"""
+        loop = asyncio.get_running_loop()
+        for port in self._ports:
+            try:
+                # Other Tuya integrations may listen as well
+                transport, _ = await loop.create_datagram_endpoint(
+                    lambda: _BeaconProtocol(self),
+                    local_addr=("0.0.0.0", port),
+                    family=socket.AF_INET,
+                    reuse_port=True,
+                    allow_broadcast=True,
+                )
+            except OSError as e:
+                _LOGGER.debug(f"🔍 Discovery port {port} unavailable: {e}")
+                continue
+            self._transports.append(transport)
+        _LOGGER.debug(f"🔍 Listening for device beacons on {len(self._transports)} ports")
+
+    @callback
+    def async_stop(self):
+        """Close all sockets"""
+        for transport in self._transports:
+            transport.close()
+        self._transports.clear()
+
+    @callback
+    def async_listen(self, device_id: str,
+                     listener: Callable[[DiscoveredDevice], None]) -> CALLBACK_TYPE:
+        """Call listener whenever the device shows up at a new address"""
+        self._listeners.setdefault(device_id, []).append(listener)
+
+        @callback
+        def remove():
+            listeners = self._listeners.get(device_id, [])
+            if listener in listeners:
+                listeners.remove(listener)
+
+        return remove
+
+    def handle_beacon(self, data: bytes, source: str):
+        """Decode one beacon and update the cache"""
+        # Anyone on the LAN can send to the discovery ports
+        try:
+            beacon = unpack_beacon(data)
+        except (TuyaError, struct.error) as e:
+            _LOGGER.debug(f"🔍 Ignoring beacon from {source}: {e}")
+            return
+
+        device_id = beacon.get("gwId")
+        if not device_id:
+            return
+        ip = beacon.get("ip") or source
+        try:
+            version = float(beacon.get("version", 3.3))
+        except (TypeError, ValueError):
+            version = 3.3
+
+        known = self.devices.get(device_id)
+        moved = known is not None and (known.ip != ip or known.version != version)
+        self.devices[device_id] = DiscoveredDevice(
+            device_id, ip, version, beacon.get("productKey"), time.monotonic()
+        )
+        if known is None or moved:
+            _LOGGER.debug(f"🔍 {device_id} at {ip} (protocol {version})")
+            for listener in list(self._listeners.get(device_id, ())):
+                listener(self.devices[device_id])
@@ -0,0 +1,124 @@
+"""
+Streaming outlier filters for Tuya 8-in-1 devices
+The probes occasionally report a single wild reading (pH 0.00, ORP -999)
+when a pump starts. One filter per sensor sits between decoding and the
+entity state, each with fixed-size state and constant work per sample.
+"""
+
+import math
+from collections import deque
+from typing import Any, Optional
+
+FILTER_NONE = "none"
+FILTER_MEDIAN = "median"
+FILTER_EWMA = "ewma"
+FILTER_HAMPEL = "hampel"
+FILTER_TYPES = (FILTER_NONE, FILTER_MEDIAN, FILTER_EWMA, FILTER_HAMPEL)
+
+# Scales the median absolute deviation to a standard deviation for normal data
+MAD_SCALE = 1.4826
+
+
+def _median(values: list[float]) -> float:
+    ordered = sorted(values)
+    middle = len(ordered) // 2
+    if len(ordered) % 2:
+        return ordered[middle]
+    return (ordered[middle - 1] + ordered[middle]) / 2
+
+
+class MedianFilter:
+    """Median of the last `size` readings"""
+
+    def __init__(self, size: int):
+        """Initialize filter"""
+        self._window: deque[float] = deque(maxlen=size)
+
+    def update(self, value: float) -> float:
+        """Add one reading and return the filtered value"""
+        self._window.append(value)
+        return _median(list(self._window))
+
+
+class EwmaFilter:
+    """Exponentially weighted moving average, smooths rather than rejects"""
+
+    def __init__(self, alpha: float):
+        """Initialize filter, alpha is the weight of the newest reading"""
+        self._alpha = alpha
+        self._value: Optional[float] = None
+
+    def update(self, value: float) -> float:
+        """Add one reading and return the filtered value"""
+        if self._value is None:
+            self._value = value
+        else:
+            self._value += self._alpha * (value - self._value)
+        return self._value
+
+
+class HampelFilter:
+    """Replace readings more than `threshold` scaled MADs off the window median
+
+    Readings within the threshold pass unchanged, so steady values and real
+    steps are not delayed - a step is accepted once it fills half the window.
+    min_mad keeps a run of identical readings from rejecting the smallest
+    change, use the sensor's resolution.
+    """
+
+    def __init__(self, size: int, threshold: float, min_mad: float = 0.0):
+        """Initialize filter"""
+        self._window: deque[float] = deque(maxlen=size)
+        self._threshold = threshold
+        self._min_mad = min_mad
+
+    def update(self, value: float) -> float:
+        """Add one reading and return the filtered value"""
+        window = self._window
+        window.append(value)
+        if len(window) < 3:
+            return value
+        median = _median(list(window))
+        mad = max(MAD_SCALE * _median([abs(sample - median) for sample in window]), self._min_mad)
+        if abs(value - median) > self._threshold * mad:
+            return median
+        return value
+
+
+def create_filter(kind: str, size: int, alpha: float, threshold: float, min_mad: float = 0.0):
+    """Return a filter instance, None for FILTER_NONE"""
+    if kind == FILTER_MEDIAN:
+        return MedianFilter(size)
+    if kind == FILTER_EWMA:
+        return EwmaFilter(alpha)
+    if kind == FILTER_HAMPEL:
+        return HampelFilter(size, threshold, min_mad)
+    return None
+
+
+class SensorFilters:
+    """One filter per sensor of one device"""
+
+    def __init__(self, sensor_types: dict[str, dict[str, Any]], kind: str,
+                 size: int, alpha: float, threshold: float):
+        """Initialize filters, sensor_types as in SENSOR_TYPES"""
+        self._filters = {
+            # Resolution is one step of the raw DPS value, or the deadband if larger
+            sensor_key: create_filter(
+                kind, size, alpha, threshold,
+                max(1 / config.get("scale", 1), config.get("deadband", 0)),
+            )
+            for sensor_key, config in sensor_types.items()
+        }
+
+    def update(self, data: dict[str, Any]) -> dict[str, Any]:
+        """Return a copy of data with every numeric reading filtered"""
+        filtered = dict(data)
+        for sensor_key, value in data.items():
+            sensor_filter = self._filters.get(sensor_key)
+            if sensor_filter is None or not isinstance(value, (int, float)) or math.isnan(value):
+                continue
+            result = sensor_filter.update(value)
+            # Keep the decoded precision, EWMA and even-sized medians add digits
+            filtered[sensor_key] = result if result == value else round(result, 3)
+        return filtered
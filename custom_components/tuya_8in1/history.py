@@ -0,0 +1,148 @@
+"""
+In-memory sensor history for Tuya 8-in-1 devices
+Array-backed ring buffers of timestamped readings with rolling min, max,
+mean, standard deviation and rate of change, updated in amortized O(1)
+per sample - no recorder queries needed.
+"""
+
+import math
+from array import array
+from collections import deque
+from typing import Any, Optional
+
+INITIAL_CAPACITY = 64
+
+# Statistics of RollingWindow.statistics(), attribute names add the window label
+STATISTICS = ("min", "max", "mean", "std", "rate")
+
+
+class RollingWindow:
+    """Readings of the last `seconds` with incremental statistics"""
+
+    def __init__(self, seconds: float):
+        """Initialize window"""
+        self.seconds = seconds
+        # Ring buffer, grows by doubling so old samples are never lost early
+        self._times = array("d", bytes(8 * INITIAL_CAPACITY))
+        self._values = array("d", bytes(8 * INITIAL_CAPACITY))
+        self._head = 0
+        self._count = 0
+        # Sums of (value - shift) keep the variance numerically stable
+        self._shift: Optional[float] = None
+        self._sum = 0.0
+        self._sum_sq = 0.0
+        # Monotonic deques of (time, value) - front is the current min / max
+        self._min: deque[tuple[float, float]] = deque()
+        self._max: deque[tuple[float, float]] = deque()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def add(self, timestamp: float, value: float):
+        """Add one reading, timestamps must not go backwards"""
+        self._expire(timestamp)
+        if self._count == len(self._times):
+            self._grow()
+
+        index = (self._head + self._count) % len(self._times)
+        self._times[index] = timestamp
+        self._values[index] = value
+        self._count += 1
+
+        if self._shift is None:
+            self._shift = value
+        delta = value - self._shift
+        self._sum += delta
+        self._sum_sq += delta * delta
+
+        while self._min and self._min[-1][1] >= value:
+            self._min.pop()
+        self._min.append((timestamp, value))
+        while self._max and self._max[-1][1] <= value:
+            self._max.pop()
+        self._max.append((timestamp, value))
+
+    def statistics(self, now: Optional[float] = None) -> dict[str, float]:
+        """Return min, max, mean, std and rate (change per hour), empty without data"""
+        if now is not None:
+            self._expire(now)
+        count = self._count
+        if not count:
+            return {}
+
+        mean = self._sum / count
+        variance = max(0.0, self._sum_sq / count - mean * mean)
+        stats = {
+            "min": self._min[0][1],
+            "max": self._max[0][1],
+            "mean": self._shift + mean,
+            "std": math.sqrt(variance),
+        }
+
+        capacity = len(self._times)
+        first = self._head
+        last = (self._head + count - 1) % capacity
+        elapsed = self._times[last] - self._times[first]
+        if elapsed > 0:
+            stats["rate"] = (self._values[last] - self._values[first]) / elapsed * 3600
+        return stats
+
+    def _expire(self, now: float):
+        cutoff = now - self.seconds
+        times = self._times
+        capacity = len(times)
+        while self._count and times[self._head] < cutoff:
+            delta = self._values[self._head] - self._shift
+            self._sum -= delta
+            self._sum_sq -= delta * delta
+            self._head = (self._head + 1) % capacity
+            self._count -= 1
+
+        if not self._count:
+            # Drop accumulated rounding error along with the data
+            self._shift = None
+            self._sum = self._sum_sq = 0.0
+        while self._min and self._min[0][0] < cutoff:
+            self._min.popleft()
+        while self._max and self._max[0][0] < cutoff:
+            self._max.popleft()
+
+    def _grow(self):
+        capacity = len(self._times)
+        order = [(self._head + i) % capacity for i in range(self._count)]
+        self._times = array("d", (self._times[i] for i in order)) + array("d", bytes(8 * capacity))
+        self._values = array("d", (self._values[i] for i in order)) + array("d", bytes(8 * capacity))
+        self._head = 0
+
+
+class SensorHistory:
+    """Rolling windows for every sensor of one device"""
+
+    def __init__(self, sensor_keys, windows: dict[str, float]):
+        """Initialize history, windows maps a label ("1h") to seconds"""
+        self._windows = {
+            sensor_key: {label: RollingWindow(seconds) for label, seconds in windows.items()}
+            for sensor_key in sensor_keys
+        }
+
+    def add(self, timestamp: float, data: dict[str, Any]):
+        """Add the numeric readings of one update"""
+        for sensor_key, value in data.items():
+            windows = self._windows.get(sensor_key)
+            if windows is None or not isinstance(value, (int, float)):
+                continue
+            for window in windows.values():
+                window.add(timestamp, value)
+
+    def attributes(self, sensor_key: str, now: Optional[float] = None) -> dict[str, float]:
+        """Return {"mean_1h": ..., "std_24h": ...} for one sensor"""
+        attrs = {}
+        for label, window in self._windows.get(sensor_key, {}).items():
+            for name, value in window.statistics(now).items():
+                attrs[f"{name}_{label}"] = round(value, 3)
+        return attrs
+
+
+def attribute_names(windows: dict[str, float]) -> frozenset[str]:
+    """Return every attribute name SensorHistory.attributes can produce"""
+    return frozenset(f"{name}_{label}" for label in windows for name in STATISTICS)
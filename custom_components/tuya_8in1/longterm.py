@@ -0,0 +1,192 @@
+"""
+Bulk long-term statistics for Tuya 8-in-1 devices
+Readings are aggregated in memory per hour and imported into the recorder
+as external statistics once the hour is complete - one statistics row per
+sensor and hour instead of a state row per reading. The recorder only
+accepts imported statistics with an hourly period.
+
+On unload and shutdown the partial hour is imported as well and kept in
+HA storage. When the entry starts again within the same hour it continues
+from there, and the complete hour later replaces the partial row.
+"""
+
+import logging
+from datetime import datetime
+from typing import Any, Optional
+
+from homeassistant.components.recorder.models import StatisticData, StatisticMetaData
+from homeassistant.components.recorder.statistics import async_add_external_statistics
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util, slugify
+
+from .const import DOMAIN, LONG_TERM_STORAGE_KEY, LONG_TERM_STORAGE_VERSION
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class _Bucket:
+    """Min, max and mean of one sensor over one hour"""
+
+    __slots__ = ("minimum", "maximum", "total", "count", "last")
+
+    def __init__(self, value: float):
+        self.minimum = self.maximum = self.total = self.last = value
+        self.count = 1
+
+    def add(self, value: float):
+        if value < self.minimum:
+            self.minimum = value
+        elif value > self.maximum:
+            self.maximum = value
+        self.total += value
+        self.count += 1
+        self.last = value
+
+    def as_list(self) -> list[float]:
+        return [self.minimum, self.maximum, self.total, self.count, self.last]
+
+    @classmethod
+    def from_list(cls, values: list[float]) -> "_Bucket":
+        bucket = cls.__new__(cls)
+        bucket.minimum, bucket.maximum, bucket.total, bucket.count, bucket.last = values
+        return bucket
+
+
+class HourlyAggregator:
+    """Readings of the current hour, handed out once the hour is over"""
+
+    def __init__(self, sensor_keys):
+        """Initialize aggregator"""
+        self._sensor_keys = frozenset(sensor_keys)
+        self._start: Optional[datetime] = None
+        self._buckets: dict[str, _Bucket] = {}
+
+    def add(self, now: datetime, data: dict[str, Any]) -> Optional[tuple[datetime, dict[str, _Bucket]]]:
+        """Add the numeric readings of one update
+
+        Returns (hour start, buckets) of the previous hour when this reading
+        starts a new one, otherwise None.
+        """
+        start = now.replace(minute=0, second=0, microsecond=0)
+        completed = None
+        if start != self._start:
+            if self._buckets:
+                completed = (self._start, self._buckets)
+            self._start = start
+            self._buckets = {}
+
+        buckets = self._buckets
+        for sensor_key, value in data.items():
+            if sensor_key not in self._sensor_keys or not isinstance(value, (int, float)):
+                continue
+            bucket = buckets.get(sensor_key)
+            if bucket is None:
+                buckets[sensor_key] = _Bucket(value)
+            else:
+                bucket.add(value)
+        return completed
+
+    @property
+    def current(self) -> Optional[tuple[datetime, dict[str, _Bucket]]]:
+        """Return (hour start, buckets) of the hour in progress, None when empty"""
+        return (self._start, self._buckets) if self._buckets else None
+
+    def restore(self, start: datetime, buckets: dict[str, _Bucket]):
+        """Continue an hour saved before an unload"""
+        self._start = start
+        self._buckets = {
+            sensor_key: bucket for sensor_key, bucket in buckets.items()
+            if sensor_key in self._sensor_keys
+        }
+
+
+class LongTermStatistics:
+    """Hourly aggregation and import for the sensors of one device"""
+
+    def __init__(self, hass: HomeAssistant, device_id: str, device_name: str,
+                 sensor_types: dict[str, dict[str, Any]]):
+        """Initialize statistics, sensor_types as in SENSOR_TYPES"""
+        self.hass = hass
+        self._store = _store(hass, device_id)
+        self._metadata: dict[str, StatisticMetaData] = {
+            sensor_key: StatisticMetaData(
+                has_mean=True,
+                has_sum=False,
+                name=f"{device_name} {config['name']}",
+                source=DOMAIN,
+                statistic_id=statistic_id(device_id, sensor_key),
+                unit_of_measurement=config.get("unit"),
+            )
+            for sensor_key, config in sensor_types.items()
+            if config.get("state_class") == "measurement"
+        }
+        self._aggregator = HourlyAggregator(self._metadata)
+        self.imported_hours = 0
+
+    def add(self, now: datetime, data: dict[str, Any]):
+        """Add one update, importing the previous hour when it is complete"""
+        completed = self._aggregator.add(now, data)
+        if completed is not None:
+            self._import(*completed)
+
+    async def async_load(self):
+        """Continue the partial hour saved by async_flush, if it is still running"""
+        data = await self._store.async_load()
+        if data is None:
+            return
+        start = dt_util.parse_datetime(data["start"])
+        if start != dt_util.utcnow().replace(minute=0, second=0, microsecond=0):
+            return  # Imported as a partial hour before the unload
+        self._aggregator.restore(
+            start,
+            {sensor_key: _Bucket.from_list(values) for sensor_key, values in data["buckets"].items()},
+        )
+        _LOGGER.debug("📊 Continuing statistics of %d sensors for %s", len(data["buckets"]), start)
+
+    async def async_flush(self):
+        """Import the partial hour and save it to continue after a reload"""
+        current = self._aggregator.current
+        if current is None:
+            return
+        start, buckets = current
+        self._import(start, buckets)
+        await self._store.async_save({
+            "start": start.isoformat(),
+            "buckets": {sensor_key: bucket.as_list() for sensor_key, bucket in buckets.items()},
+        })
+
+    def _import(self, start: datetime, buckets: dict[str, _Bucket]):
+        if "recorder" not in self.hass.config.components:
+            _LOGGER.debug("Recorder not loaded, dropping statistics of %s", start)
+            return
+        for sensor_key, bucket in buckets.items():
+            async_add_external_statistics(
+                self.hass,
+                self._metadata[sensor_key],
+                [
+                    StatisticData(
+                        start=start,
+                        mean=bucket.total / bucket.count,
+                        min=bucket.minimum,
+                        max=bucket.maximum,
+                        state=bucket.last,
+                    )
+                ],
+            )
+        self.imported_hours += 1
+        _LOGGER.debug("📊 Imported statistics of %d sensors for %s", len(buckets), start)
+
+
+def _store(hass: HomeAssistant, device_id: str) -> Store:
+    return Store(hass, LONG_TERM_STORAGE_VERSION, f"{LONG_TERM_STORAGE_KEY}.{slugify(device_id)}")
+
+
+async def async_remove_partial_hour(hass: HomeAssistant, device_id: str):
+    """Delete the saved partial hour, e.g. when the entry is removed"""
+    await _store(hass, device_id).async_remove()
+
+
+def statistic_id(device_id: str, sensor_key: str) -> str:
+    """Return the external statistic id of one sensor, e.g. tuya_8in1:bf70..._ph"""
+    return f"{DOMAIN}:{slugify(f'{device_id}_{sensor_key}')}"
@@ -0,0 +1,97 @@
+"""
+Shared device connections for Tuya 8-in-1 devices
+The firmware accepts very few LAN clients at once, so the coordinator,
+config flow and options flow all go through one registry per HA instance:
+one live client per device and one request at a time.
+"""
+
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+from homeassistant.core import HomeAssistant
+
+from .client import TuyaLocalClient
+from .const import DATA_CONNECTIONS
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def async_get_registry(hass: HomeAssistant) -> "TuyaConnectionRegistry":
+    """Return the connection registry shared by all config entries"""
+    if DATA_CONNECTIONS not in hass.data:
+        hass.data[DATA_CONNECTIONS] = TuyaConnectionRegistry()
+    return hass.data[DATA_CONNECTIONS]
+
+
+@dataclass
+class _Connection:
+    # Every client for the device shares this lock - one request at a time
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+    client: Optional[TuyaLocalClient] = None
+    users: int = 0
+
+
+class TuyaConnectionRegistry:
+    """Live clients keyed by (device_id, host)"""
+
+    def __init__(self):
+        """Initialize registry"""
+        self._connections: dict[tuple[str, str], _Connection] = {}
+
+    def async_acquire(self, device_id: str, local_key: str, host: str,
+                      version: float, **kwargs: Any) -> TuyaLocalClient:
+        """Return the shared client for a device, creating it if needed
+
+        Every acquire must be paired with async_release.
+        """
+        conn = self._connections.setdefault((device_id, host), _Connection())
+        if conn.client is None:
+            conn.client = TuyaLocalClient(
+                device_id, local_key, host, version=version, lock=conn.lock, **kwargs
+            )
+        conn.users += 1
+        return conn.client
+
+    async def async_release(self, client: TuyaLocalClient):
+        """Drop one user of a client, closing it after the last one"""
+        key = (client.device_id, client.host)
+        conn = self._connections.get(key)
+        if conn is None or conn.client is not client:
+            await client.async_close()
+            return
+
+        conn.users -= 1
+        if conn.users <= 0:
+            del self._connections[key]
+            await client.async_close()
+
+    async def async_status(self, device_id: str, local_key: str, host: str,
+                           version: float, **kwargs: Any) -> tuple[dict, float]:
+        """One status request for the config and options flows
+
+        Reuses the live session when the credentials match. Otherwise the
+        live session is closed first so the test connection does not compete
+        with it for the device's few client slots. Returns the result and the
+        protocol version the device answered on.
+        """
+        conn = self._connections.get((device_id, host))
+        live = conn.client if conn else None
+        if (
+            live is not None
+            and live.local_key == local_key.encode("latin1")
+            and live.configured_version == float(version)
+        ):
+            _LOGGER.debug(f"Reusing live session with {host} for validation")
+            return await live.async_status(), live.version
+
+        if live is not None:
+            # Reconnects on its next poll
+            await live.async_close()
+
+        client = TuyaLocalClient(
+            device_id, local_key, host, version=version,
+            lock=conn.lock if conn else None, **kwargs
+        )
+        return await client.async_status(), client.version
@@ -0,0 +1,189 @@
+"""
+Shared poll scheduler for all Tuya 8-in-1 devices
+Spreads polls across the scan interval with jitter and caps how many
+device connections are open at once, serving higher priority devices first.
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import random
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Optional
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+
+from .const import (
+    DATA_SCHEDULER,
+    DEFAULT_MAX_CONCURRENT_POLLS,
+    POLL_JITTER,
+)
+
+if TYPE_CHECKING:
+    from . import TuyaDataUpdateCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def async_get_scheduler(hass: HomeAssistant) -> "TuyaPollScheduler":
+    """Return the scheduler shared by all config entries"""
+    if DATA_SCHEDULER not in hass.data:
+        hass.data[DATA_SCHEDULER] = TuyaPollScheduler(hass)
+    return hass.data[DATA_SCHEDULER]
+
+
+class PrioritySlots:
+    """Semaphore that hands free slots to the highest priority waiter"""
+
+    def __init__(self, limit: int):
+        """Initialize slots"""
+        self._free = limit
+        self._waiters: list = []
+        self._seq = itertools.count()
+
+    @property
+    def waiting(self) -> int:
+        """Return number of polls waiting for a slot"""
+        return sum(1 for *_, future in self._waiters if not future.done())
+
+    @asynccontextmanager
+    async def acquire(self, priority: int):
+        """Hold one slot for the duration of the block"""
+        if self._free > 0 and not self.waiting:
+            self._free -= 1
+        else:
+            future = asyncio.get_running_loop().create_future()
+            # FIFO within the same priority
+            heapq.heappush(self._waiters, (-priority, next(self._seq), future))
+            try:
+                await future
+            except asyncio.CancelledError:
+                if future.done() and not future.cancelled():
+                    # Slot was handed over just before cancellation
+                    self._release()
+                raise
+
+        try:
+            yield
+        finally:
+            self._release()
+
+    def _release(self):
+        while self._waiters:
+            *_, future = heapq.heappop(self._waiters)
+            if not future.done():
+                future.set_result(None)
+                return
+        self._free += 1
+
+
+@dataclass
+class _Subscription:
+    coordinator: "TuyaDataUpdateCoordinator"
+    priority: int
+    due: float = 0.0
+    # First poll runs right away, the regular phase is picked after it
+    spread: bool = False
+    cancel_timer: Optional[CALLBACK_TYPE] = None
+    task: Optional[asyncio.Task] = None
+
+
+class TuyaPollScheduler:
+    """Drives polls for every subscribed coordinator"""
+
+    def __init__(self, hass: HomeAssistant, max_concurrent: int = DEFAULT_MAX_CONCURRENT_POLLS):
+        """Initialize scheduler"""
+        self.hass = hass
+        self.slots = PrioritySlots(max_concurrent)
+        self._subscriptions: dict[str, _Subscription] = {}
+
+    @callback
+    def async_subscribe(self, coordinator: "TuyaDataUpdateCoordinator",
+                        immediate: bool = False) -> CALLBACK_TYPE:
+        """Start polling a coordinator, returns the unsubscribe callback
+
+        immediate polls once as soon as a slot is free (first contact after
+        setup) before settling on a random phase.
+        """
+        key = coordinator.device_id
+        sub = _Subscription(coordinator, coordinator.priority, spread=immediate)
+        self._subscriptions[key] = sub
+
+        # Random phase spreads devices evenly across the interval
+        interval = coordinator.poll_interval.total_seconds()
+        sub.due = time.monotonic() + (0 if immediate else random.uniform(0, interval))
+        self._schedule(sub)
+
+        _LOGGER.debug(f"Scheduler: {key} subscribed (priority {sub.priority}, every {interval}s)")
+
+        @callback
+        def unsubscribe():
+            self._unsubscribe(key, sub)
+
+        return unsubscribe
+
+    @callback
+    def async_poll_soon(self, device_id: str):
+        """Move the next poll of a device to now, e.g. after its address changed"""
+        sub = self._subscriptions.get(device_id)
+        if sub is None or sub.cancel_timer is None:
+            # Not subscribed, or a poll is running already
+            return
+        sub.cancel_timer()
+        sub.due = time.monotonic()
+        self._schedule(sub)
+
+    @callback
+    def _unsubscribe(self, key: str, sub: _Subscription):
+        if self._subscriptions.get(key) is sub:
+            del self._subscriptions[key]
+        if sub.cancel_timer:
+            sub.cancel_timer()
+            sub.cancel_timer = None
+        if sub.task and not sub.task.done():
+            sub.task.cancel()
+
+    @callback
+    def _schedule(self, sub: _Subscription):
+        delay = max(0.0, sub.due - time.monotonic())
+
+        @callback
+        def fire(_now):
+            sub.cancel_timer = None
+            sub.task = self.hass.async_create_background_task(
+                self._async_poll(sub), f"tuya_8in1_poll_{sub.coordinator.device_id}"
+            )
+
+        sub.cancel_timer = async_call_later(self.hass, delay, fire)
+
+    async def _async_poll(self, sub: _Subscription):
+        coordinator = sub.coordinator
+        interval = coordinator.poll_interval.total_seconds()
+
+        # Device pushed fresh data recently - the consistency poll can wait
+        last_push = coordinator.last_push_update
+        if last_push and time.monotonic() - last_push < interval:
+            sub.due = last_push + interval
+            self._schedule(sub)
+            return
+
+        async with self.slots.acquire(sub.priority):
+            await coordinator.async_refresh()
+
+        # Keep the phase, add jitter so devices never line up again
+        interval = coordinator.poll_interval.total_seconds()
+        now = time.monotonic()
+        if sub.spread:
+            # Devices set up together would otherwise stay bunched up
+            sub.spread = False
+            sub.due = now + random.uniform(0, interval)
+        else:
+            sub.due += interval + random.uniform(-POLL_JITTER, POLL_JITTER) * interval
+        if sub.due < now:
+            # Fell behind (slots busy or slow device) - re-phase instead of bursting
+            sub.due = now + interval
+        self._schedule(sub)
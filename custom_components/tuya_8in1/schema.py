@@ -0,0 +1,91 @@
+"""
+DPS schema of Tuya 8-in-1 devices
+Firmware versions differ in the DPS they report. The ids and value types
+of the first status reply are stored per device in HA storage, and the
+sensor table of the device is built from them - entities, decoding,
+filters and archive columns cover exactly the readings that exist, and
+later startups reuse the stored schema.
+"""
+
+from typing import Any, Optional
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+from homeassistant.util import slugify
+
+from .const import (
+    DERIVED_SENSOR_TYPES,
+    SCHEMA_STORAGE_KEY,
+    SCHEMA_STORAGE_VERSION,
+    SENSOR_TYPES,
+)
+
+# DPS id -> value type ("int", "float", "bool" or "str")
+DpsSchema = dict[str, str]
+
+NUMERIC_TYPES = ("int", "float")
+
+
+def _store(hass: HomeAssistant, device_id: str) -> Store:
+    return Store(hass, SCHEMA_STORAGE_VERSION, f"{SCHEMA_STORAGE_KEY}.{slugify(device_id)}")
+
+
+async def async_load_schema(hass: HomeAssistant, device_id: str) -> Optional[DpsSchema]:
+    """Return the stored schema, None when the device was never reached"""
+    data = await _store(hass, device_id).async_load()
+    return None if data is None else data["dps"]
+
+
+async def async_save_schema(hass: HomeAssistant, device_id: str, schema: DpsSchema):
+    """Store the schema of a device"""
+    await _store(hass, device_id).async_save({"dps": schema})
+
+
+async def async_remove_schema(hass: HomeAssistant, device_id: str):
+    """Delete the stored schema, e.g. when the entry is removed"""
+    await _store(hass, device_id).async_remove()
+
+
+def discover_schema(dps: dict[str, Any]) -> DpsSchema:
+    """Return the schema of a status reply"""
+    return {str(dps_id): type(value).__name__ for dps_id, value in dps.items()}
+
+
+def schema_sensor_types(schema: Optional[DpsSchema]) -> dict[str, dict[str, Any]]:
+    """Return the sensor table of a device, as SENSOR_TYPES
+
+    Known sensors the device does not report are left out, numeric DPS
+    missing from SENSOR_TYPES get a generic unscaled sensor. Without a
+    schema all of SENSOR_TYPES is used until the first status arrives.
+    """
+    if schema is None:
+        return dict(SENSOR_TYPES)
+
+    sensor_types = {
+        sensor_key: config
+        for sensor_key, config in SENSOR_TYPES.items()
+        if str(config["dps_id"]) in schema
+    }
+    known = {str(config["dps_id"]) for config in SENSOR_TYPES.values()}
+    for dps_id in sorted(schema.keys() - known, key=lambda dps_id: (len(dps_id), dps_id)):
+        if schema[dps_id] not in NUMERIC_TYPES:
+            continue
+        sensor_types[f"dps_{dps_id}"] = {
+            "name": f"DPS {dps_id}",
+            "dps_id": int(dps_id),
+            "unit": None,
+            "device_class": None,
+            "state_class": "measurement",
+            "scale": 1,
+            "icon": "mdi:help-circle",
+        }
+    return sensor_types
+
+
+def schema_derived_types(sensor_types: dict[str, dict[str, Any]]) -> dict[str, dict[str, Any]]:
+    """Return the derived sensors whose inputs are all in sensor_types"""
+    return {
+        sensor_key: config
+        for sensor_key, config in DERIVED_SENSOR_TYPES.items()
+        if all(key in sensor_types for key in config["inputs"])
+    }
@@ -3,17 +3,27 @@ Sensors for Tuya 8-in-1 Water Quality Tester integration
 """
 
 import logging
+import time
 from typing import Any
 
-from homeassistant.components.sensor import SensorEntity
+from homeassistant.components.sensor import RestoreSensor, SensorEntity
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import CONF_DEVICE_ID, CONF_NAME
-from homeassistant.core import HomeAssistant
+from homeassistant.const import CONF_DEVICE_ID, CONF_NAME, MATCH_ALL, EntityCategory, UnitOfTime
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import entity_registry as er
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from . import TuyaDataUpdateCoordinator
-from .const import DOMAIN, SENSOR_TYPES, DEVICE_INFO
+from .const import (
+    DOMAIN,
+    DIAGNOSTIC_SENSOR_TYPES,
+    DEVICE_INFO,
+    HISTORY_STATE_INTERVAL,
+    HISTORY_WINDOWS,
+    STATISTICS_STATE_INTERVAL,
+)
+from .history import attribute_names
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -29,10 +39,27 @@ async def async_setup_entry(
     
     entities = []
     
-    # Create sensor entities
-    for sensor_key, sensor_config in SENSOR_TYPES.items():
+    # Long-term statistics are imported in bulk instead of compiled from states
+    sensor_class = Tuya8in1Sensor if coordinator.long_term is None else Tuya8in1ImportedSensor
+    
+    # Create sensor entities for the DPS the device has, derived metrics
+    # come from the same coordinator data
+    sensor_types = {**coordinator.sensor_types, **coordinator.derived_sensor_types}
+    for sensor_key, sensor_config in sensor_types.items():
+        entities.append(
+            sensor_class(
+                coordinator,
+                device_id,
+                device_name,
+                sensor_key,
+                sensor_config,
+            )
+        )
+    
+    # Poll diagnostics, disabled until enabled in the entity registry
+    for sensor_key, sensor_config in DIAGNOSTIC_SENSOR_TYPES.items():
         entities.append(
-            Tuya8in1Sensor(
+            Tuya8in1DiagnosticSensor(
                 coordinator,
                 device_id,
                 device_name,
@@ -42,10 +69,23 @@ async def async_setup_entry(
         )
     
     async_add_entities(entities)
+    
+    # Drop entities of sensors a known schema says the device does not have
+    if coordinator.dps_schema is not None:
+        registry = er.async_get(hass)
+        unique_ids = {entity.unique_id for entity in entities}
+        for entry in er.async_entries_for_config_entry(registry, config_entry.entry_id):
+            if entry.domain == "sensor" and entry.unique_id not in unique_ids:
+                _LOGGER.info(f"📋 Removing {entry.entity_id}, not reported by {device_id}")
+                registry.async_remove(entry.entity_id)
 
-class Tuya8in1Sensor(CoordinatorEntity, SensorEntity):
+class Tuya8in1Sensor(CoordinatorEntity, RestoreSensor):
     """Representation of a Tuya 8-in-1 sensor"""
     
+    # Raw value and rolling statistics change with every poll, keep them
+    # out of the recorder
+    _unrecorded_attributes = frozenset({"raw_value"}) | attribute_names(HISTORY_WINDOWS)
+    
     def __init__(
         self,
         coordinator: TuyaDataUpdateCoordinator,
@@ -84,18 +124,75 @@ class Tuya8in1Sensor(CoordinatorEntity, SensorEntity):
         self._attr_device_info = DEVICE_INFO.copy()
         self._attr_device_info["identifiers"] = {(DOMAIN, device_id)}
         self._attr_device_info["name"] = device_name
+        
+        # Change detection - last state actually written
+        self._deadband = sensor_config.get("deadband", 0)
+        self._written_value = None
+        self._written_available = None
+        self._statistics_written_at = 0.0
+        
+        # Last known value shown until the device is first reached
+        self._restored_value = None
+    
+    async def async_added_to_hass(self) -> None:
+        """Restore the last value and remember the initial state written"""
+        await super().async_added_to_hass()
+        if self.coordinator.data is None:
+            last_data = await self.async_get_last_sensor_data()
+            if last_data is not None:
+                self._restored_value = last_data.native_value
+        self._written_value = self.native_value
+        self._written_available = self.available
+        self._statistics_written_at = time.monotonic()
+    
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write state when the value moved past its deadband or statistics are due"""
+        value = self.native_value
+        available = self.available
+        
+        if (
+            available == self._written_available
+            and not self._value_changed(value)
+            and not self._statistics_due()
+        ):
+            return
+        
+        self._written_value = value
+        self._written_available = available
+        self._statistics_written_at = time.monotonic()
+        self.async_write_ha_state()
+    
+    def _statistics_due(self) -> bool:
+        """Refresh rolling statistics while the value holds steady"""
+        return (
+            self.coordinator.history is not None
+            and bool(self._written_available)
+            and time.monotonic() - self._statistics_written_at >= HISTORY_STATE_INTERVAL
+        )
+    
+    def _value_changed(self, value: Any) -> bool:
+        """Compare with the last written value"""
+        previous = self._written_value
+        if value is None or previous is None or not self._deadband:
+            return value != previous
+        return abs(value - previous) >= self._deadband
     
     @property
     def native_value(self) -> Any:
         """Return the current sensor value"""
         if self.coordinator.data is None:
-            return None
+            return self._restored_value
         
         return self.coordinator.data.get(self._sensor_key)
     
     @property
     def available(self) -> bool:
         """Return sensor availability information"""
+        if self.coordinator.data is None:
+            # Restored value stays up until first contact fails
+            return self.coordinator.last_update_success and self._restored_value is not None
+        
         return (
             self.coordinator.last_update_success
             and self.coordinator.data is not None
@@ -111,11 +208,109 @@ class Tuya8in1Sensor(CoordinatorEntity, SensorEntity):
         attrs = {
             "device_id": self._device_id,
             "sensor_type": self._sensor_key,
-            "dps_id": self._sensor_config.get("dps_id"),
         }
+        if "inputs" in self._sensor_config:
+            attrs["derived_from"] = list(self._sensor_config["inputs"])
+        else:
+            attrs["dps_id"] = self._sensor_config.get("dps_id")
         
         # Add last update information
         if self.coordinator.last_update_success:
             attrs["last_update_success"] = self.coordinator.last_update_success
         
+        # Decoded value before the outlier filter
+        if self.coordinator.filters is not None and self._sensor_key in self.coordinator.raw_data:
+            attrs["raw_value"] = self.coordinator.raw_data[self._sensor_key]
+        
+        # Rolling statistics from memory, e.g. mean_1h / std_24h
+        if self.coordinator.history is not None:
+            attrs.update(self.coordinator.history.attributes(self._sensor_key))
+        
         return attrs
+
+
+class Tuya8in1ImportedSensor(Tuya8in1Sensor):
+    """Sensor whose long-term statistics come from the hourly import
+    
+    No state class, so the recorder does not compile statistics from the
+    states as well, no recorded attributes, and value changes written at
+    most every STATISTICS_STATE_INTERVAL seconds.
+    """
+    
+    _unrecorded_attributes = frozenset({MATCH_ALL})
+    
+    def __init__(self, *args: Any) -> None:
+        """Initialize the sensor"""
+        super().__init__(*args)
+        self._attr_state_class = None
+        self._written_at = 0.0
+    
+    def _value_changed(self, value: Any) -> bool:
+        """Throttle value writes, availability changes are still written at once"""
+        now = time.monotonic()
+        if now - self._written_at < STATISTICS_STATE_INTERVAL or not super()._value_changed(value):
+            return False
+        self._written_at = now
+        return True
+
+
+class Tuya8in1DiagnosticSensor(CoordinatorEntity, SensorEntity):
+    """Poll latency percentile or counter of one device"""
+    
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+    
+    def __init__(
+        self,
+        coordinator: TuyaDataUpdateCoordinator,
+        device_id: str,
+        device_name: str,
+        sensor_key: str,
+        sensor_config: dict,
+    ) -> None:
+        """Initialize the sensor"""
+        super().__init__(coordinator)
+        
+        self._phase = sensor_config.get("phase")
+        self._counter = sensor_config.get("counter")
+        
+        self._attr_unique_id = f"{device_id}_{sensor_key}"
+        self._attr_name = f"{device_name} {sensor_config['name']}"
+        self._attr_icon = sensor_config.get("icon")
+        
+        if self._phase:
+            self._attr_native_unit_of_measurement = UnitOfTime.MILLISECONDS
+            self._attr_state_class = "measurement"
+            self._attr_suggested_display_precision = 1
+        else:
+            self._attr_state_class = "total_increasing"
+        
+        self._attr_device_info = DEVICE_INFO.copy()
+        self._attr_device_info["identifiers"] = {(DOMAIN, device_id)}
+        self._attr_device_info["name"] = device_name
+    
+    @property
+    def available(self) -> bool:
+        """Diagnostics stay available while the device is failing"""
+        return True
+    
+    @property
+    def native_value(self) -> Any:
+        """Return p95 of the phase, or the counter"""
+        stats = self.coordinator.stats
+        if self._counter:
+            return getattr(stats, self._counter)
+        p95 = stats.phase_percentiles(self._phase).get("p95")
+        return None if p95 is None else round(p95, 2)
+    
+    @property
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        """Return all percentiles of the phase"""
+        if not self._phase:
+            return None
+        
+        samples = self.coordinator.stats.phases[self._phase]
+        return {
+            **{key: round(value, 2) for key, value in samples.percentiles().items()},
+            "samples": len(samples),
+        }
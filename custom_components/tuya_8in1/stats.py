@@ -0,0 +1,82 @@
+"""
+Per-device poll statistics for Tuya 8-in-1 devices
+Rolling latency percentiles per poll phase plus retry and failure counts,
+read by the diagnostic sensors and the diagnostics download.
+"""
+
+from collections import deque
+from typing import Any, Optional
+
+# Phases timed on every poll - client phases plus mapping and the total
+PHASES = ("connect", "handshake", "wait", "decrypt", "mapping", "total")
+PERCENTILES = (50, 95, 99)
+
+
+class RollingPercentiles:
+    """Nearest-rank percentiles over the last samples"""
+
+    def __init__(self, size: int):
+        """Initialize window"""
+        self._samples: deque[float] = deque(maxlen=size)
+        self._cache: Optional[dict[str, float]] = None
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def add(self, value: float):
+        """Add one sample"""
+        self._samples.append(value)
+        self._cache = None
+
+    def percentiles(self) -> dict[str, float]:
+        """Return {"p50": ..., "p95": ..., "p99": ...}, empty without samples"""
+        if self._cache is None:
+            ordered = sorted(self._samples)
+            self._cache = {
+                f"p{percentile}": ordered[max(0, -(-len(ordered) * percentile // 100) - 1)]
+                for percentile in PERCENTILES
+            } if ordered else {}
+        return self._cache
+
+
+class PollStats:
+    """Latency breakdown and counters for one device"""
+
+    def __init__(self, window: int):
+        """Initialize statistics"""
+        self.phases = {phase: RollingPercentiles(window) for phase in PHASES}
+        self.polls = 0
+        self.failures = 0
+        self.retries = 0
+
+    def record_poll(self, timings: dict[str, float], retries: int = 0):
+        """Record a successful poll, timings in seconds per phase"""
+        self.polls += 1
+        self.retries += retries
+        for phase, seconds in timings.items():
+            if phase in self.phases:
+                self.phases[phase].add(seconds * 1000)
+
+    def record_failure(self, retries: int = 0):
+        """Record a failed poll"""
+        self.failures += 1
+        self.retries += retries
+
+    def phase_percentiles(self, phase: str) -> dict[str, float]:
+        """Return the percentiles of one phase in ms"""
+        return self.phases[phase].percentiles()
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return all statistics for diagnostics"""
+        return {
+            "polls": self.polls,
+            "failures": self.failures,
+            "retries": self.retries,
+            "latency_ms": {
+                phase: {
+                    "samples": len(samples),
+                    **{key: round(value, 2) for key, value in samples.percentiles().items()},
+                }
+                for phase, samples in self.phases.items()
+            },
+        }
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Tuya 8-in-1 Water Quality Tester - fake Tuya Cloud (OpenAPI) server
+Answers the token, device info, status, specifications and functions
+requests the analyzer makes, so its cloud scan can run offline:
+    python simulator/tuya_cloud_fake.py --port 8765 --latency 0.3
+with "endpoint": "http://127.0.0.1:8765" under "tuya_cloud" in
+tuya_config.json. Any device id and credentials are accepted, signatures
+are not checked. Every request is logged with its path so tests can count
+them. Standard library only.
+"""
+
+import argparse
+import json
+import logging
+import re
+import sys
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+_LOGGER = logging.getLogger("tuya_cloud_fake")
+
+DEFAULT_PORT = 8765
+CATEGORY = "dgnbj"
+PRODUCT_ID = "layxxij0sdbrfmrf"
+
+# Status code -> (DPS id, raw value, scale exponent, unit), as in SENSOR_TYPES
+STATUS = {
+    "temp_current": (8, 238, 1, "℃"),
+    "ph_current": (106, 790, 2, ""),
+    "tds_current": (111, 359, 0, "ppm"),
+    "ec_current": (116, 718, 0, "us/cm"),
+    "salinity_current": (121, 418, 0, "ppm"),
+    "pro_current": (126, 997, 3, ""),
+    "orp_current": (131, 518, 0, "mV"),
+    "cf_current": (136, 718, 0, ""),
+}
+
+DEVICE_PATH = re.compile(r"^/v1\.0/devices/([^/]+)(/status|/specifications|/functions)?$")
+
+
+def _response(result) -> dict:
+    return {"result": result, "success": True, "t": int(time.time() * 1000), "tid": uuid.uuid4().hex}
+
+
+def _error(code: int, msg: str) -> dict:
+    return {"code": code, "msg": msg, "success": False, "t": int(time.time() * 1000), "tid": uuid.uuid4().hex}
+
+
+def _specification(code: str) -> dict:
+    _dps_id, _value, scale, unit = STATUS[code]
+    values = {"unit": unit, "min": 0, "max": 10 ** (scale + 4), "scale": scale, "step": 1}
+    return {"code": code, "type": "Integer", "values": json.dumps(values)}
+
+
+def cloud_response(path: str, device_id_filter=None) -> dict:
+    """Return the JSON body for one GET path"""
+    if path.startswith("/v1.0/token"):
+        return _response({
+            "access_token": uuid.uuid4().hex, "refresh_token": uuid.uuid4().hex,
+            "expire_time": 7200, "uid": "fake",
+        })
+
+    match = DEVICE_PATH.match(path)
+    if match is None:
+        return _error(1108, "uri path invalid")
+    device_id, kind = match.groups()
+    if device_id_filter and device_id not in device_id_filter:
+        return _error(2009, "device not found")
+
+    if kind == "/status":
+        return _response([{"code": code, "value": value} for code, (_, value, _, _) in STATUS.items()])
+    if kind == "/specifications":
+        return _response({"category": CATEGORY, "functions": [],
+                          "status": [_specification(code) for code in STATUS]})
+    if kind == "/functions":
+        return _response({"category": CATEGORY, "functions": []})
+    return _response({
+        "id": device_id, "name": "Tuya 8-in-1 (fake cloud)", "category": CATEGORY,
+        "product_id": PRODUCT_ID, "product_name": "8 in 1 Water Quality Tester",
+        "online": True, "local_key": "0123456789abcdef", "ip": "127.0.1.1",
+        "status": [{"code": code, "value": value} for code, (_, value, _, _) in STATUS.items()],
+    })
+
+
+class FakeCloudHandler(BaseHTTPRequestHandler):
+    """GET-only OpenAPI handler, server.latency delays every reply"""
+
+    protocol_version = "HTTP/1.1"  # Keep-alive, like the real endpoint
+
+    def do_GET(self):
+        path = self.path.split("?", 1)[0]
+        _LOGGER.info("GET %s", path)
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        body = json.dumps(cloud_response(path, self.server.device_ids)).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        _LOGGER.debug(format, *args)
+
+
+def create_server(host: str = "127.0.0.1", port: int = DEFAULT_PORT, latency: float = 0.0,
+                  device_ids=None) -> ThreadingHTTPServer:
+    """Return a bound server, run it with serve_forever() (port 0 = any free port)"""
+    server = ThreadingHTTPServer((host, port), FakeCloudHandler)
+    server.daemon_threads = True
+    server.latency = latency
+    server.device_ids = set(device_ids) if device_ids else None
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="Port (0 = any free port)")
+    parser.add_argument("--latency", type=float, default=0, help="Seconds added to every reply")
+    parser.add_argument("--device-id", action="append", help="Only answer for these devices")
+    parser.add_argument("--debug", action="store_true")
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.DEBUG if args.debug else logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s',
+        stream=sys.stderr,
+    )
+    server = create_server(args.host, args.port, args.latency, args.device_id)
+    host, port = server.server_address[:2]
+    print(json.dumps({"endpoint": f"http://{host}:{port}"}), flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,379 @@
+#!/usr/bin/env python3
+"""
+Tuya 8-in-1 Water Quality Tester - LAN device simulator
+Serves the DPS of SENSOR_TYPES over the Tuya LAN protocol (3.3/3.4/3.5)
+with drifting values and optional fault injection, so the coordinator,
+config flow and analyzer can be exercised without hardware.
+
+Every instance gets its own loopback address on port 6668, the port the
+integration always uses (Linux routes all of 127.0.0.0/8 to lo):
+    python simulator/tuya_simulator.py --count 200 --latency 0.05 --drop-rate 0.01
+
+One JSON line per instance (device_id, local_key, host, port, version) is
+printed to stdout for scripting. --beacon-target sends the UDP discovery
+beacons real devices broadcast. Only needs the "cryptography" package.
+"""
+
+import argparse
+import asyncio
+import hmac
+import importlib.util
+import ipaddress
+import json
+import logging
+import os
+import random
+import socket
+import sys
+import time
+from dataclasses import dataclass, field
+from hashlib import sha256
+from typing import Optional
+
+# client.py has no Home Assistant imports - load it without the package
+_CLIENT_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "..", "custom_components", "tuya_8in1", "client.py"
+)
+_spec = importlib.util.spec_from_file_location("tuya_8in1_client", _CLIENT_PATH)
+tuya = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(tuya)
+
+_LOGGER = logging.getLogger("tuya_simulator")
+
+DEFAULT_LOCAL_KEY = "0123456789abcdef"
+DEFAULT_HOST = "127.0.1.1"
+
+# Independent signals: DPS id -> (start, minimum, maximum, step) in raw device units
+DRIFT = {
+    "8": (238, 150, 350, 2),  # temperature, 0.1 °C
+    "106": (790, 600, 900, 3),  # pH, 0.01
+    "116": (718, 400, 1200, 8),  # EC, μS/cm
+    "126": (997, 900, 1100, 2),  # pro sensor
+    "131": (518, 300, 750, 6),  # ORP, mV
+}
+DRIFT_TICK = 5  # Seconds per random-walk step
+BEACON_INTERVAL = 5  # Seconds between discovery beacons, like real devices
+MEAN_REVERSION = 0.05  # Pull towards the start value per step
+
+
+@dataclass
+class Faults:
+    """Fault injection settings, probabilities are per request"""
+    latency: float = 0.0  # Seconds added before every reply
+    jitter: float = 0.0  # Random extra latency, 0..jitter seconds
+    drop_rate: float = 0.0  # Close the connection instead of replying
+    bad_frame_rate: float = 0.0  # Reply with a corrupted checksum / GCM tag
+    handshake_delay: float = 0.0  # Seconds before the 3.4/3.5 session key reply
+
+
+@dataclass
+class Stats:
+    """Counters shared by all instances"""
+    connections: int = 0
+    requests: int = 0
+    handshakes: int = 0
+    dropped: int = 0
+    bad_frames: int = 0
+    pushes: int = 0
+
+
+class SimulatedDevice:
+    """One simulated tester"""
+
+    def __init__(self, device_id: str, local_key: str = DEFAULT_LOCAL_KEY,
+                 version: float = 3.5, faults: Optional[Faults] = None,
+                 stats: Optional[Stats] = None, push_interval: float = 0,
+                 seed: Optional[int] = None):
+        """Initialize device"""
+        self.device_id = device_id
+        self.local_key = local_key.encode("latin1")
+        self.version = float(version)
+        self.faults = faults or Faults()
+        self.stats = stats or Stats()
+        self.push_interval = push_interval
+        self.server: Optional[asyncio.AbstractServer] = None
+
+        self._random = random.Random(seed)
+        self._signals = {dps_id: float(start) for dps_id, (start, *_) in DRIFT.items()}
+        self._last_drift = time.monotonic()
+        self._overrides: dict = {}
+
+    @property
+    def address(self) -> tuple[str, int]:
+        """Return the bound (host, port)"""
+        return self.server.sockets[0].getsockname()[:2]
+
+    async def async_start(self, host: str, port: int = tuya.DEFAULT_PORT):
+        """Start listening"""
+        self.server = await asyncio.start_server(self._handle, host, port)
+
+    async def async_stop(self):
+        """Stop listening and drop open connections"""
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+
+    def beacon(self) -> tuple[bytes, int]:
+        """Return the discovery beacon and the UDP port it goes to"""
+        host = self.address[0]
+        payload = {
+            "ip": host, "gwId": self.device_id, "active": 2, "ability": 0, "mode": 0,
+            "encrypt": True, "productKey": "simulated8in1", "version": f"{self.version:.1f}",
+        }
+        version = 3.5 if self.version >= 3.5 else 3.3
+        port = next(port for port, port_version in tuya.DISCOVERY_PORTS.items() if port_version == version)
+        return tuya.pack_beacon(self.version, payload), port
+
+    # --- Values ---
+
+    def dps(self) -> dict:
+        """Return the current DPS, advancing the drift to now"""
+        steps = int((time.monotonic() - self._last_drift) / DRIFT_TICK)
+        if steps:
+            self._last_drift += steps * DRIFT_TICK
+            for _ in range(min(steps, 100)):
+                self._step()
+
+        ec = round(self._signals["116"])
+        dps = {dps_id: round(value) for dps_id, value in self._signals.items()}
+        # Dependent readings follow EC the way the real probe reports them
+        dps["111"] = round(ec * 0.5)  # TDS
+        dps["121"] = round(ec * 0.582)  # salinity
+        dps["136"] = ec  # conductivity factor
+        dps.update(self._overrides)
+        return dps
+
+    def _step(self):
+        for dps_id, (start, minimum, maximum, step) in DRIFT.items():
+            value = self._signals[dps_id]
+            value += self._random.gauss(0, step) + (start - value) * MEAN_REVERSION
+            self._signals[dps_id] = min(maximum, max(minimum, value))
+
+    # --- Protocol ---
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.stats.connections += 1
+        conn = _Connection(self, reader, writer)
+        push_task = None
+        if self.push_interval > 0:
+            push_task = asyncio.create_task(conn.push_loop(self.push_interval))
+        try:
+            await conn.serve()
+        except (asyncio.IncompleteReadError, ConnectionError, tuya.TuyaError) as e:
+            _LOGGER.debug(f"{self.device_id}: connection closed ({e!r})")
+        finally:
+            if push_task is not None:
+                push_task.cancel()
+            writer.close()
+
+
+@dataclass
+class _Connection:
+    device: SimulatedDevice
+    reader: asyncio.StreamReader
+    writer: asyncio.StreamWriter
+    key: bytes = b""
+    seqno: int = 0
+    reported: dict = field(default_factory=dict)
+
+    def __post_init__(self):
+        self.key = self.device.local_key
+        self._write_lock = asyncio.Lock()
+
+    async def serve(self):
+        device = self.device
+        while True:
+            msg = tuya.unpack_message(
+                device.version, self.key, await tuya.read_frame(self.reader), has_retcode=False
+            )
+            faults = device.faults
+
+            if msg.cmd == tuya.SESS_KEY_NEG_START:
+                await self._negotiate(msg)
+                continue
+
+            device.stats.requests += 1
+            if faults.drop_rate and device._random.random() < faults.drop_rate:
+                device.stats.dropped += 1
+                return
+            delay = faults.latency + device._random.uniform(0, faults.jitter)
+            if delay:
+                await asyncio.sleep(delay)
+
+            payload = tuya.decrypt_payload(device.version, self.key, msg.payload)
+            if msg.cmd in (tuya.DP_QUERY, tuya.DP_QUERY_NEW):
+                await self._reply_status(msg.cmd)
+            elif msg.cmd in (tuya.CONTROL, tuya.CONTROL_NEW):
+                data = tuya.decode_json(payload)
+                device._overrides.update(data.get("dps") or {})
+                await self.send(msg.cmd, b"")
+                await self.send_status(self.changed_dps())
+            elif msg.cmd == tuya.HEART_BEAT:
+                await self.send(tuya.HEART_BEAT, b"")
+            else:
+                await self.send(msg.cmd, b"")
+
+    async def _negotiate(self, msg):
+        """Device side of the 3.4/3.5 session key negotiation"""
+        device = self.device
+        device.stats.handshakes += 1
+        local_nonce = tuya.decrypt_payload(device.version, device.local_key, msg.payload)[:16]
+        remote_nonce = os.urandom(16)
+        if device.faults.handshake_delay:
+            await asyncio.sleep(device.faults.handshake_delay)
+
+        proof = hmac.new(device.local_key, local_nonce, sha256).digest()
+        await self.send(tuya.SESS_KEY_NEG_RESP, remote_nonce + proof)
+
+        finish = tuya.unpack_message(
+            device.version, device.local_key, await tuya.read_frame(self.reader), has_retcode=False
+        )
+        expected = hmac.new(device.local_key, remote_nonce, sha256).digest()
+        finish_payload = tuya.decrypt_payload(device.version, device.local_key, finish.payload)
+        if finish.cmd != tuya.SESS_KEY_NEG_FINISH or finish_payload[:32] != expected:
+            raise tuya.TuyaProtocolError("Bad session key finish")
+        self.key = tuya.session_key(device.version, device.local_key, local_nonce, remote_nonce)
+
+    async def _reply_status(self, cmd: int):
+        dps = self.device.dps()
+        self.reported = dict(dps)
+        if self.device.version >= 3.4:
+            # 3.4+ devices ack the query and send the values as a STATUS frame
+            await self.send(cmd, b"")
+            await self.send_status(dps)
+        else:
+            await self.send(cmd, tuya.dumps({"devId": self.device.device_id, "dps": dps}))
+
+    def changed_dps(self) -> dict:
+        dps = self.device.dps()
+        changed = {k: v for k, v in dps.items() if self.reported.get(k) != v}
+        self.reported.update(changed)
+        return changed
+
+    async def push_loop(self, interval: float):
+        """Send changed DPS on their own, like the real tester does"""
+        while True:
+            await asyncio.sleep(interval)
+            changed = self.changed_dps()
+            if changed:
+                self.device.stats.pushes += 1
+                await self.send_status(changed)
+
+    async def send_status(self, dps: dict):
+        if self.device.version >= 3.4:
+            data = {"protocol": 4, "t": int(time.time()), "data": {"dps": dps}}
+        else:
+            data = {"devId": self.device.device_id, "dps": dps, "t": int(time.time())}
+        await self.send(tuya.STATUS, tuya.dumps(data))
+
+    async def send(self, cmd: int, payload: bytes):
+        device = self.device
+        async with self._write_lock:
+            self.seqno += 1
+            # Real 3.4 devices send empty acks as is, not as an encrypted padding block
+            if payload or device.version != 3.4:
+                payload = tuya.encode_payload(device.version, self.key, cmd, payload)
+            frame = tuya.pack_message(device.version, self.key, self.seqno, cmd, payload, retcode=0)
+            if device.faults.bad_frame_rate and device._random.random() < device.faults.bad_frame_rate:
+                device.stats.bad_frames += 1
+                # Flip one bit in the body - breaks the CRC, HMAC or GCM tag
+                position = len(frame) - 12
+                frame = frame[:position] + bytes([frame[position] ^ 0x01]) + frame[position + 1:]
+            self.writer.write(frame)
+            await self.writer.drain()
+
+
+async def async_start_fleet(count: int, host: str = DEFAULT_HOST, port: int = tuya.DEFAULT_PORT,
+                            local_key: str = DEFAULT_LOCAL_KEY, version: float = 3.5,
+                            faults: Optional[Faults] = None, push_interval: float = 0,
+                            stats: Optional[Stats] = None) -> list[SimulatedDevice]:
+    """Start count devices on consecutive addresses starting at host"""
+    stats = stats or Stats()
+    first = ipaddress.ip_address(host)
+    devices = []
+    for index in range(count):
+        device = SimulatedDevice(
+            f"tuyasim{index:013d}", local_key, version, faults, stats, push_interval, seed=index
+        )
+        await device.async_start(str(first + index), port)
+        devices.append(device)
+    return devices
+
+
+async def async_beacon_loop(devices: list[SimulatedDevice], target: str,
+                            interval: float = BEACON_INTERVAL):
+    """Send every device's discovery beacon to target every interval seconds"""
+    loop = asyncio.get_running_loop()
+    transport, _ = await loop.create_datagram_endpoint(
+        asyncio.DatagramProtocol, family=socket.AF_INET, allow_broadcast=True
+    )
+    try:
+        while True:
+            for device in devices:
+                beacon, port = device.beacon()
+                transport.sendto(beacon, (target, port))
+            await asyncio.sleep(interval)
+    finally:
+        transport.close()
+
+
+async def _async_main(args):
+    faults = Faults(args.latency, args.jitter, args.drop_rate, args.bad_frame_rate, args.handshake_delay)
+    stats = Stats()
+    devices = await async_start_fleet(
+        args.count, args.host, args.port, args.local_key, args.version, faults, args.push_interval, stats
+    )
+    for device in devices:
+        host, port = device.address
+        print(json.dumps({
+            "device_id": device.device_id, "local_key": args.local_key,
+            "host": host, "port": port, "version": device.version,
+        }), flush=True)
+    _LOGGER.info(f"{len(devices)} devices running (protocol {args.version})")
+    if args.beacon_target:
+        beacons = asyncio.create_task(async_beacon_loop(devices, args.beacon_target, args.beacon_interval))
+
+    try:
+        while True:
+            await asyncio.sleep(args.stats_interval)
+            _LOGGER.info(f"stats: {stats}")
+    finally:
+        if args.beacon_target:
+            beacons.cancel()
+        for device in devices:
+            await device.async_stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--count", type=int, default=1, help="Number of devices")
+    parser.add_argument("--host", default=DEFAULT_HOST, help="Address of the first device")
+    parser.add_argument("--port", type=int, default=tuya.DEFAULT_PORT, help="Port (0 = any free port)")
+    parser.add_argument("--local-key", default=DEFAULT_LOCAL_KEY, help="16-character local key")
+    parser.add_argument("--version", type=float, default=3.5, choices=tuya.PROTOCOL_VERSIONS)
+    parser.add_argument("--push-interval", type=float, default=0,
+                        help="Send changed DPS every N seconds on open connections (0 = off)")
+    parser.add_argument("--latency", type=float, default=0, help="Seconds added to every reply")
+    parser.add_argument("--jitter", type=float, default=0, help="Random extra latency in seconds")
+    parser.add_argument("--drop-rate", type=float, default=0, help="Chance to drop a request")
+    parser.add_argument("--bad-frame-rate", type=float, default=0, help="Chance to corrupt a reply")
+    parser.add_argument("--handshake-delay", type=float, default=0, help="Seconds before the session key reply")
+    parser.add_argument("--beacon-target", help="Send discovery beacons here, e.g. 255.255.255.255")
+    parser.add_argument("--beacon-interval", type=float, default=BEACON_INTERVAL, help="Seconds between beacons")
+    parser.add_argument("--stats-interval", type=float, default=60, help="Seconds between stats lines")
+    parser.add_argument("--debug", action="store_true")
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.DEBUG if args.debug else logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s',
+        stream=sys.stderr,
+    )
+    try:
+        asyncio.run(_async_main(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
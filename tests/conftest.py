@@ -0,0 +1,34 @@
+"""
+Shared fixtures for the tests that run without Home Assistant
+The package __init__ imports Home Assistant, so the modules that do not
+(client, archive, filters, ...) are loaded by file path, the same way the
+simulator and the lab scripts load them.
+"""
+
+import importlib.util
+import os
+import sys
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+COMPONENT = os.path.join(ROOT, "custom_components", "tuya_8in1")
+SIMULATOR = os.path.join(ROOT, "simulator", "tuya_simulator.py")
+
+
+def load_module(name: str, path: str):
+    """Import a module by file path once and register it under name"""
+    if name not in sys.modules:
+        spec = importlib.util.spec_from_file_location(name, path)
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[name] = module
+        spec.loader.exec_module(module)
+    return sys.modules[name]
+
+
+def load_component(name: str):
+    """Import custom_components/tuya_8in1/<name>.py"""
+    return load_module(f"tuya_8in1_{name}", os.path.join(COMPONENT, f"{name}.py"))
+
+
+def load_simulator():
+    """Import the device simulator, its client module is simulator.tuya"""
+    return load_module("tuya_simulator", SIMULATOR)
@@ -0,0 +1,49 @@
+"""Tests for the adaptive poll interval"""
+
+from conftest import load_component
+
+adaptive = load_component("adaptive")
+
+
+def _interval():
+    return adaptive.AdaptiveInterval(60, 10, 300, {"ph": 0.1})
+
+
+def test_clamped_base():
+    assert adaptive.AdaptiveInterval(5, 10, 300, {}).interval == 10
+    assert adaptive.AdaptiveInterval(500, 10, 300, {}).interval == 300
+
+
+def test_tightens_on_fast_change():
+    interval = _interval()
+    assert interval.on_success({"ph": 7.0}, now=0) == 60
+    # 0.2 pH per minute is twice the fast rate
+    assert interval.on_success({"ph": 7.2}, now=60) == 30
+    assert interval.on_success({"ph": 7.8}, now=90) == 15
+
+
+def test_backs_off_while_steady():
+    interval = _interval()
+    interval.on_success({"ph": 7.0}, now=0)
+    assert interval.on_success({"ph": 7.0}, now=60) == 90
+    # Between steady and fast - unchanged
+    assert interval.on_success({"ph": 7.05}, now=120) == 90
+    for i in range(10):
+        interval.on_success({"ph": 7.05}, now=180 + i * 60)
+    assert interval.interval == 300
+
+
+def test_failures_back_off_and_reset():
+    interval = _interval()
+    assert interval.on_failure() == 120
+    assert interval.on_failure() == 240
+    assert interval.on_failure() == 300
+    interval.on_success({}, now=0)
+    assert interval.failures == 0
+
+
+def test_missing_sensor_and_zero_elapsed():
+    interval = _interval()
+    interval.on_success({"ph": 7.0}, now=0)
+    assert interval.on_success({"ph": 9.0}, now=0) == 60
+    assert interval.on_success({"tds": 300}, now=60) == 90
@@ -0,0 +1,104 @@
+"""Tests for the columnar reading archive"""
+
+import math
+import os
+
+import pytest
+
+from conftest import load_component
+
+np = pytest.importorskip("numpy")
+archive = load_component("archive")
+
+COLUMNS = ("ph", "temperature")
+DAY = 1_700_000_000.0  # 2023-11-14 UTC
+
+
+def _day_path(directory):
+    return os.path.join(directory, archive._day(DAY))
+
+
+def test_round_trip(tmp_path):
+    writer = archive.ReadingArchive(str(tmp_path), COLUMNS)
+    for i in range(5):
+        writer.append(DAY + i, {"ph": 7.0 + i / 10, "temperature": "n/a"})
+    writer.flush()
+
+    data = archive.read_archive(str(tmp_path), DAY + 1, DAY + 4)
+    assert data["timestamp"].tolist() == [DAY + 1, DAY + 2, DAY + 3]
+    assert data["ph"].tolist() == pytest.approx([7.1, 7.2, 7.3])
+    assert np.isnan(data["temperature"]).all()
+
+
+def test_columns_change_opens_new_directory(tmp_path):
+    first = archive.ReadingArchive(str(tmp_path), ("ph",))
+    first.append(DAY, {"ph": 7.0})
+    first.flush()
+    second = archive.ReadingArchive(str(tmp_path), COLUMNS)
+    second.append(DAY + 1, {"ph": 7.5, "temperature": 25.0})
+    second.flush()
+
+    assert sorted(os.listdir(tmp_path)) == [archive._day(DAY), archive._day(DAY) + "_1"]
+    data = archive.read_archive(str(tmp_path), DAY, DAY + 2)
+    assert data["ph"].tolist() == [7.0, 7.5]
+    assert math.isnan(data["temperature"][0]) and data["temperature"][1] == 25.0
+
+
+def test_torn_record_is_read_and_repaired(tmp_path):
+    writer = archive.ReadingArchive(str(tmp_path), COLUMNS)
+    for i in range(3):
+        writer.append(DAY + i, {"ph": 7.0, "temperature": 20.0 + i})
+    writer.flush()
+
+    # Crash in the middle of the next flush: ph got a whole value,
+    # temperature half of one, the timestamp only 3 of its 8 bytes
+    path = _day_path(str(tmp_path))
+    with open(os.path.join(path, "ph.f4"), "ab") as file:
+        file.write(np.float32(7.5).tobytes())
+    with open(os.path.join(path, "temperature.f4"), "ab") as file:
+        file.write(b"\x00\x00")
+    with open(os.path.join(path, "timestamp.f8"), "ab") as file:
+        file.write(b"\x00\x00\x00")
+
+    data = archive.read_archive(str(tmp_path), DAY, DAY + 10)
+    assert data["timestamp"].tolist() == [DAY, DAY + 1, DAY + 2]
+    assert data["ph"].tolist() == [7.0, 7.0, 7.0]
+    assert data["temperature"].tolist() == [20.0, 21.0, 22.0]
+
+    # The next writer realigns the files before appending
+    writer = archive.ReadingArchive(str(tmp_path), COLUMNS)
+    writer.append(DAY + 3, {"ph": 8.0, "temperature": 23.0})
+    writer.flush()
+    assert os.path.getsize(os.path.join(path, "timestamp.f8")) == 4 * 8
+    data = archive.read_archive(str(tmp_path), DAY, DAY + 10)
+    assert data["timestamp"].tolist() == [DAY, DAY + 1, DAY + 2, DAY + 3]
+    assert data["ph"].tolist() == [7.0, 7.0, 7.0, 8.0]
+    assert data["temperature"].tolist() == [20.0, 21.0, 22.0, 23.0]
+
+
+def test_short_and_missing_columns(tmp_path):
+    writer = archive.ReadingArchive(str(tmp_path), COLUMNS)
+    for i in range(3):
+        writer.append(DAY + i, {"ph": 7.0, "temperature": 20.0})
+    writer.flush()
+    path = _day_path(str(tmp_path))
+    os.truncate(os.path.join(path, "ph.f4"), 4 + 2)
+    os.remove(os.path.join(path, "temperature.f4"))
+
+    data = archive.read_archive(str(tmp_path), DAY, DAY + 10, COLUMNS)
+    assert data["ph"][0] == 7.0 and np.isnan(data["ph"][1:]).all()
+    assert np.isnan(data["temperature"]).all()
+
+    writer = archive.ReadingArchive(str(tmp_path), COLUMNS)
+    writer.append(DAY + 3, {"ph": 8.0, "temperature": 23.0})
+    writer.flush()
+    data = archive.read_archive(str(tmp_path), DAY, DAY + 10)
+    assert data["ph"].tolist()[3] == 8.0 and data["temperature"].tolist()[3] == 23.0
+    assert np.isnan(data["temperature"][:3]).all()
+
+
+def test_empty_day_is_skipped(tmp_path):
+    writer = archive.ReadingArchive(str(tmp_path), COLUMNS)
+    writer._path(archive._day(DAY))  # columns.json only, nothing flushed yet
+    data = archive.read_archive(str(tmp_path), DAY, DAY + 10, COLUMNS)
+    assert len(data["timestamp"]) == 0 and len(data["ph"]) == 0
@@ -0,0 +1,36 @@
+"""Tests for the per-device circuit breaker"""
+
+from conftest import load_component
+
+breaker = load_component("breaker")
+
+
+def test_opens_after_threshold():
+    circuit = breaker.CircuitBreaker(3, 30, 600)
+    assert not circuit.record_failure() and not circuit.record_failure()
+    assert circuit.record_failure()
+    assert circuit.is_open and circuit.delay == 30
+    # Only the failure that opened the breaker reports it
+    assert not circuit.record_failure()
+
+
+def test_probe_backoff_and_recovery():
+    circuit = breaker.CircuitBreaker(1, 30, 100)
+    circuit.record_failure()
+    circuit.record_probe(False)
+    circuit.record_probe(False)
+    assert circuit.is_open and circuit.delay == 100
+
+    circuit.record_probe(True)
+    assert circuit.state == breaker.STATE_HALF_OPEN and not circuit.is_open
+    circuit.record_success()
+    assert circuit.state == breaker.STATE_CLOSED
+    assert circuit.failures == 0 and circuit.delay == 30
+
+
+def test_half_open_failure_reopens_with_longer_delay():
+    circuit = breaker.CircuitBreaker(1, 30, 600)
+    circuit.record_failure()
+    circuit.record_probe(True)
+    assert not circuit.record_failure()
+    assert circuit.is_open and circuit.delay == 60
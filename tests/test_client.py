@@ -0,0 +1,189 @@
+"""Tests for the asyncio LAN client, run against the device simulator"""
+
+import asyncio
+import logging
+
+import pytest
+
+from conftest import load_simulator
+
+simulator = load_simulator()
+tuya = simulator.tuya
+
+WRONG_KEY = "fedcba9876543210"
+VERSIONS = (3.3, 3.4, 3.5)
+
+
+def run(coro):
+    return asyncio.run(asyncio.wait_for(coro, 30))
+
+
+async def _with_device(version, test, faults=None):
+    device = simulator.SimulatedDevice("tuyasim0000000000001", version=version, faults=faults)
+    await device.async_start("127.0.0.1", 0)
+    try:
+        return await test(device)
+    finally:
+        await device.async_stop()
+
+
+def _client(device, local_key=simulator.DEFAULT_LOCAL_KEY, version=None, **kwargs):
+    host, port = device.address
+    kwargs.setdefault("timeout", 2)
+    kwargs.setdefault("retries", 0)
+    return tuya.TuyaLocalClient(
+        device.device_id, local_key, host, version=device.version if version is None else version,
+        port=port, **kwargs
+    )
+
+
+@pytest.mark.parametrize("version", VERSIONS)
+def test_status(version):
+    async def test(device):
+        client = _client(device)
+        data = await client.async_status()
+        assert data["dps"].keys() == device.dps().keys()
+        assert client.version == version and client.attempts == 1
+
+    run(_with_device(version, test))
+
+
+@pytest.mark.parametrize("version", VERSIONS)
+def test_persistent_session(version):
+    async def test(device):
+        client = _client(device, persistent=True)
+        try:
+            await client.async_status()
+            await client.async_heartbeat()
+            await client.async_set_dps({106: 800})
+            # The device reports the change on its own
+            update = await client.async_receive(1)
+            while update is not None and "106" not in update["dps"]:
+                update = await client.async_receive(1)
+            assert update["dps"]["106"] == 800
+            assert (await client.async_status())["dps"]["106"] == 800
+            assert client.connected
+        finally:
+            await client.async_close()
+        assert device.stats.connections == 1
+
+    run(_with_device(version, test))
+
+
+@pytest.mark.parametrize("version", (3.3, 3.4))
+def test_fallback_to_device_version(version, caplog):
+    async def test(device):
+        client = _client(device, version=3.5)
+        data = await client.async_status()
+        assert data["dps"]
+        assert client.version == version and client.configured_version == 3.5
+        # The version that worked is kept for the next request
+        await client.async_status()
+        assert client.attempts == 1
+
+    with caplog.at_level(logging.WARNING):
+        run(_with_device(version, test))
+    assert "falling back" in caplog.text
+
+
+@pytest.mark.parametrize("version", VERSIONS)
+def test_wrong_local_key(version, caplog, monkeypatch):
+    async def test(device):
+        client = _client(device, local_key=WRONG_KEY, version=3.5)
+        with pytest.raises(tuya.TuyaAuthError):
+            await client.async_status()
+
+        # Later polls stay on the configured version and do not warn again
+        caplog.clear()
+        monkeypatch.setattr(tuya, "FALLBACK_RETRY_INTERVAL", 0)
+        with pytest.raises(tuya.TuyaAuthError):
+            await client.async_status()
+        assert client.attempts == 1 and client.version == 3.5
+        assert not [record for record in caplog.records if record.levelno >= logging.WARNING]
+
+        # The fallbacks are tried again once FALLBACK_RETRY_INTERVAL passed
+        with pytest.raises(tuya.TuyaAuthError):
+            await client.async_status()
+        assert client.attempts == 3
+
+    with caplog.at_level(logging.WARNING):
+        run(_with_device(version, test))
+
+
+@pytest.mark.parametrize("version", VERSIONS)
+def test_malformed_frame(version):
+    async def test(device):
+        client = _client(device)
+        await client.async_status()
+        device.faults.bad_frame_rate = 1.0
+        with pytest.raises(tuya.TuyaProtocolError) as error:
+            await client.async_status()
+        # The key worked before, a corrupt frame is not a key problem
+        assert not isinstance(error.value, tuya.TuyaAuthError)
+        device.faults.bad_frame_rate = 0.0
+        assert (await client.async_status())["dps"]
+
+    run(_with_device(version, test, simulator.Faults()))
+
+
+def test_device_hangs_up_then_retry():
+    async def test(device):
+        client = _client(device, retries=1)
+        await client.async_status()
+        device.faults.drop_rate = 1.0
+        with pytest.raises(tuya.TuyaConnectionError):
+            await client.async_status()
+        assert client.attempts == 2
+
+    run(_with_device(3.3, test, simulator.Faults()))
+
+
+def test_unreachable_device():
+    async def test():
+        client = tuya.TuyaLocalClient("dev", simulator.DEFAULT_LOCAL_KEY, "127.0.0.1", port=1, retries=0)
+        with pytest.raises(tuya.TuyaConnectionError):
+            await client.async_status()
+        assert not await tuya.async_probe("127.0.0.1", 1, timeout=1)
+
+    run(test())
+
+
+@pytest.mark.parametrize("version", VERSIONS)
+def test_frame_round_trip(version):
+    key = simulator.DEFAULT_LOCAL_KEY.encode()
+    payload = tuya.encode_payload(version, key, tuya.CONTROL, b'{"dps":{"1":2}}')
+    frame = tuya.pack_message(version, key, 7, tuya.CONTROL, payload, retcode=0)
+    message = tuya.unpack_message(version, key, frame)
+    assert (message.seqno, message.cmd, message.retcode) == (7, tuya.CONTROL, 0)
+    assert tuya.decode_json(tuya.decrypt_payload(version, key, message.payload)) == {"dps": {"1": 2}}
+
+    for length in range(len(frame)):
+        with pytest.raises(tuya.TuyaProtocolError):
+            tuya.unpack_message(version, key, frame[:length])
+    tampered = bytearray(frame)
+    tampered[-12] ^= 1
+    with pytest.raises(tuya.TuyaProtocolError):
+        tuya.unpack_message(version, key, bytes(tampered))
+
+
+@pytest.mark.parametrize("payload", [
+    b"not json", b"[1, 2]", b'{"dps": [1, 2]}', b'{"data": {"dps": "x"}}', b"\xff\xfe",
+])
+def test_decode_json_rejects(payload):
+    with pytest.raises(tuya.TuyaProtocolError):
+        tuya.decode_json(payload)
+
+
+def test_decode_json_lifts_dps():
+    assert tuya.decode_json(b'{"data":{"dps":{"1":2}}}')["dps"] == {"1": 2}
+    assert tuya.decode_json(b"") == {}
+
+
+@pytest.mark.parametrize("version", (3.1, 3.3, 3.5))
+def test_beacon(version):
+    beacon = {"gwId": "dev", "ip": "10.0.0.2", "version": str(version)}
+    data = tuya.pack_beacon(version, beacon)
+    assert tuya.unpack_beacon(data) == beacon
+    for length in range(len(data)):
+        with pytest.raises(tuya.TuyaProtocolError):
+            tuya.unpack_beacon(data[:length])
@@ -0,0 +1,56 @@
+"""Tests for the derived water-quality metrics"""
+
+import math
+
+import pytest
+
+from conftest import load_component
+
+derived = load_component("derived")
+
+DERIVED_TYPES = {
+    "ec_25": {"inputs": ["ec", "temperature"], "precision": 1},
+    "tds_ec_ratio": {"inputs": ["tds", "ec"], "precision": 3},
+    "langelier_index": {"inputs": ["ph", "temperature", "tds"]},
+    "consistency_deviation": {"inputs": ["ec", "tds", "salinity", "conductivity_factor"], "precision": 1},
+}
+PARAMS = {"calcium_hardness": 250, "total_alkalinity": 100}
+READING = {
+    "temperature": 30.0, "ph": 7.5, "ec": 1000.0, "tds": 500.0,
+    "salinity": 582.0, "conductivity_factor": 1010.0,
+}
+
+
+def test_derive():
+    table = derived.compile_derive_table(DERIVED_TYPES)
+    result = derived.derive(table, READING, PARAMS)
+    assert result["ec_25"] == round(1000 / 1.1, 1)
+    assert result["tds_ec_ratio"] == 0.5
+    assert result["consistency_deviation"] == 1.0
+
+    a = (math.log10(500) - 1) / 10
+    b = -13.12 * math.log10(303.15) + 34.55
+    c = math.log10(250) - 0.4
+    d = math.log10(100)
+    assert result["langelier_index"] == round(7.5 - ((9.3 + a + b) - (c + d)), 2)
+
+
+def test_missing_inputs_are_skipped():
+    table = derived.compile_derive_table(DERIVED_TYPES)
+    result = derived.derive(table, {"ec": 1000.0, "temperature": 25.0}, PARAMS)
+    assert result == {"ec_25": 1000.0}
+
+
+@pytest.mark.parametrize("data, params, missing", [
+    ({**READING, "ec": 0.0}, PARAMS, "tds_ec_ratio"),
+    ({**READING, "ec": 0.0}, PARAMS, "consistency_deviation"),
+    ({**READING, "tds": 0.0}, PARAMS, "langelier_index"),
+    (READING, {"calcium_hardness": 0, "total_alkalinity": 100}, "langelier_index"),
+])
+def test_undefined_values_are_left_out(data, params, missing):
+    table = derived.compile_derive_table(DERIVED_TYPES)
+    assert missing not in derived.derive(table, data, params)
+
+
+def test_ec_25_below_freezing_range():
+    assert derived.ec_25({"ec": 1000.0, "temperature": -30.0}, {}) is None
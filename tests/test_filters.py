@@ -0,0 +1,49 @@
+"""Tests for the streaming outlier filters"""
+
+import math
+
+import pytest
+
+from conftest import load_component
+
+filters = load_component("filters")
+
+
+def test_median():
+    median = filters.MedianFilter(3)
+    assert [median.update(v) for v in (7.0, 0.0, 7.2, 7.1)] == [7.0, 3.5, 7.0, 7.1]
+
+
+def test_ewma():
+    ewma = filters.EwmaFilter(0.5)
+    assert [ewma.update(v) for v in (10.0, 20.0, 20.0)] == [10.0, 15.0, 17.5]
+
+
+def test_hampel_rejects_spike_and_accepts_step():
+    hampel = filters.HampelFilter(5, 3.0, min_mad=0.01)
+    values = [7.5, 7.51, 7.5, 0.0, 7.49]
+    assert [hampel.update(v) for v in values] == [7.5, 7.51, 7.5, 7.5, 7.49]
+
+    step = filters.HampelFilter(5, 3.0, min_mad=0.01)
+    results = [step.update(v) for v in (7.0, 7.0, 7.0, 8.0, 8.0, 8.0)]
+    # A real step is accepted once it fills half the window
+    assert results[3] == 7.0 and results[-1] == 8.0
+
+
+def test_create_filter():
+    assert filters.create_filter(filters.FILTER_NONE, 5, 0.3, 3.0) is None
+    assert isinstance(filters.create_filter(filters.FILTER_MEDIAN, 5, 0.3, 3.0), filters.MedianFilter)
+    assert isinstance(filters.create_filter(filters.FILTER_EWMA, 5, 0.3, 3.0), filters.EwmaFilter)
+    assert isinstance(filters.create_filter(filters.FILTER_HAMPEL, 5, 0.3, 3.0), filters.HampelFilter)
+
+
+def test_sensor_filters():
+    sensor_types = {"ph": {"scale": 100}, "orp": {"deadband": 5}}
+    sensor_filters = filters.SensorFilters(sensor_types, filters.FILTER_MEDIAN, 3, 0.3, 3.0)
+    sensor_filters.update({"ph": 7.0, "orp": 650})
+    data = {"ph": 7.1, "orp": math.nan, "tds": 359, "status": "ok"}
+    result = sensor_filters.update(data)
+    # Only known numeric sensors are filtered, the input is not modified
+    assert result["ph"] == pytest.approx(7.05) and math.isnan(result["orp"])
+    assert result["tds"] == 359 and result["status"] == "ok"
+    assert data["ph"] == 7.1
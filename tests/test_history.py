@@ -0,0 +1,54 @@
+"""Tests for the rolling sensor history"""
+
+import statistics
+
+import pytest
+
+from conftest import load_component
+
+history = load_component("history")
+
+
+def test_statistics():
+    window = history.RollingWindow(3600)
+    values = [7.0, 7.4, 7.2, 7.6]
+    for i, value in enumerate(values):
+        window.add(i * 60.0, value)
+    stats = window.statistics()
+    assert stats["min"] == 7.0 and stats["max"] == 7.6
+    assert stats["mean"] == pytest.approx(statistics.fmean(values))
+    assert stats["std"] == pytest.approx(statistics.pstdev(values))
+    assert stats["rate"] == pytest.approx(0.6 / 180 * 3600)
+
+
+def test_expiry_and_growth():
+    window = history.RollingWindow(100)
+    # More samples than the initial capacity, most of them expire
+    for i in range(history.INITIAL_CAPACITY * 3):
+        window.add(float(i), float(i % 7))
+    assert len(window) == 101
+    kept = [float(i % 7) for i in range(history.INITIAL_CAPACITY * 3 - 101, history.INITIAL_CAPACITY * 3)]
+    stats = window.statistics()
+    assert stats["min"] == min(kept) and stats["max"] == max(kept)
+    assert stats["mean"] == pytest.approx(statistics.fmean(kept))
+
+    assert window.statistics(now=10_000.0) == {}
+    assert len(window) == 0
+
+
+def test_single_sample_has_no_rate():
+    window = history.RollingWindow(60)
+    window.add(0.0, 5.0)
+    assert window.statistics() == {"min": 5.0, "max": 5.0, "mean": 5.0, "std": 0.0}
+
+
+def test_sensor_history():
+    windows = {"1h": 3600, "24h": 86400}
+    sensor_history = history.SensorHistory(["ph"], windows)
+    sensor_history.add(0.0, {"ph": 7.0, "tds": 300, "status": "ok"})
+    sensor_history.add(1800.0, {"ph": 7.5})
+    attrs = sensor_history.attributes("ph", now=4000.0)
+    # The first reading left the 1 h window but not the 24 h one
+    assert attrs["mean_1h"] == 7.5 and attrs["mean_24h"] == 7.25
+    assert set(attrs) <= history.attribute_names(windows)
+    assert sensor_history.attributes("tds") == {}
@@ -2,13 +2,26 @@
 """
 Tuya 8-in-1 Water Quality Tester - Device Analyzer
 Skrypt do odkrywania wszystkich dostępnych czujników i punktów danych.
+
+Tryb floty skanuje wiele urządzeń naraz i dopisuje wynik każdego jako
+jedną linię JSON zaraz po jego zakończeniu:
+    python discover_sensors.py --fleet devices.jsonl --workers 8 --output fleet.jsonl
+devices.jsonl zawiera jedną konfigurację urządzenia (jak tuya_config.json)
+na linię.
+
+Tryb watch próbkuje urządzenie przez zadany czas i proponuje skale,
+zakresy i gotowy blok SENSOR_TYPES (wymaga NumPy):
+    python discover_sensors.py --watch 600 --interval 2
 """
 
+import argparse
 import asyncio
 import json
 import logging
 import os
-from typing import Dict, Any, List
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Iterator, List, Optional, TextIO
 from datetime import datetime
 
 try:
@@ -27,14 +40,150 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Wersje protokołu sprawdzane równolegle przy nieznanym firmware
+PROBE_VERSIONS = (3.1, 3.3, 3.4, 3.5)
+PROBE_DEADLINE = 5.0  # Sekundy na wszystkie próby razem
+FLEET_WORKERS = 8  # Urządzenia skanowane jednocześnie w trybie floty
+WATCH_INTERVAL = 2.0  # Sekundy między odczytami statusu w trybie watch
+
+# Zapytania do chmury wykonywane równolegle: klucz wyniku -> ścieżka API
+CLOUD_REQUESTS = {
+    "device_info": "/v1.0/devices/{}",
+    "device_status": "/v1.0/devices/{}/status",
+    "device_specifications": "/v1.0/devices/{}/specifications",
+    "device_functions": "/v1.0/devices/{}/functions",
+}
+# Specyfikacja i funkcje prawie się nie zmieniają - trafiają do cache na dysku
+CLOUD_CACHED = ("device_specifications", "device_functions")
+CLOUD_CACHE_DIR = ".tuya_cache"
+CLOUD_CACHE_TTL = 7 * 24 * 3600  # Sekundy
+
+# Rozgłoszenia UDP urządzeń (3.1-3.4 na 6666/6667, 3.5 na 7000) - źródło
+# klucza produktu dla cache DPS, gdy nie ma go w konfiguracji
+BEACON_PORTS = (6666, 6667, 7000)
+BEACON_TIMEOUT = 6.0  # Sekundy, urządzenia rozgłaszają się co około 5 s
+
+
+class DiskCache:
+    """Cache wyników na dysku, z czasem ważności (TTL) lub bez (ttl=None)"""
+
+    def __init__(self, directory: str = CLOUD_CACHE_DIR, ttl: Optional[float] = CLOUD_CACHE_TTL):
+        self.directory = directory
+        self.ttl = ttl
+
+    def _path(self, key: str, name: str) -> str:
+        return os.path.join(self.directory, f"{key}_{name}.json")
+
+    def get(self, key: str, name: str) -> Optional[Dict[str, Any]]:
+        """Zwraca zapisany wynik lub None gdy go nie ma albo wygasł"""
+        try:
+            with open(self._path(key, name), 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if self.ttl is not None and time.time() - entry.get("stored", 0) > self.ttl:
+            return None
+        return entry.get("response")
+
+    def set(self, key: str, name: str, response: Dict[str, Any]):
+        """Zapisuje wynik atomowo (plik tymczasowy + zamiana)"""
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(key, name)
+        with open(path + ".tmp", 'w', encoding='utf-8') as f:
+            json.dump({"stored": time.time(), "response": response}, f, ensure_ascii=False)
+        os.replace(path + ".tmp", path)
+
+class _BeaconProtocol(asyncio.DatagramProtocol):
+    def __init__(self, listener: "BeaconListener"):
+        self.listener = listener
+
+    def datagram_received(self, data: bytes, addr):
+        self.listener.received(data)
+
+
+class BeaconListener:
+    """Nasłuch rozgłoszeń UDP urządzeń, ostatni beacon każdego gwId"""
+
+    def __init__(self, ports=BEACON_PORTS):
+        self.ports = ports
+        self.beacons: Dict[str, Dict[str, Any]] = {}
+        self._transports: List[asyncio.DatagramTransport] = []
+        self._waiters: Dict[str, List[asyncio.Future]] = {}
+
+    async def start(self):
+        """Otwiera wolne porty (inne programy Tuya mogą też nasłuchiwać)"""
+        loop = asyncio.get_running_loop()
+        for port in self.ports:
+            try:
+                transport, _ = await loop.create_datagram_endpoint(
+                    lambda: _BeaconProtocol(self), local_addr=("0.0.0.0", port),
+                    reuse_port=True, allow_broadcast=True,
+                )
+            except OSError as e:
+                logger.debug(f"Port UDP {port} niedostępny: {e}")
+                continue
+            self._transports.append(transport)
+
+    def close(self):
+        for transport in self._transports:
+            transport.close()
+        self._transports.clear()
+
+    def received(self, data: bytes):
+        try:
+            beacon = json.loads(tinytuya.decrypt_udp(data))
+        except Exception:
+            return  # Obcy lub uszkodzony pakiet
+        device_id = beacon.get("gwId") if isinstance(beacon, dict) else None
+        if not device_id:
+            return
+        self.beacons[device_id] = beacon
+        for future in self._waiters.pop(device_id, []):
+            if not future.done():
+                future.set_result(beacon)
+
+    async def wait_for(self, device_id: str, timeout: float) -> Optional[Dict[str, Any]]:
+        """Zwraca beacon urządzenia albo None po upływie timeout"""
+        if device_id in self.beacons:
+            return self.beacons[device_id]
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.setdefault(device_id, []).append(future)
+        try:
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            return None
+        finally:
+            waiters = self._waiters.get(device_id, [])
+            if future in waiters:
+                waiters.remove(future)
+
+
 class TuyaDeviceAnalyzer:
     """Analizator urządzenia Tuya 8-in-1"""
     
-    def __init__(self, config_file: str = "tuya_config.json"):
+    def __init__(self, config_file: str = "tuya_config.json",
+                 config: Optional[Dict[str, Any]] = None,
+                 beacons: Optional[BeaconListener] = None):
         self.config_file = config_file
-        self.config = self.load_config()
+        self.config = config if config is not None else self.load_config()
         self.device = None
         self.api = None
+        self.cloud_cache = DiskCache(
+            self.config.get("cloud_cache_dir", CLOUD_CACHE_DIR),
+            self.config.get("cloud_cache_ttl", CLOUD_CACHE_TTL),
+        )
+        # Lista DPS zależy tylko od modelu i firmware - bez wygasania
+        self.dps_cache = DiskCache(self.config.get("cloud_cache_dir", CLOUD_CACHE_DIR), ttl=None)
+        # Wspólny nasłuch trybu floty, pojedynczy skan otwiera własny
+        self.beacons = beacons
+        # Klucz produktu: konfiguracja, zapamiętany z poprzedniego skanu,
+        # a potem beacon UDP lub informacje z chmury
+        remembered = self.dps_cache.get(str(self.config.get("device_id")), "product") or {}
+        self.product_key = (
+            self.config.get("product_key") or self.config.get("product_id")
+            or remembered.get("product_key")
+        )
+        self._product_key_found: Optional[asyncio.Event] = None
         
     def load_config(self) -> Dict[str, Any]:
         """Wczytuje konfigurację z pliku JSON"""
@@ -92,92 +241,308 @@ class TuyaDeviceAnalyzer:
         except Exception as e:
             logger.error(f"Błąd konfiguracji Tuya Cloud: {e}")
     
-    def scan_local_device(self) -> Dict[str, Any]:
+    def _probe_version(self, version: float, timeout: float) -> Dict[str, Any]:
+        """Jedna próba odczytu statusu w podanej wersji protokołu (w wątku)"""
+        started = time.monotonic()
+        attempt = {"version": version, "success": False}
+        device = None
+        try:
+            device = tinytuya.Device(
+                dev_id=self.config["device_id"],
+                address=self.config["ip_address"],
+                local_key=self.config["local_key"],
+                version=version
+            )
+            # 3.4/3.5 czekają dwa razy: negocjacja klucza sesji i status
+            device.set_socketTimeout(timeout / 2 if version >= 3.4 else timeout)
+            device.set_socketRetryLimit(1)
+            status = device.status()
+            attempt["status"] = status
+            # Zła wersja kończy się słownikiem błędu tinytuya zamiast "dps"
+            attempt["success"] = isinstance(status, dict) and "dps" in status
+            if attempt["success"]:
+                attempt["dps_count"] = len(status["dps"])
+            elif isinstance(status, dict) and "Error" in status:
+                attempt["error"] = status["Error"]
+        except Exception as e:
+            attempt["error"] = str(e)
+        finally:
+            if device is not None:
+                device.close()
+        attempt["elapsed"] = round(time.monotonic() - started, 3)
+        return attempt
+
+    async def probe_versions(self, versions=PROBE_VERSIONS,
+                             deadline: float = PROBE_DEADLINE) -> Dict[str, Any]:
+        """Sprawdza wszystkie wersje protokołu równolegle w jednym limicie czasu
+
+        Zwraca pierwszą działającą wersję (None gdy żadna nie odpowiedziała)
+        oraz czas każdej próby. Próby, które nie zdążyły, mają "error": "deadline".
+        """
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        tasks = {
+            asyncio.ensure_future(asyncio.to_thread(self._probe_version, version, deadline)): version
+            for version in versions
+        }
+        attempts = {}
+        working = None
+        pending = set(tasks)
+        while pending and working is None:
+            remaining = deadline - (loop.time() - started)
+            if remaining <= 0:
+                break
+            done, pending = await asyncio.wait(
+                pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                attempt = task.result()
+                attempts[tasks[task]] = attempt
+                if attempt["success"] and working is None:
+                    working = attempt["version"]
+                    logger.info(f"✅ Wersja {working} odpowiada po {attempt['elapsed']} s")
+
+        # Wątków nie da się przerwać - kończą się same po timeoucie gniazda
+        for task in pending:
+            attempts[tasks[task]] = {
+                "version": tasks[task],
+                "success": False,
+                "error": "deadline" if working is None else "skipped",
+                "elapsed": round(loop.time() - started, 3),
+            }
+        return {
+            "version": working,
+            "deadline": deadline,
+            "elapsed": round(loop.time() - started, 3),
+            "attempts": [attempts[version] for version in versions],
+        }
+
+    def remember_product_key(self, product_key: Optional[str], source: str):
+        """Zapisuje klucz produktu z beaconu lub chmury na kolejne skany"""
+        if not product_key or self.product_key:
+            return
+        self.product_key = product_key
+        if self._product_key_found is not None:
+            self._product_key_found.set()
+        logger.info(f"Klucz produktu {product_key} ({source})")
+        self.dps_cache.set(str(self.config.get("device_id")), "product", {"product_key": product_key})
+
+    async def wait_product_key(self, timeout: float):
+        """Czeka na beacon UDP urządzenia, krócej gdy klucz przyjdzie z chmury"""
+        device_id = self.config.get("device_id")
+        if not device_id:
+            return
+        self._product_key_found = asyncio.Event()
+        listener = self.beacons
+        if listener is None:
+            listener = BeaconListener()
+            await listener.start()
+        beacon = asyncio.ensure_future(listener.wait_for(device_id, timeout))
+        cloud = asyncio.ensure_future(self._product_key_found.wait())
+        try:
+            await asyncio.wait({beacon, cloud}, return_when=asyncio.FIRST_COMPLETED)
+            if beacon.done() and beacon.result():
+                self.remember_product_key(beacon.result().get("productKey"), "beacon UDP")
+        finally:
+            beacon.cancel()
+            cloud.cancel()
+            if listener is not self.beacons:
+                listener.close()
+
+    def dps_cache_key(self, version: float) -> Optional[str]:
+        """Klucz cache DPS: klucz produktu i wersja firmware (lub protokołu)"""
+        if not self.product_key:
+            return None
+        firmware = self.config.get("firmware_version") or f"protocol{version}"
+        return f"dps_{self.product_key}_{firmware}"
+
+    async def detect_dps(self, version: float, attempt: Dict[str, Any]) -> Dict[str, Any]:
+        """Wykrywa DPS w paczkach, raz na model i wersję firmware"""
+        from dps_detect import DPS_CONCURRENCY, detect_dps
+
+        cache_key = self.dps_cache_key(version)
+        if cache_key:
+            cached = self.dps_cache.get(cache_key, "local")
+            if cached is not None:
+                logger.info(f"DPS z cache ({cache_key})")
+                return {**cached, "cached": True}
+        else:
+            logger.info("Nieznany klucz produktu (konfiguracja, beacon UDP, chmura) - wynik nie trafi do cache")
+
+        def create_device():
+            device = tinytuya.Device(
+                dev_id=self.config["device_id"],
+                address=self.config["ip_address"],
+                local_key=self.config["local_key"],
+                version=version
+            )
+            device.set_socketPersistent(True)
+            device.set_socketRetryLimit(1)
+            return device
+
+        detection = await detect_dps(
+            create_device,
+            attempt["status"]["dps"],
+            rtt=attempt["elapsed"],
+            concurrency=self.config.get("dps_concurrency", DPS_CONCURRENCY),
+        )
+        # Niepełny wynik (paczki bez odpowiedzi) nie może zablokować ponownej próby
+        if cache_key and not detection["failed_batches"]:
+            self.dps_cache.set(cache_key, "local", {
+                key: value for key, value in detection.items() if key != "values"
+            })
+        return {**detection, "cached": False}
+
+    async def scan_local_device(self) -> Dict[str, Any]:
         """Skanuje urządzenie lokalnie"""
         results = {}
-        
-        # Używa wersji 3.5 która działa
-        logger.info("Skanowanie z wersją protokołu 3.5...")
+
+        versions = PROBE_VERSIONS
+        logger.info(f"Sprawdzanie wersji protokołu {', '.join(map(str, versions))}...")
+        # Klucz produktu do cache DPS - nasłuch beaconu w trakcie sprawdzania wersji
+        product_key_wait = None
+        if not self.product_key:
+            product_key_wait = asyncio.create_task(
+                self.wait_product_key(self.config.get("beacon_timeout", BEACON_TIMEOUT))
+            )
         try:
-            self.setup_local_connection(3.5)
-            
-            # Podstawowy test połączenia
-            logger.info("Testowanie połączenia...")
-            heartbeat = self.device.heartbeat()
-            logger.info(f"Heartbeat: {heartbeat}")
-            
-            # Pobiera status urządzenia
-            logger.info("Pobieranie statusu urządzenia...")
-            status = self.device.status()
-            logger.info(f"Status: {status}")
-            
-            if status and isinstance(status, dict) and "dps" in status:
-                results["version_3.5"] = {
-                    "status": status,
-                    "heartbeat": heartbeat,
-                    "success": True,
-                    "dps_count": len(status["dps"])
-                }
-                logger.info(f"✅ Sukces! Znaleziono {len(status['dps'])} punktów DPS")
-                
-                # Dodatkowo próbuj pobrać więcej danych
-                try:
-                    logger.info("Próba wykrycia dodatkowych DPS...")
-                    dps_data = self.device.detect_available_dps()
-                    results["available_dps"] = dps_data
-                    logger.info(f"Dodatkowe DPS: {dps_data}")
-                except Exception as e:
-                    logger.warning(f"Nie udało się wykryć dodatkowych DPS: {e}")
-                    
-            else:
-                results["version_3.5"] = {
-                    "status": status,
-                    "heartbeat": heartbeat,
-                    "success": False,
-                    "note": "Brak danych DPS lub błąd odpowiedzi"
-                }
-                    
+            probe = await self.probe_versions(
+                versions, self.config.get("probe_deadline", PROBE_DEADLINE)
+            )
+            results["probe"] = probe
+            for attempt in probe["attempts"]:
+                logger.info(
+                    f"  {attempt['version']}: "
+                    f"{'OK' if attempt['success'] else attempt.get('error', 'brak DPS')} "
+                    f"({attempt['elapsed']} s)"
+                )
+
+            version = probe["version"]
+            if version is None:
+                logger.error(f"❌ Żadna wersja nie odpowiedziała w ciągu {probe['deadline']} s")
+                results["error"] = "Brak odpowiedzi w żadnej wersji protokołu"
+                return results
+
+            attempt = next(a for a in probe["attempts"] if a["version"] == version)
+            results[f"version_{version}"] = attempt
+            logger.info(f"✅ Sukces! Znaleziono {attempt['dps_count']} punktów DPS")
+
+            # Dodatkowo próbuj pobrać więcej danych
+            try:
+                logger.info("Próba wykrycia dodatkowych DPS...")
+                if product_key_wait is not None:
+                    await product_key_wait
+                detection = await self.detect_dps(version, attempt)
+                results["dps_detection"] = detection
+                results["available_dps"] = {dps_id: None for dps_id in detection["dps"]}
+                logger.info(f"Dodatkowe DPS: {', '.join(detection['dps'])}")
+            except Exception as e:
+                logger.warning(f"Nie udało się wykryć dodatkowych DPS: {e}")
+
         except Exception as e:
             logger.error(f"Błąd skanowania lokalnego: {e}")
             results["error"] = str(e)
-        
+        finally:
+            if product_key_wait is not None:
+                product_key_wait.cancel()
+
         return results
-    
-    def scan_cloud_device(self) -> Dict[str, Any]:
-        """Skanuje urządzenie przez Tuya Cloud API"""
-        if not self.api:
-            self.setup_cloud_connection()
-        
+
+    async def scan_cloud_device(self) -> Dict[str, Any]:
+        """Skanuje urządzenie przez Tuya Cloud API
+
+        Cztery zapytania idą równolegle przez jedną sesję HTTP klienta
+        (token pobierany wcześniej, żeby wątki nie odświeżały go naraz).
+        Specyfikacja i funkcje są brane z cache, dopóki nie wygasną.
+        """
         results = {}
         device_id = self.config["device_id"]
-        
+
         try:
-            # Informacje o urządzeniu
-            logger.info("Pobieranie informacji o urządzeniu z chmury...")
-            device_info = self.api.get(f"/v1.0/devices/{device_id}")
-            results["device_info"] = device_info
-            
-            # Status urządzenia
-            logger.info("Pobieranie statusu z chmury...")
-            device_status = self.api.get(f"/v1.0/devices/{device_id}/status")
-            results["device_status"] = device_status
-            
-            # Specyfikacja urządzenia
-            logger.info("Pobieranie specyfikacji urządzenia...")
-            device_spec = self.api.get(f"/v1.0/devices/{device_id}/specifications")
-            results["device_specifications"] = device_spec
-            
-            # Funkcje urządzenia
-            logger.info("Pobieranie funkcji urządzenia...")
-            device_functions = self.api.get(f"/v1.0/devices/{device_id}/functions")
-            results["device_functions"] = device_functions
-            
+            if not self.api:
+                await asyncio.to_thread(self.setup_cloud_connection)
+            if not self.api:
+                results["error"] = "Brak połączenia z Tuya Cloud"
+                return results
+
+            names = []
+            cached = []
+            for name in CLOUD_REQUESTS:
+                response = self.cloud_cache.get(device_id, name) if name in CLOUD_CACHED else None
+                if response is not None:
+                    results[name] = response
+                    cached.append(name)
+                else:
+                    names.append(name)
+            if cached:
+                logger.info(f"Z cache: {', '.join(cached)}")
+            results["cached"] = cached
+
+            logger.info(f"Pobieranie z chmury: {', '.join(names)}...")
+            responses = await asyncio.gather(*(
+                asyncio.to_thread(self.api.get, CLOUD_REQUESTS[name].format(device_id))
+                for name in names
+            ), return_exceptions=True)
+
+            for name, response in zip(names, responses):
+                if isinstance(response, Exception):
+                    logger.error(f"Błąd zapytania {name}: {response}")
+                    results[name] = {"success": False, "msg": str(response)}
+                    continue
+                results[name] = response
+                if name == "device_info" and isinstance(response, dict) and response.get("success"):
+                    self.remember_product_key(response.get("result", {}).get("product_id"), "Tuya Cloud")
+                # Tylko poprawne odpowiedzi - błąd uwierzytelnienia nie może utknąć w cache
+                if name in CLOUD_CACHED and isinstance(response, dict) and response.get("success"):
+                    self.cloud_cache.set(device_id, name, response)
+
         except Exception as e:
             logger.error(f"Błąd skanowania chmury: {e}")
             results["error"] = str(e)
-        
+
         return results
-    
+
+    def _watch_samples(self, version: float, duration: float, interval: float, recorder):
+        """Odczytuje status co `interval` sekund przez jedno połączenie (w wątku)"""
+        self.setup_local_connection(version)
+        self.device.set_socketPersistent(True)
+        started = time.monotonic()
+        next_sample = started
+        try:
+            while (now := time.monotonic()) - started < duration:
+                status = self.device.status()
+                if isinstance(status, dict) and "dps" in status:
+                    recorder.add(round(now - started, 3), status["dps"])
+                else:
+                    logger.warning(f"Nieudany odczyt: {status}")
+                next_sample += interval
+                time.sleep(max(0.0, next_sample - time.monotonic()))
+        finally:
+            self.device.close()
+
+    async def watch(self, duration: float, interval: float = WATCH_INTERVAL) -> Dict[str, Any]:
+        """Tryb watch: strumień zmian DPS, dopasowanie skal i korelacje"""
+        from watch import WatchRecorder, analyze_watch
+
+        probe = await self.probe_versions(
+            PROBE_VERSIONS, self.config.get("probe_deadline", PROBE_DEADLINE)
+        )
+        if probe["version"] is None:
+            raise ConnectionError("Żadna wersja protokołu nie odpowiedziała")
+
+        logger.info(f"Próbkowanie przez {duration:g} s co {interval:g} s (wersja {probe['version']})...")
+        recorder = WatchRecorder()
+        await asyncio.to_thread(self._watch_samples, probe["version"], duration, interval, recorder)
+
+        results = {
+            "timestamp": datetime.now().isoformat(),
+            "device_id": self.config["device_id"],
+            "version": probe["version"],
+            "interval": interval,
+        }
+        results.update(analyze_watch(recorder))
+        return results
+
     def analyze_sensor_mappings(self, local_data: Dict, cloud_data: Dict) -> Dict[str, Any]:
         """Analizuje mapowania czujników"""
         mappings = {
@@ -252,13 +617,12 @@ class TuyaDeviceAnalyzer:
             "analysis": {}
         }
         
-        # Skanowanie lokalne
-        logger.info("\n--- Skanowanie lokalne ---")
-        results["local_scan"] = self.scan_local_device()
-        
-        # Skanowanie przez chmurę
-        logger.info("\n--- Skanowanie przez Tuya Cloud ---")
-        results["cloud_scan"] = self.scan_cloud_device()
+        # Skanowanie lokalne i przez chmurę równolegle
+        logger.info("\n--- Skanowanie lokalne i przez Tuya Cloud ---")
+        results["local_scan"], results["cloud_scan"] = await asyncio.gather(
+            self.scan_local_device(),
+            self.scan_cloud_device(),
+        )
         
         # Analiza mapowań
         logger.info("\n--- Analiza mapowań czujników ---")
@@ -273,18 +637,148 @@ class TuyaDeviceAnalyzer:
         logger.info("=== Analiza zakończona ===")
         return results
 
+def iter_fleet(path: str) -> Iterator[Dict[str, Any]]:
+    """Czyta konfiguracje urządzeń z pliku JSON Lines po jednej linii"""
+    with open(path, 'r', encoding='utf-8') as f:
+        for number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError as e:
+                logger.error(f"{path}:{number}: nieprawidłowy JSON ({e}), pomijam")
+
+
+async def scan_fleet_device(config: Dict[str, Any],
+                            beacons: Optional[BeaconListener] = None) -> Dict[str, Any]:
+    """Skanuje jedno urządzenie floty, błędy trafiają do wyniku"""
+    started = time.monotonic()
+    result = {
+        "timestamp": datetime.now().isoformat(),
+        "device_id": config.get("device_id"),
+        "ip_address": config.get("ip_address"),
+    }
+    try:
+        analyzer = TuyaDeviceAnalyzer(config=config, beacons=beacons)
+        result["local_scan"] = await analyzer.scan_local_device()
+        result["version"] = result["local_scan"].get("probe", {}).get("version")
+        result["sensor_mappings"] = analyzer.analyze_sensor_mappings(
+            result["local_scan"], {}
+        )["sensor_mappings"]
+    except Exception as e:
+        logger.error(f"{result['device_id']}: {e}")
+        result["error"] = str(e)
+    result["elapsed"] = round(time.monotonic() - started, 3)
+    return result
+
+
+async def scan_fleet(devices, output: TextIO, workers: int = FLEET_WORKERS) -> int:
+    """Skanuje urządzenia w puli `workers` zadań, zwraca liczbę wyników
+
+    Urządzenia są pobierane z iteratora dopiero gdy zwolni się miejsce
+    w kolejce, a każdy wynik jest zapisywany i utrwalany od razu - pamięć
+    nie rośnie z liczbą urządzeń, a przerwanie skanu nie traci gotowych linii.
+    """
+    # Każde urządzenie zajmuje wątek na każdą sprawdzaną wersję protokołu
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(max_workers=workers * len(PROBE_VERSIONS))
+    )
+    queue: asyncio.Queue = asyncio.Queue(maxsize=workers)
+    written = 0
+    # Jeden nasłuch beaconów dla całej floty zamiast portów UDP na urządzenie
+    beacons = BeaconListener()
+    await beacons.start()
+
+    async def worker():
+        nonlocal written
+        while (config := await queue.get()) is not None:
+            result = await scan_fleet_device(config, beacons)
+            output.write(json.dumps(result, ensure_ascii=False, default=str) + "\n")
+            output.flush()
+            os.fsync(output.fileno())
+            written += 1
+            logger.info(f"[{written}] {result['device_id']}: "
+                        f"{result.get('version') or result.get('error', 'brak odpowiedzi')}")
+
+    tasks = [asyncio.create_task(worker()) for _ in range(workers)]
+    try:
+        for config in devices:
+            await queue.put(config)
+        for _ in tasks:
+            await queue.put(None)
+        await asyncio.gather(*tasks)
+    finally:
+        beacons.close()
+    return written
+
+
+def run_fleet(path: str, output_path: Optional[str], workers: int):
+    """Tryb floty: skan wielu urządzeń do pliku JSON Lines"""
+    if not output_path:
+        output_path = f"tuya_fleet_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jsonl"
+    # Dopisywanie - wyniki przerwanego skanu zostają w pliku
+    with open(output_path, 'a', encoding='utf-8') as output:
+        written = asyncio.run(scan_fleet(iter_fleet(path), output, workers))
+    print(f"\n✅ Zeskanowano {written} urządzeń, wyniki w {output_path}")
+
+
+def run_watch(analyzer: TuyaDeviceAnalyzer, duration: float, interval: float):
+    """Tryb watch: wyniki do pliku JSON, blok SENSOR_TYPES na ekran"""
+    try:
+        results = asyncio.run(analyzer.watch(duration, interval))
+    except Exception as e:
+        logger.error(f"Błąd trybu watch: {e}")
+        print("❌ Próbkowanie nie powiodło się. Sprawdź logi powyżej.")
+        return
+    analyzer.save_results(results, f"tuya_watch_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+
+    print(f"\n✅ {results['samples']} odczytów w {results['duration']:g} s")
+    print("\n📈 Kanały:")
+    for dps_id, channel in sorted(results["channels"].items(), key=lambda item: int(item[0])):
+        fit = channel.get("fit")
+        if fit:
+            low, high = fit["range"]
+            print(f"  {dps_id}: {len(channel['changes'])} zmian, skala {fit['scale']}, {low:g}..{high:g}")
+        else:
+            print(f"  {dps_id}: {len(channel['changes'])} zmian (nie liczba)")
+    if results["correlations"]:
+        print("\n🔗 Skorelowane kanały:")
+        for pair in results["correlations"]:
+            print(f"  {pair['b']} ≈ {pair['ratio']:g} × {pair['a']} (r = {pair['r']:g})")
+    print("\n📋 Blok do const.py:\n")
+    print(results["sensor_types"])
+
+
 def main():
     """Główna funkcja programu"""
+    parser = argparse.ArgumentParser(description="Tuya 8-in-1 Water Quality Tester - Analyzer")
+    parser.add_argument("--config", default="tuya_config.json", help="Konfiguracja jednego urządzenia")
+    parser.add_argument("--fleet", help="Plik JSON Lines z konfiguracjami wielu urządzeń")
+    parser.add_argument("--workers", type=int, default=FLEET_WORKERS, help="Urządzenia skanowane jednocześnie")
+    parser.add_argument("--output", help="Plik wyników trybu floty (JSON Lines)")
+    parser.add_argument("--watch", type=float, metavar="SEKUNDY", help="Próbkuj urządzenie przez zadany czas")
+    parser.add_argument("--interval", type=float, default=WATCH_INTERVAL, help="Sekundy między odczytami w trybie watch")
+    args = parser.parse_args()
+
     print("🔍 Tuya 8-in-1 Water Quality Tester - Analyzer")
     print("=" * 50)
-    
-    analyzer = TuyaDeviceAnalyzer()
+
+    if args.fleet:
+        run_fleet(args.fleet, args.output, max(1, args.workers))
+        return
+
+    analyzer = TuyaDeviceAnalyzer(args.config)
     
     # Sprawdza konfigurację
     if analyzer.config["device_id"] == "YOUR_DEVICE_ID":
         print("❌ Najpierw skonfiguruj plik tuya_config.json")
         print("   Wypełnij Device ID, Local Key i adres IP urządzenia")
         return
+
+    if args.watch:
+        run_watch(analyzer, args.watch, args.interval)
+        return
     
     # Uruchamia analizę
     try:
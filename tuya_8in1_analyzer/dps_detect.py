@@ -0,0 +1,151 @@
+"""
+Tuya 8-in-1 Water Quality Tester - wykrywanie DPS
+Zastępuje detect_available_dps z tinytuya, które pyta o zakresy DPS po
+kolei, za każdym razem przez nowe połączenie (na 3.4/3.5 z pełną
+negocjacją klucza sesji). Tutaj zakresy kandydatów idą w paczkach przez
+kilka trwałych połączeń naraz, a timeout wynika ze zmierzonego czasu
+odpowiedzi. Moduł nie zależy od tinytuya - dostaje fabrykę urządzeń.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Zakresy DPS spotykane w urządzeniach Tuya, testery 8-w-1 używają 100-141
+DPS_CANDIDATE_RANGES = ((1, 31), (50, 71), (100, 161))
+DPS_BATCH_SIZE = 10  # Lista DPS w zapytaniu musi się zmieścić w 255 bajtach
+DPS_CONCURRENCY = 2  # Firmware przyjmuje tylko kilku klientów LAN naraz
+DPS_MIN_TIMEOUT = 0.5
+DPS_MAX_TIMEOUT = 5.0
+
+
+class AdaptiveTimeout:
+    """Timeout z wygładzonego czasu odpowiedzi, jak RTO w TCP (RFC 6298)"""
+
+    def __init__(self, initial: float, minimum: float = DPS_MIN_TIMEOUT,
+                 maximum: float = DPS_MAX_TIMEOUT):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.srtt: Optional[float] = None
+        self.rttvar = 0.0
+        self.timeout = self._clamp(initial)
+
+    def _clamp(self, value: float) -> float:
+        return min(max(value, self.minimum), self.maximum)
+
+    def record(self, rtt: float):
+        """Uwzględnia czas udanej odpowiedzi"""
+        if self.srtt is None:
+            self.srtt = rtt
+            self.rttvar = rtt / 2
+        else:
+            self.rttvar = 0.75 * self.rttvar + 0.25 * abs(self.srtt - rtt)
+            self.srtt = 0.875 * self.srtt + 0.125 * rtt
+        self.timeout = self._clamp(self.srtt + 4 * self.rttvar)
+
+    def backoff(self):
+        """Podwaja timeout po braku odpowiedzi"""
+        self.timeout = self._clamp(self.timeout * 2)
+
+
+def candidate_batches(known: Iterable[str], ranges=DPS_CANDIDATE_RANGES,
+                      size: int = DPS_BATCH_SIZE) -> List[List[str]]:
+    """Dzieli nieznane jeszcze DPS z zakresów kandydatów na paczki"""
+    known = set(known)
+    candidates = [
+        str(dps_id) for start, end in ranges for dps_id in range(start, end)
+        if str(dps_id) not in known
+    ]
+    return [candidates[i:i + size] for i in range(0, len(candidates), size)]
+
+
+def _query(device, batch: List[str]) -> Optional[Dict[str, Any]]:
+    """Zapytanie o status z listą DPS (urządzenia device22 zwracają tylko te)"""
+    device.set_dpsUsed({"1": None, **{dps_id: None for dps_id in batch}})
+    status = device.status()
+    return status if isinstance(status, dict) and "dps" in status else None
+
+
+async def detect_dps(create_device: Callable[[], Any], known: Dict[str, Any],
+                     rtt: Optional[float] = None, concurrency: int = DPS_CONCURRENCY,
+                     ranges=DPS_CANDIDATE_RANGES, batch_size: int = DPS_BATCH_SIZE) -> Dict[str, Any]:
+    """Wykrywa DPS urządzenia
+
+    known - DPS ze zwykłego odczytu statusu, rtt - jego czas w sekundach.
+    Pierwsza paczka idzie sama: jeśli odpowiedź zawiera DPS spoza
+    zapytania, urządzenie i tak zgłasza wszystko i reszta paczek jest
+    zbędna. Pozostałe paczki obsługuje `concurrency` połączeń; paczka bez
+    odpowiedzi jest ponawiana raz z podwojonym timeoutem.
+    """
+    started = time.monotonic()
+    found = dict(known)
+    timeout = AdaptiveTimeout(DPS_MAX_TIMEOUT)
+    if rtt:
+        timeout.record(rtt)
+    stats = {"requests": 0, "timeouts": 0, "failed_batches": []}
+
+    batches = candidate_batches(found, ranges, batch_size)
+    queue: asyncio.Queue = asyncio.Queue()
+    for batch in batches:
+        queue.put_nowait(batch)
+
+    async def worker(stop_early: bool = False) -> bool:
+        """Obsługuje paczki z kolejki, zwraca True gdy urządzenie zgłasza wszystko"""
+        device = None
+        try:
+            while not queue.empty():
+                batch = queue.get_nowait()
+                for attempt in range(2):
+                    if device is None:
+                        device = await asyncio.to_thread(create_device)
+                    device.set_socketTimeout(timeout.timeout)
+                    sent = time.monotonic()
+                    stats["requests"] += 1
+                    try:
+                        status = await asyncio.to_thread(_query, device, batch)
+                    except Exception as e:
+                        logger.debug(f"Paczka {batch[0]}-{batch[-1]}: {e}")
+                        status = None
+                    if status is not None:
+                        timeout.record(time.monotonic() - sent)
+                        break
+                    # Połączenie mogło zostać w złym stanie - następna próba od nowa
+                    stats["timeouts"] += 1
+                    timeout.backoff()
+                    await asyncio.to_thread(device.close)
+                    device = None
+                else:
+                    stats["failed_batches"].append(batch)
+                    if stop_early:
+                        return False
+                    continue
+
+                dps = {str(dps_id): value for dps_id, value in status["dps"].items()}
+                found.update(dps)
+                if stop_early:
+                    return not dps.keys() <= {"1", *batch}
+        finally:
+            if device is not None:
+                await asyncio.to_thread(device.close)
+        return False
+
+    reports_all = False
+    if batches:
+        reports_all = await worker(stop_early=True)
+        if not reports_all:
+            await asyncio.gather(*(worker() for _ in range(max(1, concurrency))))
+
+    return {
+        "dps": sorted(found, key=lambda dps_id: (len(dps_id), dps_id)),
+        "values": found,
+        "reports_all": reports_all,
+        "batches": len(batches),
+        "requests": stats["requests"],
+        "timeouts": stats["timeouts"],
+        "failed_batches": stats["failed_batches"],
+        "timeout": round(timeout.timeout, 3),
+        "elapsed": round(time.monotonic() - started, 3),
+    }
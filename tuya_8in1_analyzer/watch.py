@@ -0,0 +1,195 @@
+"""
+Tuya 8-in-1 Water Quality Tester - analiza trybu watch
+Zbiera strumień zmian każdego DPS przez zadany czas, dopasowuje skalę
+i zakres wartości oraz liczy korelacje między kanałami (NumPy, wektorowo).
+Wynikiem jest gotowy do wklejenia blok SENSOR_TYPES dla
+custom_components/tuya_8in1/const.py.
+"""
+
+import math
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+# Kandydaci skali - urządzenie wysyła liczby całkowite pomnożone przez 10^n
+SCALES = (1, 10, 100, 1000)
+CORRELATION_THRESHOLD = 0.9  # |r| od którego para kanałów trafia do wyniku
+
+# Wskazówki dla znanych DPS testera: klucz i pola jak w SENSOR_TYPES
+# (unit jako wyrażenie z const.py), fizycznie możliwy zakres i najgorsza
+# sensowna rozdzielczość czujnika. Skala to najmniejszy kandydat, przy
+# którym wszystkie próbki mieszczą się w zakresie, a krok w rozdzielczości.
+# deadband i fast_rate przepisane z const.py - bez nich wklejony blok
+# wyłączyłby wykrywanie zmian i adaptacyjny odczyt.
+SENSOR_HINTS = {
+    "8": {"key": "temperature", "name": "Temperature", "unit": "UnitOfTemperature.CELSIUS",
+          "device_class": "temperature", "icon": "mdi:thermometer",
+          "range": (-10, 60), "resolution": 0.5, "fast_rate": 0.5},
+    "106": {"key": "ph", "name": "pH", "unit": '"pH"', "device_class": None,
+            "icon": "mdi:test-tube", "range": (0, 14), "resolution": 0.1, "fast_rate": 0.1},
+    "111": {"key": "tds", "name": "TDS", "unit": "CONCENTRATION_PARTS_PER_MILLION",
+            "device_class": None, "icon": "mdi:water-opacity",
+            "range": (0, 20000), "resolution": 10, "deadband": 2},
+    "116": {"key": "ec", "name": "Conductivity", "unit": '"μS/cm"', "device_class": None,
+            "icon": "mdi:flash", "range": (0, 40000), "resolution": 10, "deadband": 3},
+    "121": {"key": "salinity", "name": "Salinity", "unit": "CONCENTRATION_PARTS_PER_MILLION",
+            "device_class": None, "icon": "mdi:shaker-outline",
+            "range": (0, 40000), "resolution": 10, "deadband": 2},
+    "126": {"key": "pro_sensor", "name": "Proportion", "unit": "None", "device_class": None,
+            "icon": "mdi:help-circle", "range": (0, 2), "resolution": 0.01},
+    "131": {"key": "orp", "name": "ORP", "unit": "MILLIVOLT", "device_class": "voltage",
+            "icon": "mdi:lightning-bolt", "range": (-2000, 2000), "resolution": 10, "fast_rate": 20},
+    "136": {"key": "conductivity_factor", "name": "Conductivity Factor", "unit": "None",
+            "device_class": None, "icon": "mdi:chart-line",
+            "range": (0, 40000), "resolution": 10, "deadband": 3},
+}
+
+
+def _is_number(value) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+class ChangeStream:
+    """Zmiany jednego DPS - (czas, wartość) tylko gdy wartość jest inna niż poprzednia"""
+
+    def __init__(self):
+        self.times: List[float] = []
+        self.values: List[Any] = []
+
+    def add(self, timestamp: float, value) -> bool:
+        """Dodaje próbkę, zwraca True gdy była zmianą"""
+        if self.values and self.values[-1] == value:
+            return False
+        self.times.append(timestamp)
+        self.values.append(value)
+        return True
+
+    @property
+    def numeric(self) -> bool:
+        return bool(self.values) and all(_is_number(value) for value in self.values)
+
+
+class WatchRecorder:
+    """Próbki statusu z jednego urządzenia, czasy w sekundach od startu"""
+
+    def __init__(self):
+        self.sample_times: List[float] = []
+        self.streams: Dict[str, ChangeStream] = {}
+
+    def add(self, timestamp: float, dps: Dict[str, Any]):
+        """Dodaje jeden odczyt statusu"""
+        self.sample_times.append(timestamp)
+        for dps_id, value in dps.items():
+            self.streams.setdefault(str(dps_id), ChangeStream()).add(timestamp, value)
+
+    def column(self, dps_id: str) -> np.ndarray:
+        """Wartości DPS w chwilach wszystkich próbek (ostatnia znana wartość)"""
+        stream = self.streams[dps_id]
+        times = np.asarray(stream.times)
+        index = np.searchsorted(times, np.asarray(self.sample_times), side="right") - 1
+        # DPS który pojawił się później - do tego czasu jego pierwsza wartość
+        return np.asarray(stream.values, dtype=float)[np.maximum(index, 0)]
+
+
+def fit_scale(values: np.ndarray, hint: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Dopasowuje skalę i zakres fizyczny dla surowych wartości jednego DPS"""
+    distinct = np.unique(values)
+    step = float(np.diff(distinct).min()) if len(distinct) > 1 else None
+    low, high = hint["range"] if hint else (-math.inf, math.inf)
+    resolution = hint["resolution"] if hint else math.inf
+
+    scales = np.asarray(SCALES, dtype=float)
+    plausible = (distinct[0] / scales >= low) & (distinct[-1] / scales <= high)
+    if step is not None:
+        plausible &= step / scales <= resolution
+    candidates = np.flatnonzero(plausible)
+    scale = int(scales[candidates[0]]) if len(candidates) else 1
+
+    # Szum - mediana skoku między kolejnymi zmianami, w jednostkach po skali
+    jumps = np.abs(np.diff(values))
+    noise = float(np.median(jumps)) / scale if len(jumps) else None
+
+    return {
+        "scale": scale,
+        "noise": noise,
+        "plausible_scales": [int(s) for s in scales[candidates]],
+        "raw_range": [float(distinct[0]), float(distinct[-1])],
+        "range": [float(distinct[0]) / scale, float(distinct[-1]) / scale],
+        "raw_step": step,
+        "distinct_values": int(len(distinct)),
+    }
+
+
+def correlations(recorder: WatchRecorder, threshold: float = CORRELATION_THRESHOLD) -> List[Dict[str, Any]]:
+    """Pary zmiennych kanałów z |r| >= threshold i stosunkiem b/a (dopasowanie przez zero)"""
+    names = [
+        dps_id for dps_id, stream in recorder.streams.items()
+        if stream.numeric and len(stream.values) > 1
+    ]
+    if len(names) < 2:
+        return []
+    matrix = np.vstack([recorder.column(dps_id) for dps_id in names])
+    r = np.corrcoef(matrix)
+    # ratio[b, a] = sum(a*b) / sum(a*a), czyli b ≈ ratio * a
+    ratio = (matrix @ matrix.T) / np.sum(matrix * matrix, axis=1)[np.newaxis, :]
+
+    a, b = np.triu_indices(len(names), k=1)
+    strong = np.abs(r[a, b]) >= threshold
+    pairs = [
+        {"a": names[i], "b": names[j], "r": round(float(r[i, j]), 4),
+         "ratio": round(float(ratio[j, i]), 4)}
+        for i, j in zip(a[strong], b[strong])
+    ]
+    return sorted(pairs, key=lambda pair: -abs(pair["r"]))
+
+
+def sensor_types_block(channels: Dict[str, Dict[str, Any]]) -> str:
+    """Blok SENSOR_TYPES w stylu const.py z dopasowanych kanałów"""
+    lines = ["SENSOR_TYPES = {"]
+    for dps_id, channel in sorted(channels.items(), key=lambda item: int(item[0])):
+        fit = channel.get("fit")
+        if fit is None:
+            continue
+        hint = SENSOR_HINTS.get(dps_id) or {
+            "key": f"dps_{dps_id}", "name": f"DPS {dps_id}", "unit": "None",
+            "device_class": None, "icon": "mdi:help-circle",
+        }
+        low, high = fit["range"]
+        observed = f"{low:g}" if low == high else f"{low:g}..{high:g}"
+        lines += [
+            f'    "{hint["key"]}": {{',
+            f'        "name": "{hint["name"]}",',
+            f'        "dps_id": {dps_id},  # observed {observed}, {fit["distinct_values"]} values',
+            f'        "unit": {hint["unit"]},',
+            f'        "device_class": {hint["device_class"]!r},'.replace("'", '"'),
+            '        "state_class": "measurement",',
+            f'        "scale": {fit["scale"]},' + ("" if fit["plausible_scales"] else "  # No plausible scale"),
+            f'        "icon": "{hint["icon"]}",',
+        ]
+        if dps_id in SENSOR_HINTS:
+            lines += [f'        "{key}": {hint[key]},' for key in ("deadband", "fast_rate") if key in hint]
+        elif fit["noise"]:
+            # Nieznany DPS - zmiany poniżej typowego skoku traktowane jak szum
+            lines.append(f'        "deadband": {fit["noise"]:g},  # Observed noise')
+        lines.append("    },")
+    lines.append("}")
+    return "\n".join(lines)
+
+
+def analyze_watch(recorder: WatchRecorder) -> Dict[str, Any]:
+    """Strumienie zmian, dopasowania, korelacje i blok SENSOR_TYPES"""
+    channels = {}
+    for dps_id, stream in recorder.streams.items():
+        channel = {"changes": [[t, v] for t, v in zip(stream.times, stream.values)]}
+        if stream.numeric:
+            values = np.asarray(stream.values, dtype=float)
+            channel["fit"] = fit_scale(values, SENSOR_HINTS.get(dps_id))
+        channels[dps_id] = channel
+
+    return {
+        "samples": len(recorder.sample_times),
+        "duration": recorder.sample_times[-1] if recorder.sample_times else 0,
+        "channels": channels,
+        "correlations": correlations(recorder),
+        "sensor_types": sensor_types_block(channels),
+    }